@@ -0,0 +1,208 @@
+import asyncio
+
+from typing import TYPE_CHECKING, AsyncIterable, Callable, Optional
+
+if TYPE_CHECKING:
+    from building import Building
+    from elevator import Elevator
+    from metrics import Metrics
+    from passenger import Passenger
+
+
+class AsyncClock:
+    """
+    Simulated time of the asyncio runtime, following the event loop's clock at the given speed.
+    During one step of a car sleeping only moves the time forward (offset); the car then awaits
+    the duration of the step, by which time the loop's clock has caught up
+    """
+
+    def __init__(self, speed: float = 1.0):
+        if speed <= 0:
+            raise ValueError("speed must be higher than 0")
+        self.speed = speed  # How many simulated seconds pass in one wall-clock second
+        self.origin = None  # loop time when the simulation started
+        self.offset = 0.0  # simulated seconds slept during the current step
+
+    @property
+    def now(self) -> float:
+        if self.origin is None:
+            return self.offset
+        return (asyncio.get_running_loop().time() - self.origin) * self.speed + self.offset
+
+    def start(self) -> None:
+        self.origin = asyncio.get_running_loop().time()
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Advance simulated time within the current step
+
+        :param seconds: Duration of the action in simulated seconds
+        :return: None
+        """
+        self.offset += seconds
+
+
+class AsyncSimulation:
+    """
+    Runtime where every car is a coroutine on one event loop. A car performs one action, then
+    awaits its duration (moving, door timers), so dozens of cars share one thread, and passengers
+    can call while the cars are running. Idle cars without calls wait until a call wakes them.
+    Dispatchers schedule their callbacks on the loop's timers; the cars keep running until the
+    last of them has fired
+    """
+
+    def __init__(self, speed: float = 1.0, metrics: Optional["Metrics"] = None):
+        self.clock = AsyncClock(speed)
+        self.metrics = metrics  # Optional KPI collector, exported when run() ends
+        self.elevators = []
+        self._wakeups = {}  # elevator -> asyncio.Event set when the elevator has something to do
+        self._loop = None  # running loop, None before run()
+        self._timers = {}  # token -> timer handle of the scheduled callbacks, None until run() starts them
+        self._pending_timers = []  # (token, delay, callback, args) scheduled before run()
+
+    @property
+    def now(self) -> float:
+        return self.clock.now
+
+    def add_elevator(self, elevator: "Elevator") -> None:
+        """
+        Put the elevator on the runtime's clock
+
+        :param elevator: Elevator instance
+        :return: None
+        """
+        elevator.clock = self.clock
+        elevator.door.clock = self.clock
+        if self.metrics is not None:
+            self.metrics.attach(elevator)
+        self.elevators.append(elevator)
+
+    def add_building(self, building: "Building") -> None:
+        """
+        Put all cars of the building into the runtime
+
+        :param building: Building instance
+        :return: None
+        """
+        for car in building.cars:
+            self.add_elevator(car)
+        building.dispatcher.attach(self, building.cars)
+
+    def schedule(self, delay: float, callback: Callable, *args) -> None:
+        """
+        Schedule callback(*args) after delay simulated seconds; before run() the timer starts with it
+
+        :param delay: Delay from the current simulated time
+        :param callback: Function to call
+        :return: None
+        """
+        if delay < 0:
+            raise ValueError("delay must be higher than 0")
+        token = object()
+        self._timers[token] = None
+        if self._loop is not None:
+            self._timers[token] = self._loop.call_later(delay / self.clock.speed, self.fire, token, callback, args)
+        else:
+            self._pending_timers.append((token, delay, callback, args))
+
+    def fire(self, token: object, callback: Callable, args: tuple) -> None:
+        """
+        Timer of a scheduled callback: run it and let the cars look at what it changed
+
+        :return: None
+        """
+        del self._timers[token]
+        try:
+            callback(*args)
+        finally:
+            self.wake_elevators()
+
+    def arrive(self, passenger: "Passenger") -> None:
+        """
+        Live call of a passenger while the cars are running
+
+        :param passenger: Passenger instance
+        :return: None
+        """
+        passenger.call_elevator()
+        self.wake_elevators()
+
+    def stop(self) -> None:
+        """
+        Let every car finish once its passengers are served
+
+        :return: None
+        """
+        for elevator in self.elevators:
+            elevator.stop_elevator()
+        self.wake_elevators()
+
+    def wake_elevators(self) -> None:
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+
+    async def run_elevator(self, elevator: "Elevator") -> None:
+        """
+        Coroutine of one car: step it until it is finished
+
+        :param elevator: Elevator instance
+        :return: None
+        """
+        wakeup = self._wakeups[elevator]
+        # A finished car waits for the scheduled callbacks, which may still give it calls
+        while not elevator.is_finished() or self._timers:
+            if elevator.is_finished() or (elevator.is_parked() and not elevator.park()):
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            self.clock.offset = 0.0
+            duration = elevator.step()
+            self.clock.offset = 0.0
+            # Always yield, even after an instant step, so that the other cars and the calls get their turn
+            await asyncio.sleep(duration / self.clock.speed)
+
+    async def feed(self, source: AsyncIterable["Passenger"]) -> None:
+        """
+        Call the elevator for every passenger coming from an asynchronous source
+
+        :param source: Async iterable of passengers
+        :return: None
+        """
+        async for passenger in source:
+            self.arrive(passenger)
+
+    async def run(self, source: Optional[AsyncIterable["Passenger"]] = None, until: Optional[float] = None) -> None:
+        """
+        Run all cars until they are finished. With a source the cars are stopped once the source
+        is exhausted, so everybody who arrived is still served
+
+        :param source: Async iterable of passengers arriving while the cars are running
+        :param until: Simulated time to stop at
+        :return: None
+        """
+        self.clock.start()
+        self._loop = asyncio.get_running_loop()
+        for token, delay, callback, args in self._pending_timers:
+            self._timers[token] = self._loop.call_later(delay / self.clock.speed, self.fire, token, callback, args)
+        self._pending_timers = []
+        self._wakeups = {elevator: asyncio.Event() for elevator in self.elevators}
+        tasks = [asyncio.create_task(self.run_elevator(elevator)) for elevator in self.elevators]
+        if source is not None:
+            feeder = asyncio.create_task(self.feed(source))
+            feeder.add_done_callback(lambda task: task.cancelled() or self.stop())
+            tasks.append(feeder)
+
+        timeout = until / self.clock.speed if until is not None else None
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for handle in self._timers.values():
+            handle.cancel()
+        self._timers = {}
+        self._loop = None
+        for task in done:
+            task.result()  # raise the errors of the cars and of the source
+
+        if self.metrics is not None:
+            self.metrics.export(self.clock.now)
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+from async_simulation import AsyncClock, AsyncSimulation
+from building import Building
+from dispatcher import DestinationDispatcher, OptimizingDispatcher
+from elevator import Elevator
+from events import NULL_SINK
+from metrics import Metrics
+from passenger import Passenger
+
+SPEED = 1000  # simulated seconds per wall-clock second
+
+
+def test_async_clock_speed_zero():
+    with pytest.raises(ValueError):
+        AsyncClock(0)
+
+
+def test_async_simulation_serves_calls_made_before_start():
+    elevator = Elevator(10, 4, 1, event_sink=NULL_SINK)
+    Passenger(3, 6, elevator).call_elevator()
+    elevator.stop_elevator()
+
+    asyncio.run(elevator.run_async(speed=SPEED))
+
+    assert len(elevator.pending_passengers) == 0
+    assert len(elevator.passengers) == 0
+    assert elevator.current_floor == 6
+
+
+def test_async_simulation_live_arrivals_many_cars():
+    building = Building(20, 12, 4, 1, event_sink=NULL_SINK)
+    metrics = Metrics()
+
+    async def arrivals():
+        for item in range(36):
+            await asyncio.sleep(2 / SPEED)
+            yield Passenger(1 + item % 20, 20 - item % 19, building)
+
+    started = time.monotonic()
+    asyncio.run(building.run_async(arrivals(), speed=SPEED, metrics=metrics))
+
+    assert time.monotonic() - started < 5
+    assert metrics.journey_time.count == 36
+    assert all(not car.pending_passengers and not car.passengers for car in building.cars)
+
+
+def test_async_simulation_until_cancels_cars():
+    elevator = Elevator(10, 4, 1, event_sink=NULL_SINK)
+    simulation = AsyncSimulation(SPEED)
+    simulation.add_elevator(elevator)
+
+    asyncio.run(simulation.run(until=50))
+
+    assert not elevator.is_finished()
+    assert simulation.clock.origin is not None
+
+
+@pytest.mark.parametrize('dispatcher', [DestinationDispatcher(window=5.0), OptimizingDispatcher(cycle=2.0, budget=0.001)])
+def test_async_simulation_runs_dispatcher_timers(dispatcher):
+    building = Building(10, 3, 4, 1, dispatcher=dispatcher, event_sink=NULL_SINK)
+    metrics = Metrics()
+
+    async def arrivals():
+        for item in range(12):
+            await asyncio.sleep(1 / SPEED)
+            yield Passenger(1 + item % 10, 10 - item % 9, building)
+
+    asyncio.run(building.run_async(arrivals(), speed=SPEED, metrics=metrics))
+
+    assert dispatcher.simulation is not None
+    assert metrics.journey_time.count == 12
+    assert all(not car.pending_passengers and not car.passengers for car in building.cars)
@@ -0,0 +1,205 @@
+import argparse
+import os
+import random
+import statistics
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from math import ceil, sqrt
+
+from building import Building
+from events import NULL_SINK
+from passenger import Passenger
+from simulation import Simulation
+
+DEFAULT_CONFIG = {
+    'max_floor': 10,
+    'cars': 1,
+    'max_passengers': 4,
+    'passengers': 50,  # passengers per replication
+    'arrival_rate': 0.1,  # passengers per simulated second
+    'tick_rate': 1.0,
+}
+
+Z_95 = 1.96  # normal quantile of the two-sided 95% confidence interval
+
+
+def expand_grid(grid: dict) -> list:
+    """
+    Every combination of the parameter grid, completed with the default configuration
+
+    :param grid: Parameter name -> list of values
+    :return: list of configurations
+    """
+    unknown = set(grid) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f'unknown parameters: {", ".join(sorted(unknown))}')
+
+    names = list(grid)
+    return [{**DEFAULT_CONFIG, **dict(zip(names, values))} for values in product(*(grid[name] for name in names))]
+
+
+def generate_trips(config: dict, rng: random.Random) -> list:
+    """
+    Random trips with Poisson arrivals
+
+    :param config: Configuration of the replication
+    :param rng: Random generator of the replication
+    :return: list of (arrival time, current floor, desired floor)
+    """
+    trips = []
+    arrival_time = 0.0
+    max_floor = config['max_floor']
+    for item in range(config['passengers']):
+        arrival_time += rng.expovariate(config['arrival_rate'])
+        current_floor = rng.randint(1, max_floor)
+        desired_floor = rng.randint(1, max_floor - 1)
+        if desired_floor >= current_floor:
+            desired_floor += 1
+        trips.append((arrival_time, current_floor, desired_floor))
+    return trips
+
+
+def run_replication(config: dict, seed: int) -> tuple:
+    """
+    Simulate one replication of the configuration
+
+    :param config: Configuration of the replication
+    :param seed: Seed of the replication's random generator
+    :return: (wait times, journey times) of the served passengers
+    """
+    rng = random.Random(seed)
+    building = Building(config['max_floor'], config['cars'], config['max_passengers'], config['tick_rate'],
+                        event_sink=NULL_SINK)
+    simulation = Simulation()
+    simulation.add_building(building)
+
+    for arrival_time, current_floor, desired_floor in generate_trips(config, rng):
+        simulation.add_passenger(Passenger(current_floor, desired_floor, building), arrival_time)
+    building.stop_elevator()
+    simulation.run()
+
+    wait_times = array('d', building.passenger_store.get_wait_times())
+    journey_times = array('d', building.passenger_store.get_journey_times())
+    return wait_times, journey_times
+
+
+def run_replications(config: dict, seeds: list) -> list:
+    """
+    Simulate a chunk of replications in one worker task
+
+    :param config: Configuration of the replications
+    :param seeds: Seeds of the replications
+    :return: list of (wait times, journey times)
+    """
+    return [run_replication(config, seed) for seed in seeds]
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Nearest-rank percentile
+
+    :param sorted_values: Values in ascending order
+    :param fraction: Percentile as a fraction, e.g. 0.95
+    :return: float
+    """
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[max(0, ceil(fraction * len(sorted_values)) - 1)]
+
+
+def confidence_interval(values: list) -> tuple:
+    """
+    95% confidence interval of the mean (normal approximation)
+
+    :param values: Sample
+    :return: (low, high)
+    """
+    if not values:
+        return float('nan'), float('nan')
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, mean
+    half_width = Z_95 * statistics.stdev(values) / sqrt(len(values))
+    return mean - half_width, mean + half_width
+
+
+def summarize(results: list) -> dict:
+    """
+    Aggregate the replications of one configuration
+
+    :param results: list of (wait times, journey times) per replication
+    :return: dict of statistics
+    """
+    summary = {'replications': len(results)}
+    for index, name in enumerate(('wait', 'journey')):
+        samples = sorted(value for result in results for value in result[index])
+        replication_means = [statistics.fmean(result[index]) for result in results if result[index]]
+        summary[f'{name}_mean'] = statistics.fmean(samples) if samples else float('nan')
+        summary[f'{name}_p95'] = percentile(samples, 0.95)
+        summary[f'{name}_p99'] = percentile(samples, 0.99)
+        summary[f'{name}_ci95'] = confidence_interval(replication_means)
+    summary['served'] = sum(len(result[0]) for result in results)
+    return summary
+
+
+def run_batch(grid: dict, replications: int, seed: int = 0, workers: int = None):
+    """
+    Run the replications of every configuration of the grid in a process pool and yield each
+    configuration's aggregate as soon as all of its replications are finished
+
+    :param grid: Parameter name -> list of values
+    :param replications: Replications per configuration
+    :param seed: Seed of the first replication, replication N uses seed + N
+    :param workers: Number of worker processes, all cores when omitted
+    :return: generator of (configuration, summary)
+    """
+    if replications < 1:
+        raise ValueError("replications must be higher than 1")
+
+    configs = expand_grid(grid)
+    workers = workers or os.cpu_count()
+    # Several chunks per worker keep the cores busy until the end without paying per-task overhead
+    chunk_size = max(1, ceil(replications * len(configs) / (workers * 4)))
+    seeds = list(range(seed, seed + replications))
+
+    results = [[] for config in configs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for index, config in enumerate(configs):
+            for start in range(0, replications, chunk_size):
+                futures[executor.submit(run_replications, config, seeds[start:start + chunk_size])] = index
+
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index].extend(future.result())
+            if len(results[index]) == replications:
+                yield configs[index], summarize(results[index])
+                results[index] = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Monte Carlo batch of elevator simulations')
+    parser.add_argument('--max-floor', type=int, nargs='+', default=[DEFAULT_CONFIG['max_floor']])
+    parser.add_argument('--cars', type=int, nargs='+', default=[DEFAULT_CONFIG['cars']])
+    parser.add_argument('--max-passengers', type=int, nargs='+', default=[DEFAULT_CONFIG['max_passengers']])
+    parser.add_argument('--passengers', type=int, nargs='+', default=[DEFAULT_CONFIG['passengers']])
+    parser.add_argument('--arrival-rate', type=float, nargs='+', default=[DEFAULT_CONFIG['arrival_rate']])
+    parser.add_argument('--replications', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    grid = {
+        'max_floor': args.max_floor,
+        'cars': args.cars,
+        'max_passengers': args.max_passengers,
+        'passengers': args.passengers,
+        'arrival_rate': args.arrival_rate,
+    }
+    for config, summary in run_batch(grid, args.replications, args.seed, args.workers):
+        print(config, summary, flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+from batch import expand_grid, generate_trips, run_replication, percentile, confidence_interval, summarize, \
+    run_batch, DEFAULT_CONFIG
+
+
+def test_expand_grid():
+    configs = expand_grid({'cars': [1, 2], 'max_passengers': [4, 8]})
+
+    assert len(configs) == 4
+    assert configs[0] == {**DEFAULT_CONFIG, 'cars': 1, 'max_passengers': 4}
+    assert configs[3]['cars'] == 2 and configs[3]['max_passengers'] == 8
+
+
+def test_expand_grid_unknown_parameter():
+    with pytest.raises(ValueError):
+        expand_grid({'floors': [10]})
+
+
+def test_generate_trips_never_same_floor():
+    trips = generate_trips({**DEFAULT_CONFIG, 'passengers': 500}, random.Random(1))
+
+    assert len(trips) == 500
+    assert all(current_floor != desired_floor for arrival_time, current_floor, desired_floor in trips)
+    assert [trip[0] for trip in trips] == sorted(trip[0] for trip in trips)
+
+
+def test_run_replication_is_deterministic():
+    first = run_replication(DEFAULT_CONFIG, 7)
+    second = run_replication(DEFAULT_CONFIG, 7)
+
+    assert first == second
+    assert len(first[0]) == DEFAULT_CONFIG['passengers']
+    assert all(wait <= journey for wait, journey in zip(*first))
+
+
+def test_percentile():
+    values = list(range(1, 101))
+
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([5], 0.99) == 5
+
+
+def test_confidence_interval():
+    low, high = confidence_interval([1.0, 2.0, 3.0])
+
+    assert low < 2.0 < high
+    assert confidence_interval([4.0]) == (4.0, 4.0)
+
+
+def test_summarize():
+    summary = summarize([([1.0, 3.0], [2.0, 6.0]), ([2.0], [4.0])])
+
+    assert summary['replications'] == 2
+    assert summary['served'] == 3
+    assert summary['wait_mean'] == 2.0
+    assert summary['journey_p99'] == 6.0
+
+
+def test_run_batch_yields_every_configuration():
+    results = list(run_batch({'cars': [1, 2], 'passengers': [10]}, replications=3, workers=2))
+
+    assert sorted(config['cars'] for config, summary in results) == [1, 2]
+    assert all(summary['replications'] == 3 for config, summary in results)
+    assert all(summary['served'] == 30 for config, summary in results)
+
+
+def test_run_batch_replications_zero():
+    with pytest.raises(ValueError):
+        list(run_batch({'cars': [1]}, replications=0))
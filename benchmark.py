@@ -0,0 +1,225 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import tracemalloc
+from itertools import product
+from time import perf_counter
+
+from batch import generate_trips
+from building import Building
+from elevator import Elevator, ElevatorStatus, ElevatorDirection
+from events import NULL_SINK
+from passenger import Passenger
+from simulation import Simulation
+
+FLOORS = (10, 50, 200)
+PASSENGERS = (10, 1000, 100000)
+CARS = (1, 4, 16)
+QUICK_FLOORS = (10, 50)
+QUICK_PASSENGERS = (10, 1000)
+QUICK_CARS = (1, 4)
+
+CAR_CAPACITY = 8
+ARRIVAL_RATE_PER_CAR = 0.05  # passengers per simulated second, low enough for the cars to keep up
+TOLERANCE = 0.25
+
+
+def add_waiting_passengers(elevator: Elevator, passengers: int, rng: random.Random) -> None:
+    for item in range(passengers):
+        current_floor = rng.randint(1, elevator.max_floor)
+        desired_floor = rng.randint(1, elevator.max_floor - 1)
+        if desired_floor >= current_floor:
+            desired_floor += 1
+        Passenger(current_floor, desired_floor, elevator).call_elevator()
+
+
+def setup_simulation(floors: int, passengers: int, cars: int, seed: int = 0) -> tuple:
+    """
+    Whole simulation on the virtual clock: passengers arrive at a rate the cars can serve and
+    every one of them is delivered
+
+    :return: (function running the case, number of passengers it simulates)
+    """
+    config = {'max_floor': floors, 'passengers': passengers, 'arrival_rate': ARRIVAL_RATE_PER_CAR * cars}
+    building = Building(floors, cars, CAR_CAPACITY, 1.0, event_sink=NULL_SINK)
+    simulation = Simulation()
+    simulation.add_building(building)
+    for arrival_time, current_floor, desired_floor in generate_trips(config, random.Random(seed)):
+        simulation.add_passenger(Passenger(current_floor, desired_floor, building), arrival_time)
+    building.stop_elevator()
+    return simulation.run, passengers
+
+
+def setup_floors_to_open(floors: int, passengers: int, seed: int = 0) -> tuple:
+    """
+    get_floors_to_open() on every floor of a sweep from the bottom to the top, with the given
+    number of passengers waiting
+
+    :return: (function running the case, number of calls it makes)
+    """
+    elevator = Elevator(floors, CAR_CAPACITY, event_sink=NULL_SINK)
+    add_waiting_passengers(elevator, passengers, random.Random(seed))
+    elevator.status = ElevatorStatus.MOVING
+    elevator.direction = ElevatorDirection.UP
+    elevator.floor_to_reach = floors
+
+    def run():
+        for floor in range(1, floors + 1):
+            elevator.current_floor = floor
+            elevator.get_floors_to_open()
+
+    return run, floors
+
+
+def setup_enter_pending(floors: int, passengers: int, seed: int = 0) -> tuple:
+    """
+    enter_pending_passengers() on every floor until all waiting passengers are in the car
+
+    :return: (function running the case, number of passengers boarding)
+    """
+    elevator = Elevator(floors, passengers, event_sink=NULL_SINK)
+    add_waiting_passengers(elevator, passengers, random.Random(seed))
+
+    def run():
+        for floor in range(1, floors + 1):
+            elevator.current_floor = floor
+            elevator.enter_pending_passengers()
+
+    return run, passengers
+
+
+BENCHMARKS = {
+    'simulation': (setup_simulation, ('floors', 'passengers', 'cars')),
+    'floors_to_open': (setup_floors_to_open, ('floors', 'passengers')),
+    'enter_pending': (setup_enter_pending, ('floors', 'passengers')),
+}
+
+
+def measure(setup, parameters: dict, repeat: int = 3) -> dict:
+    """
+    Best time of several runs of a case, then its peak traced memory in one more run
+
+    :param setup: Function building the case, returns (run function, number of operations)
+    :param parameters: Arguments of setup
+    :param repeat: Number of timed runs
+    :return: dict
+    """
+    best = None
+    for attempt in range(repeat):
+        run, operations = setup(**parameters)
+        started = perf_counter()
+        run()
+        elapsed = perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Traced separately: tracemalloc slows the allocations down several times
+    tracemalloc.start()
+    run, operations = setup(**parameters)
+    run()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'seconds': best,
+        'operations': operations,
+        'rate': operations / best if best > 0 else float('inf'),
+        'peak_memory': peak_memory,
+    }
+
+
+def case_name(benchmark: str, parameters: dict) -> str:
+    return '/'.join([benchmark] + [f'{name}={value}' for name, value in parameters.items()])
+
+
+def run_benchmarks(floors=FLOORS, passengers=PASSENGERS, cars=CARS, only: list = None, repeat: int = 3,
+                   report=None) -> dict:
+    """
+    Run every benchmark over the sweep of building sizes
+
+    :param floors: Numbers of floors
+    :param passengers: Numbers of passengers
+    :param cars: Numbers of cars, swept by the benchmarks which simulate a building
+    :param only: Names of the benchmarks to run, all when omitted
+    :param repeat: Number of timed runs of every case
+    :param report: Optional function called with (name, result) after every case
+    :return: case name -> result
+    """
+    sweep = {'floors': floors, 'passengers': passengers, 'cars': cars}
+    results = {}
+    for benchmark, (setup, names) in BENCHMARKS.items():
+        if only and benchmark not in only:
+            continue
+        for values in product(*(sweep[name] for name in names)):
+            parameters = dict(zip(names, values))
+            name = case_name(benchmark, parameters)
+            results[name] = measure(setup, parameters, repeat)
+            if report is not None:
+                report(name, results[name])
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list:
+    """
+    Cases which got slower or use more memory than the baseline allows
+
+    :param results: case name -> result of this run
+    :param baseline: case name -> result of the baseline run
+    :param tolerance: Allowed relative change
+    :return: list of (case name, metric, baseline value, new value)
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result['rate'] < expected['rate'] * (1 - tolerance):
+            regressions.append((name, 'rate', expected['rate'], result['rate']))
+        if result['peak_memory'] > expected['peak_memory'] * (1 + tolerance):
+            regressions.append((name, 'peak_memory', expected['peak_memory'], result['peak_memory']))
+    return regressions
+
+
+def print_result(name: str, result: dict) -> None:
+    print(f"{name:<48} {result['rate']:>14,.0f}/s {result['peak_memory'] / 2 ** 20:>10.2f} MiB", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Elevator simulation benchmarks')
+    parser.add_argument('--quick', action='store_true', help='small sweep for a fast check')
+    parser.add_argument('--floors', type=int, nargs='+', default=None)
+    parser.add_argument('--passengers', type=int, nargs='+', default=None)
+    parser.add_argument('--cars', type=int, nargs='+', default=None)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON file of a previous run to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results to the baseline file')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    floors = args.floors or (QUICK_FLOORS if args.quick else FLOORS)
+    passengers = args.passengers or (QUICK_PASSENGERS if args.quick else PASSENGERS)
+    cars = args.cars or (QUICK_CARS if args.quick else CARS)
+    results = run_benchmarks(floors, passengers, cars, args.only, args.repeat, report=print_result)
+
+    document = {'python': platform.python_version(), 'machine': platform.machine(), 'cases': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(document, file, indent=2)
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(document, file, indent=2)
+    elif args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['cases']
+        regressions = compare(results, baseline, args.tolerance)
+        for name, metric, expected, actual in regressions:
+            print(f'REGRESSION {name} {metric}: {expected:,.0f} -> {actual:,.0f}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
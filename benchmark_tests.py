@@ -0,0 +1,38 @@
+from benchmark import run_benchmarks, compare, BENCHMARKS
+
+
+def test_run_benchmarks_covers_every_case():
+    results = run_benchmarks(floors=(5,), passengers=(20,), cars=(1, 2), repeat=1)
+
+    assert set(results) == {
+        'simulation/floors=5/passengers=20/cars=1',
+        'simulation/floors=5/passengers=20/cars=2',
+        'floors_to_open/floors=5/passengers=20',
+        'enter_pending/floors=5/passengers=20',
+    }
+    assert all(result['rate'] > 0 and result['peak_memory'] > 0 for result in results.values())
+
+
+def test_run_benchmarks_only():
+    results = run_benchmarks(floors=(5,), passengers=(20,), cars=(1,), only=['enter_pending'], repeat=1)
+
+    assert list(results) == ['enter_pending/floors=5/passengers=20']
+
+
+def test_compare_flags_slower_and_bigger_cases():
+    baseline = {
+        'a': {'rate': 100.0, 'peak_memory': 1000},
+        'b': {'rate': 100.0, 'peak_memory': 1000},
+    }
+    results = {
+        'a': {'rate': 90.0, 'peak_memory': 1100},
+        'b': {'rate': 50.0, 'peak_memory': 2000},
+        'new': {'rate': 1.0, 'peak_memory': 1},
+    }
+
+    assert compare(results, baseline, tolerance=0.25) == [('b', 'rate', 100.0, 50.0),
+                                                          ('b', 'peak_memory', 1000, 2000)]
+
+
+def test_benchmarks_are_registered():
+    assert set(BENCHMARKS) == {'simulation', 'floors_to_open', 'enter_pending'}
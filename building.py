@@ -0,0 +1,107 @@
+from async_simulation import AsyncSimulation
+from elevator import Elevator
+from events import EventSink, CONSOLE_SINK
+from dispatcher import Dispatcher, NearestCarDispatcher
+from simulation import Simulation, RealTimePacer
+from store import PassengerStore
+
+from typing import TYPE_CHECKING, AsyncIterable
+
+if TYPE_CHECKING:
+    from parking import ParkingPolicy
+    from energy import EnergyModel
+    from kinematics import TravelTimeTable
+    from metrics import Metrics
+    from passenger import Passenger
+    from profiling import Profiler
+
+
+class Building:
+    """
+    Group controller of an elevator bank: owns the cars and routes every hall call to one of them
+    through the dispatcher
+    """
+
+    def __init__(self, max_floor: int, cars: int, max_passengers: int, tick_rate=1.0,
+                 dispatcher: Dispatcher = None, event_sink: EventSink = CONSOLE_SINK,
+                 travel_times: "TravelTimeTable" = None, energy_model: "EnergyModel" = None,
+                 parking_policy: "ParkingPolicy" = None, rated_load: float = None, car_area: float = None,
+                 reservations: bool = False):
+        if cars < 1:
+            raise ValueError("cars must be higher than 1")
+
+        # One table shared by all cars, see kinematics.get_travel_time_table()
+        self.cars = [Elevator(max_floor, max_passengers, tick_rate, event_sink, travel_times=travel_times,
+                              energy_model=energy_model, rated_load=rated_load, car_area=car_area,
+                              reservations=reservations) for _ in range(cars)]
+        self.passenger_store = PassengerStore()
+        for number, car in enumerate(self.cars):
+            car.number = number
+            car.passenger_store = self.passenger_store
+        self.max_floor = max_floor
+        if parking_policy is not None:
+            for car in self.cars:
+                car.parking_policy = parking_policy
+            parking_policy.attach(self.cars)
+        self.dispatcher = dispatcher if dispatcher is not None else NearestCarDispatcher()
+
+    def call_elevator(self, passenger_instance: "Passenger") -> None:
+        """
+        Passenger calling the elevator from the hall: the dispatcher chooses the car
+
+        :param passenger_instance: Passenger instance
+        :return: None
+        """
+        car = self.dispatcher.select_car(self.cars, passenger_instance)
+        if car is None:
+            return  # the dispatcher holds the call to assign it later
+        passenger_instance.car = car
+        car.call_elevator(passenger_instance)
+
+    def cancel_call(self, passenger_id: int) -> bool:
+        """
+        Withdraw the call of a waiting passenger from the dispatcher still holding it or from the
+        car it was assigned to
+
+        :param passenger_id: Passenger ID
+        :return: bool, False if neither the dispatcher nor a car has the passenger waiting
+        """
+        if self.dispatcher.cancel(passenger_id):
+            return True
+        return any(car.cancel_call(passenger_id) for car in self.cars)
+
+    def stop_elevator(self) -> None:
+        """
+        Stop all cars once they have served their passengers
+
+        :return: None
+        """
+        for car in self.cars:
+            car.stop_elevator()
+
+    def run(self, metrics: "Metrics" = None, profiler: "Profiler" = None) -> None:
+        """
+        Starting all cars in real time
+
+        :param metrics: Optional KPI collector, exported when all cars have stopped
+        :param profiler: Optional per-phase timing of the control loop
+        :return: None
+        """
+        simulation = Simulation(pacer=RealTimePacer(), metrics=metrics, profiler=profiler)
+        simulation.add_building(self)
+        simulation.run()
+
+    async def run_async(self, source: "AsyncIterable[Passenger]" = None, speed: float = 1.0,
+                        metrics: "Metrics" = None) -> None:
+        """
+        Starting all cars as coroutines on the running event loop; passengers from source
+        call while the cars are running
+
+        :param source: Optional async iterable of passengers
+        :param speed: How many simulated seconds pass in one wall-clock second
+        :param metrics: Optional KPI collector, exported when all cars have stopped
+        :return: None
+        """
+        simulation = AsyncSimulation(speed, metrics)
+        simulation.add_building(self)
+        await simulation.run(source)
@@ -0,0 +1,98 @@
+import pytest
+from building import Building
+from dispatcher import NearestCarDispatcher, ZonedDispatcher, EtaDispatcher
+from elevator import ElevatorStatus
+from passenger import Passenger
+from simulation import Simulation
+
+
+def test_building_cars_zero():
+    with pytest.raises(ValueError):
+        Building(10, 0, 4, 0.1)
+
+
+def test_building_cars_are_independent():
+    building = Building(10, 2, 4, 0.1)
+    first_car, second_car = building.cars
+    first_car.call_outside_elevator(3, 6)
+
+    assert first_car.pending_passengers is not second_car.pending_passengers
+    assert first_car.passengers is not second_car.passengers
+    assert len(second_car.call_queue) == 0
+
+
+def test_building_call_elevator_assigns_car():
+    building = Building(10, 2, 4, 0.1)
+    building.cars[1].current_floor = 8
+    passenger = Passenger(7, 2, building)
+    passenger.call_elevator()
+
+    assert passenger.car is building.cars[1]
+    assert passenger.uuid in building.cars[1].pending_passengers
+    assert passenger.uuid not in building.cars[0].pending_passengers
+
+
+def test_building_simulation_delivers_all_passengers():
+    building = Building(20, 4, 4, 1.0)
+    passengers = [Passenger(floor, 21 - floor, building) for floor in range(1, 21) if floor != 21 - floor]
+    simulation = Simulation()
+    simulation.add_building(building)
+    for arrival_time, passenger in enumerate(passengers):
+        simulation.add_passenger(passenger, arrival_time)
+    building.stop_elevator()
+    simulation.run()
+
+    for car in building.cars:
+        assert car.is_finished()
+
+
+def test_nearest_car_dispatcher():
+    building = Building(10, 3, 4, 0.1)
+    building.cars[0].current_floor = 1
+    building.cars[1].current_floor = 5
+    building.cars[2].current_floor = 9
+
+    assert NearestCarDispatcher().select_car(building.cars, Passenger(6, 1, building)) is building.cars[1]
+
+
+def test_zoned_dispatcher_splits_floors_evenly():
+    building = Building(12, 3, 4, 0.1)
+
+    assert ZonedDispatcher().get_zones(building.cars) == [(1, 4), (5, 8), (9, 12)]
+
+
+def test_zoned_dispatcher_selects_car_by_upper_floor():
+    building = Building(12, 3, 4, 0.1, dispatcher=ZonedDispatcher())
+    passenger = Passenger(1, 10, building)
+    passenger.call_elevator()
+
+    assert passenger.car is building.cars[2]
+
+
+def test_zoned_dispatcher_wrong_zones_count():
+    building = Building(12, 3, 4, 0.1)
+    with pytest.raises(ValueError):
+        ZonedDispatcher([(1, 12)]).select_car(building.cars, Passenger(1, 10, building))
+
+
+def test_eta_dispatcher_estimate_time_on_the_way():
+    building = Building(10, 1, 4, 1.0)
+    car = building.cars[0]
+    car.current_floor = 2
+    car.floor_to_reach = 8
+    car.status = ElevatorStatus.MOVING
+
+    assert EtaDispatcher().estimate_time(car, 5) == 3
+
+
+def test_eta_dispatcher_prefers_car_without_stops():
+    building = Building(10, 2, 4, 1.0, dispatcher=EtaDispatcher())
+    busy_car, free_car = building.cars
+    busy_car.current_floor = 4
+    busy_car.call_queue = [1, 10]
+    free_car.current_floor = 1
+
+    passenger = Passenger(5, 6, building)
+    passenger.call_elevator()
+
+    assert passenger.car is free_car
@@ -0,0 +1,98 @@
+from collections import namedtuple
+from math import inf
+
+# Load of one passenger in the car: kilograms and square metres of floor
+PassengerSize = namedtuple('PassengerSize', ['weight', 'area'])
+
+ADULT = PassengerSize(75.0, 0.2)  # the design passenger of EN 81-20
+CHILD = PassengerSize(35.0, 0.12)
+TROLLEY = PassengerSize(135.0, 0.6)  # passenger with a luggage or goods trolley
+WHEELCHAIR = PassengerSize(175.0, 1.0)  # wheelchair user with the chair
+
+NO_GROUP = -1  # group of a passenger travelling alone
+
+
+class CarLoad:
+    """
+    Load of a car by weight and floor area, and the room reserved for passengers assigned to the
+    car who are still waiting; the passengers themselves are counted by the car. Room is only
+    granted while the load and the reservations together stay within every limit, so a reserved
+    passenger always fits
+    """
+
+    def __init__(self, max_passengers: int, rated_load: float = None, car_area: float = None):
+        if rated_load is not None and rated_load <= 0:
+            raise ValueError("rated_load must be higher than 0")
+        if car_area is not None and car_area <= 0:
+            raise ValueError("car_area must be higher than 0")
+        self.max_passengers = max_passengers
+        self.rated_load = rated_load if rated_load is not None else inf  # kilograms
+        self.car_area = car_area if car_area is not None else inf  # square metres
+        self.limited = rated_load is not None or car_area is not None  # the sizes of the passengers matter
+        self.weight = 0.0  # kept up to date only for a limited car
+        self.area = 0.0
+        self.reserved = {}  # passenger ID -> PassengerSize of the reservation
+        self.reserved_weight = 0.0
+        self.reserved_area = 0.0
+
+    def fits(self, count: int, weight: float, area: float) -> bool:
+        """
+        Checking whether passengers without reservation fit next to the load and the reservations
+
+        :param count: Number of passengers in the car once they are in
+        :param weight: Their weight
+        :param area: Their floor area
+        :return: bool
+        """
+        return count + len(self.reserved) <= self.max_passengers and \
+            self.weight + self.reserved_weight + weight <= self.rated_load + 1e-9 and \
+            self.area + self.reserved_area + area <= self.car_area + 1e-9
+
+    def fits_empty(self, size: PassengerSize) -> bool:
+        """
+        Checking whether the passenger fits in the empty car
+
+        :param size: PassengerSize
+        :return: bool
+        """
+        return size.weight <= self.rated_load + 1e-9 and size.area <= self.car_area + 1e-9
+
+    def add(self, size: PassengerSize) -> None:
+        self.weight += size.weight
+        self.area += size.area
+
+    def remove(self, size: PassengerSize) -> None:
+        self.weight -= size.weight
+        self.area -= size.area
+
+    def reserve(self, passenger_id: int, size: PassengerSize, count: int) -> bool:
+        """
+        Hold room for a waiting passenger
+
+        :param passenger_id: Passenger ID
+        :param size: PassengerSize
+        :param count: Number of passengers in the car
+        :return: bool, False if there is no room left
+        """
+        if passenger_id in self.reserved:
+            return True
+        if not self.fits(count + 1, size.weight, size.area):
+            return False
+        self.reserved[passenger_id] = size
+        self.reserved_weight += size.weight
+        self.reserved_area += size.area
+        return True
+
+    def release(self, passenger_id: int) -> bool:
+        """
+        Give up the room held for the passenger
+
+        :param passenger_id: Passenger ID
+        :return: bool, False if the passenger had no reservation
+        """
+        size = self.reserved.pop(passenger_id, None)
+        if size is None:
+            return False
+        self.reserved_weight -= size.weight
+        self.reserved_area -= size.area
+        return True
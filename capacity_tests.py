@@ -0,0 +1,144 @@
+import pytest
+from building import Building
+from capacity import ADULT, TROLLEY, WHEELCHAIR, CarLoad
+from elevator import Elevator
+from events import MemorySink, EventType, NULL_SINK
+from passenger import Passenger
+from simulation import Simulation
+
+
+def run(elevator: "Elevator | Building", passengers: list) -> None:
+    simulation = Simulation()
+    if isinstance(elevator, Building):
+        simulation.add_building(elevator)
+    else:
+        simulation.add_elevator(elevator)
+    for passenger in passengers:
+        simulation.add_passenger(passenger, 0.0)
+    elevator.stop_elevator()
+    simulation.run()
+
+
+def test_car_load_reservations():
+    load = CarLoad(4, rated_load=300)
+
+    assert load.reserve(1, WHEELCHAIR, 0)
+    assert load.fits(1, ADULT.weight, ADULT.area)
+    assert not load.fits(1, TROLLEY.weight, TROLLEY.area)
+    assert not load.reserve(2, TROLLEY, 0)
+    assert load.release(1) and not load.release(1)
+    assert load.reserve(2, TROLLEY, 0)
+
+
+def test_car_load_invalid_limits():
+    with pytest.raises(ValueError):
+        CarLoad(4, rated_load=0)
+    with pytest.raises(ValueError):
+        CarLoad(4, car_area=-1.0)
+
+
+def test_passenger_larger_than_car():
+    elevator = Elevator(10, 4, event_sink=NULL_SINK, car_area=0.8)
+
+    with pytest.raises(ValueError):
+        Passenger(1, 5, elevator, WHEELCHAIR).call_elevator()
+    assert not elevator.pending_passengers
+
+
+def test_boarding_by_weight_keeps_call_order():
+    elevator = Elevator(10, 8, event_sink=NULL_SINK, rated_load=320)
+    passengers = [Passenger(1, 5, elevator), Passenger(1, 6, elevator, WHEELCHAIR), Passenger(1, 7, elevator),
+                  Passenger(1, 8, elevator)]
+    run(elevator, passengers)
+
+    # 75 + 175 = 250 kg: the next adult would overload the car and the one behind waits too
+    assert passengers[0].board_time == passengers[1].board_time < passengers[2].board_time
+    assert passengers[3].board_time >= passengers[2].board_time
+    assert all(passenger.alight_time is not None for passenger in passengers)
+    assert elevator.load.weight == pytest.approx(0.0)
+
+
+def test_car_without_room_skips_hall_stop():
+    sink = MemorySink()
+    elevator = Elevator(10, 4, event_sink=sink, car_area=1.2)
+    rider = Passenger(1, 9, elevator, WHEELCHAIR)
+    waiting = Passenger(5, 10, elevator, TROLLEY)
+    run(elevator, [rider, waiting])
+
+    alighted = next(event.time for event in sink.events if event.type is EventType.ALIGHT)
+    assert not [event for event in sink.events
+                if event.type is EventType.DOOR_OPEN and event.floor == 5 and event.time < alighted]
+    assert waiting.board_time > rider.alight_time
+
+
+def test_group_boards_together():
+    elevator = Elevator(10, 4, event_sink=NULL_SINK)
+    singles = [Passenger(1, 6, elevator), Passenger(1, 7, elevator)]
+    group = [Passenger(1, 8, elevator, group=1) for item in range(3)]
+    run(elevator, singles + group)
+
+    assert singles[0].board_time == singles[1].board_time
+    assert len({passenger.board_time for passenger in group}) == 1
+    assert group[0].board_time > singles[0].board_time
+
+
+def test_group_larger_than_car_boards_in_part():
+    elevator = Elevator(10, 2, event_sink=NULL_SINK)
+    group = [Passenger(1, 8, elevator, group=7) for item in range(3)]
+    run(elevator, group)
+
+    assert all(passenger.alight_time is not None for passenger in group)
+    assert group[0].board_time == group[1].board_time < group[2].board_time
+
+
+def test_reserved_passenger_is_not_crowded_out():
+    building = Building(10, 1, 2, event_sink=NULL_SINK, reservations=True)
+    reserved = Passenger(8, 10, building)
+    others = [Passenger(2, 10, building), Passenger(2, 10, building)]
+    reserved.call_elevator()
+    car = building.cars[0]
+
+    assert list(car.load.reserved) == [reserved.id]
+    run(building, others)
+
+    assert others[0].board_time < reserved.board_time < others[1].board_time
+    assert not car.load.reserved and not car.reserved_waiting
+
+
+def test_cancel_releases_reservation():
+    elevator = Elevator(10, 1, event_sink=NULL_SINK, reservations=True)
+    first, second = Passenger(3, 6, elevator), Passenger(4, 6, elevator)
+    first.call_elevator()
+    second.call_elevator()
+
+    assert list(elevator.load.reserved) == [first.id]
+    assert not elevator.has_room()
+    assert elevator.cancel_call(first.id)
+    assert elevator.has_room()
+    assert elevator.reserve(second)
+
+
+def test_dispatcher_skips_full_car():
+    building = Building(10, 2, 1, event_sink=NULL_SINK)
+    rider = Passenger(1, 5, building)
+    rider.call_elevator()
+    rider.car.enter_elevator(rider.id, 5)
+    passenger = Passenger(1, 6, building)
+    passenger.call_elevator()
+
+    assert passenger.car is not rider.car
+
+
+def test_group_call_after_cancel_boards_once():
+    elevator = Elevator(10, 4, event_sink=NULL_SINK)
+    first, second = Passenger(3, 6, elevator, group=1), Passenger(3, 6, elevator, group=1)
+    first.call_elevator()
+    second.call_elevator()
+    elevator.cancel_call(first.id)
+    first.call_elevator()
+    elevator.current_floor = 3
+    elevator.enter_pending_passengers()
+
+    assert sorted(elevator.passengers) == [first.id, second.id]
+    assert not elevator.pending_passengers
+    assert not elevator.is_floor_awaited(3)
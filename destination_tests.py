@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from building import Building
+from dispatcher import DestinationDispatcher, RouteCostDispatcher
+from events import NULL_SINK
+from metrics import Metrics
+from passenger import Passenger
+from simulation import Simulation
+from traffic import generate_trips, iter_trips, TripFeeder
+
+
+def test_destination_dispatcher_negative_window():
+    with pytest.raises(ValueError):
+        DestinationDispatcher(-1)
+
+
+def test_group_calls_fewest_trips_then_stops():
+    building = Building(10, 1, 4, 1, event_sink=NULL_SINK)
+    passengers = [Passenger(1, floor, building) for floor in (5, 9, 5, 6, 9, 6)]
+
+    groups = DestinationDispatcher.group_calls(passengers, 4)
+
+    assert len(groups) == 2
+    assert [sorted({passenger.desired_floor for passenger in group}) for group in groups] == [[5, 6], [9]]
+
+
+def test_calls_are_held_until_the_end_of_the_window():
+    building = Building(10, 2, 4, 1, dispatcher=DestinationDispatcher(window=10), event_sink=NULL_SINK)
+    simulation = Simulation()
+    simulation.add_building(building)
+    first, second = Passenger(1, 7, building), Passenger(1, 7, building)
+    simulation.add_passenger(first, 0)
+    simulation.add_passenger(second, 4)
+
+    simulation.run(until=5)
+    assert first.car is None and second.car is None
+
+    building.stop_elevator()
+    simulation.run()
+    assert first.car is second.car
+    assert first.call_time == 0 and second.call_time == 4
+    assert first.get_journey_time() is not None and second.get_journey_time() is not None
+
+
+def test_groups_respect_capacity():
+    building = Building(10, 2, 3, 1, dispatcher=DestinationDispatcher(window=5), event_sink=NULL_SINK)
+    simulation = Simulation()
+    simulation.add_building(building)
+    passengers = [Passenger(1, 8, building) for item in range(6)]
+    for passenger in passengers:
+        simulation.add_passenger(passenger, 0)
+
+    simulation.run(until=5)
+
+    assert sorted(len(car.pending_passengers) for car in building.cars) == [3, 3]
+
+
+def up_peak_ride_stops(dispatcher):
+    building = Building(16, 4, 12, 1, dispatcher=dispatcher, event_sink=NULL_SINK)
+    metrics = Metrics()
+    simulation = Simulation(metrics=metrics)
+    simulation.add_building(building)
+    trips = generate_trips({'up_peak': 0.4}, 600, 16, rng=np.random.default_rng(1))
+    TripFeeder(simulation, building, iter_trips(*trips))
+    building.stop_elevator()
+    simulation.run()
+    assert metrics.journey_time.count == len(trips[0])
+    return metrics.ride_stops.get_mean()
+
+
+def test_destination_dispatch_needs_fewer_stops_in_up_peak():
+    assert up_peak_ride_stops(DestinationDispatcher(window=5)) < up_peak_ride_stops(RouteCostDispatcher())
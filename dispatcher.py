@@ -0,0 +1,428 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from elevator import Elevator, ElevatorStatus, ElevatorDirection
+from eta import RouteCost
+from optimizer import AssignmentProblem, CarState, Call, anneal
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from passenger import Passenger
+    from simulation import Simulation
+
+
+class Dispatcher:
+    """
+    Group control policy: decides which car of the building answers a hall call
+    """
+    on_assign = None  # called with (passenger, car) when a held call is given to a car
+
+    def attach(self, simulation: "Simulation", cars: list) -> None:
+        """
+        Called when the building is added to a simulation, for dispatchers which schedule events
+
+        :param simulation: Simulation instance
+        :param cars: Elevator instances of the building
+        :return: None
+        """
+
+    def select_car(self, cars: list, passenger: "Passenger") -> Optional[Elevator]:
+        """
+        Choose the car which will serve the passenger
+
+        :param cars: Elevator instances of the building
+        :param passenger: Passenger instance who made the call
+        :return: Elevator instance, None if the dispatcher holds the call to assign it later
+        """
+        raise NotImplementedError
+
+    def cancel(self, passenger_id: int) -> bool:
+        """
+        Withdraw a call the dispatcher holds and has not given to a car yet
+
+        :param passenger_id: Passenger ID
+        :return: bool, False if the dispatcher does not hold the call
+        """
+        return False
+
+    @staticmethod
+    def get_cars_with_room(cars: list, passenger: "Passenger") -> list:
+        """
+        Cars where the passenger would fit now, so that a full car is not sent to more hall calls;
+        all cars when every one of them is full
+
+        :param cars: Elevator instances of the building
+        :param passenger: Passenger instance who made the call
+        :return: list of Elevator instances
+        """
+        size = passenger.size
+        return [car for car in cars if car.has_room(size)] or cars
+
+
+class NearestCarDispatcher(Dispatcher):
+    """
+    Assign the call to the car closest to the passenger's floor; among cars at the same distance
+    prefer the one with fewer calls
+    """
+
+    def select_car(self, cars: list, passenger: "Passenger") -> Elevator:
+        return min(self.get_cars_with_room(cars, passenger),
+                   key=lambda car: (abs(car.current_floor - passenger.current_floor), len(car.call_queue)))
+
+
+class ZonedDispatcher(Dispatcher):
+    """
+    The floors are split into contiguous zones, one per car (or per group of cars). Every trip is
+    served by a car of the zone of its upper floor, so the lobby is shared by all zones
+    """
+
+    def __init__(self, zones: list = None):
+        self.zones = zones  # list of (first floor, last floor), split evenly when omitted
+        self.nearest = NearestCarDispatcher()  # chooses among the cars of the zone
+
+    def get_zones(self, cars: list) -> list:
+        """
+        Returns the zones of the cars, splitting the building evenly if zones were not given
+
+        :param cars: Elevator instances of the building
+        :return: list of (first floor, last floor), one per car
+        """
+        if self.zones is not None:
+            if len(self.zones) != len(cars):
+                raise ValueError("zones must contain one zone per car")
+            return self.zones
+
+        max_floor = cars[0].max_floor
+        min_floor = cars[0].min_floor
+        floors_count = max_floor - min_floor + 1
+        zones = []
+        for index in range(len(cars)):
+            first_floor = min_floor + floors_count * index // len(cars)
+            last_floor = min_floor + floors_count * (index + 1) // len(cars) - 1
+            zones.append((first_floor, max(first_floor, last_floor)))
+        return zones
+
+    def select_car(self, cars: list, passenger: "Passenger") -> Elevator:
+        floor = max(passenger.current_floor, passenger.desired_floor)
+        zone_cars = [car for car, (first_floor, last_floor) in zip(cars, self.get_zones(cars))
+                     if first_floor <= floor <= last_floor]
+        return self.nearest.select_car(zone_cars or cars, passenger)
+
+
+class EtaDispatcher(Dispatcher):
+    """
+    Assign the call to the car with the lowest estimated time of arrival at the passenger's floor,
+    taking into account the stops the car has already committed to
+    """
+
+    def estimate_time(self, car: Elevator, floor: int) -> float:
+        """
+        Estimated time for the car to reach the floor, following its current route
+
+        :param car: Elevator instance
+        :param floor: Floor of the call
+        :return: estimated time in simulated seconds
+        """
+        route = list(car.call_queue)
+        if car.status is ElevatorStatus.MOVING:
+            route.insert(0, car.floor_to_reach)
+
+        time = 0.0
+        position = car.current_floor
+        for stop in route:
+            # The call is on the way to the next stop
+            if min(position, stop) <= floor <= max(position, stop):
+                return time + car.get_travel_time(position, floor)
+            time += car.get_travel_time(position, stop) + car.door.tick_rate
+            position = stop
+        return time + car.get_travel_time(position, floor)
+
+    def select_car(self, cars: list, passenger: "Passenger") -> Elevator:
+        return min(self.get_cars_with_room(cars, passenger),
+                   key=lambda car: self.estimate_time(car, passenger.current_floor))
+
+
+class RouteCostDispatcher(Dispatcher):
+    """
+    Assign the call to the car with the lowest estimated time of arrival, for cars following
+    collective control (LookScheduler). Every car keeps an incremental RouteCost, so the estimate
+    does not walk the route of the car
+    """
+
+    def get_route_cost(self, car: Elevator) -> RouteCost:
+        if car.route_cost is None:
+            car.route_cost = RouteCost(car)
+        return car.route_cost
+
+    def select_car(self, cars: list, passenger: "Passenger") -> Elevator:
+        direction = ElevatorDirection.UP if passenger.desired_floor > passenger.current_floor \
+            else ElevatorDirection.DOWN
+        return min(self.get_cars_with_room(cars, passenger),
+                   key=lambda car: self.get_route_cost(car).insertion_cost(passenger.current_floor, direction))
+
+
+class DestinationDispatcher(RouteCostDispatcher):
+    """
+    Destination dispatch: calls are collected over a batching window, passengers with the same
+    origin and direction are grouped by destination into car loads with as few stops as possible,
+    and every group is given to the car where it costs the least time. Without a simulation the
+    calls are assigned one by one
+    """
+
+    def __init__(self, window: float = 5.0):
+        if window < 0:
+            raise ValueError("window must be higher than 0")
+        self.window = window  # simulated seconds during which calls are collected
+        self.simulation = None
+        self.cars = []
+        self.batch = []  # passengers waiting for the end of the window
+
+    def attach(self, simulation: "Simulation", cars: list) -> None:
+        self.simulation = simulation
+        self.cars = cars
+
+    def select_car(self, cars: list, passenger: "Passenger") -> Optional[Elevator]:
+        if self.simulation is None or self.window == 0:
+            return self.assign_groups(cars, [passenger])[0][0]
+        if passenger.call_time is None:
+            passenger.call_time = self.simulation.now
+        if not self.batch:
+            self.simulation.schedule(self.window, self.flush)
+        self.batch.append(passenger)
+        return None
+
+    def cancel(self, passenger_id: int) -> bool:
+        for index, passenger in enumerate(self.batch):
+            if passenger.id == passenger_id:
+                del self.batch[index]
+                return True
+        return False
+
+    def flush(self) -> None:
+        """
+        End of the batching window: assign the collected calls and wake the cars
+
+        :return: None
+        """
+        batch, self.batch = self.batch, []
+        for car, group in self.assign_groups(self.cars, batch):
+            for passenger in group:
+                passenger.car = car
+                car.call_elevator(passenger)
+                if self.on_assign is not None:
+                    self.on_assign(passenger, car)
+        self.simulation.wake_elevators()
+
+    @staticmethod
+    def group_calls(passengers: list, capacity: int) -> list:
+        """
+        Split passengers with the same origin and direction into loads of at most capacity. The
+        passengers are ordered by destination and cut into contiguous loads; the cuts are chosen
+        by dynamic programming to need the fewest trips and then the fewest stops
+
+        :param passengers: Passenger instances with the same origin and direction
+        :param capacity: Maximal load of a car
+        :return: list of groups
+        """
+        passengers = sorted(passengers, key=lambda passenger: passenger.desired_floor)
+        count = len(passengers)
+        best = [(0, 0)] + [None] * count  # (trips, stops) of the first i passengers
+        cut = [0] * (count + 1)
+        for end in range(1, count + 1):
+            destinations = set()
+            for start in range(end - 1, max(-1, end - capacity - 1), -1):
+                destinations.add(passengers[start].desired_floor)
+                trips, stops = best[start]
+                candidate = (trips + 1, stops + len(destinations))
+                if best[end] is None or candidate < best[end]:
+                    best[end] = candidate
+                    cut[end] = start
+
+        groups = []
+        end = count
+        while end > 0:
+            groups.append(passengers[cut[end]:end])
+            end = cut[end]
+        return groups[::-1]
+
+    def get_group_cost(self, car: Elevator, group: list, direction: ElevatorDirection, load: int) -> tuple:
+        """
+        Cost of giving the group to the car: whether it fits, then the time to reach the origin
+        plus one door cycle for every stop the group adds
+
+        :return: tuple to minimise
+        """
+        origin = group[0].current_floor
+        new_stops = {passenger.desired_floor for passenger in group} - set(car.car_calls) - \
+            set(car.pending_desired_floors)
+        time = self.get_route_cost(car).insertion_cost(origin, direction) + len(new_stops) * car.door.tick_rate
+        return load + len(group) > car.max_passengers, time
+
+    def assign_groups(self, cars: list, passengers: list) -> list:
+        """
+        Group the calls and choose a car for every group, the largest groups first
+
+        :param cars: Elevator instances of the building
+        :param passengers: Passenger instances who called
+        :return: list of (car, group)
+        """
+        calls = {}
+        for passenger in passengers:
+            direction = ElevatorDirection.UP if passenger.desired_floor > passenger.current_floor \
+                else ElevatorDirection.DOWN
+            calls.setdefault((passenger.current_floor, direction), []).append(passenger)
+
+        capacity = cars[0].max_passengers
+        groups = [(direction, group) for (origin, direction), same_calls in calls.items()
+                  for group in self.group_calls(same_calls, capacity)]
+        groups.sort(key=lambda item: len(item[1]), reverse=True)
+
+        # Passengers already given to a car, which compete with the group for room
+        loads = {car: len(car.passengers) + len(car.pending_passengers) for car in cars}
+        assignments = []
+        for direction, group in groups:
+            car = min(cars, key=lambda car: self.get_group_cost(car, group, direction, loads[car]))
+            loads[car] += len(group)
+            assignments.append((car, group))
+        return assignments
+
+
+class EnergyAwareDispatcher(RouteCostDispatcher):
+    """
+    Like RouteCostDispatcher, but the time of every car is weighed against the energy it needs to
+    reach the passenger's floor with its current load, for cars with an energy meter
+    """
+
+    def __init__(self, energy_weight: float = 1.0):
+        self.energy_weight = energy_weight  # simulated seconds one kJ is worth
+
+    def get_cost(self, car: Elevator, passenger: "Passenger", direction: ElevatorDirection) -> float:
+        cost = self.get_route_cost(car).insertion_cost(passenger.current_floor, direction)
+        if car.energy_meter is not None:
+            model = car.energy_meter.model
+            positions = car.energy_meter.positions
+            if positions is None:
+                distance = (passenger.current_floor - car.current_floor) * model.floor_height
+            else:
+                distance = positions[passenger.current_floor] - positions[car.current_floor]
+            cost += self.energy_weight * model.get_trip_energy(len(car.passengers), distance) / 1000
+        return cost
+
+    def select_car(self, cars: list, passenger: "Passenger") -> Elevator:
+        direction = ElevatorDirection.UP if passenger.desired_floor > passenger.current_floor \
+            else ElevatorDirection.DOWN
+        return min(self.get_cars_with_room(cars, passenger), key=lambda car: self.get_cost(car, passenger, direction))
+
+
+class OptimizingDispatcher(RouteCostDispatcher):
+    """
+    A new call goes at once to the car with the lowest estimated time of arrival; then, every
+    cycle while passengers are waiting, all waiting calls are reassigned by simulated annealing
+    over the car of every call, scored by the predicted waiting times (optimizer.AssignmentProblem).
+    The search starts from the current assignment, which is the best one of the previous cycle
+    plus the calls which arrived since, and stops when its CPU budget is spent. With workers, as
+    many independent searches run in worker processes and the best result is kept
+    """
+
+    def __init__(self, cycle: float = 2.0, budget: float = 0.005, workers: int = 0, seed: int = 0):
+        if cycle <= 0:
+            raise ValueError("cycle must be higher than 0")
+        if budget <= 0:
+            raise ValueError("budget must be higher than 0")
+        self.cycle = cycle  # simulated seconds between two optimizations
+        self.budget = budget  # CPU seconds of one search
+        self.workers = workers  # worker processes, 0 to search in this process
+        self.rng = random.Random(seed)
+        self.simulation = None
+        self.cars = []
+        self.scheduled = False  # an optimization is scheduled
+        self.executor = None
+        self._travel_times = None
+
+    def attach(self, simulation: "Simulation", cars: list) -> None:
+        self.simulation = simulation
+        self.cars = cars
+
+    def select_car(self, cars: list, passenger: "Passenger") -> Elevator:
+        if self.simulation is not None and not self.scheduled:
+            self.simulation.schedule(self.cycle, self.optimize)
+            self.scheduled = True
+        return super().select_car(cars, passenger)
+
+    def get_travel_times(self) -> list:
+        """
+        Flight times between every pair of floors; the cars of a building share them
+
+        :return: list of lists, index = floor
+        """
+        if self._travel_times is None:
+            car = self.cars[0]
+            if car.travel_times is not None:
+                self._travel_times = car.travel_times.times
+            else:
+                floors = range(car.max_floor + 1)
+                self._travel_times = [[abs(destination - origin) * car.tick_rate for destination in floors]
+                                      for origin in floors]
+        return self._travel_times
+
+    def get_problem(self, waiting: list) -> AssignmentProblem:
+        """
+        Search problem of the waiting passengers
+
+        :param waiting: Passenger instances waiting for a car
+        :return: AssignmentProblem
+        """
+        now = self.simulation.now
+        cars = [CarState(car.current_floor, 1 if car.direction is ElevatorDirection.UP else -1, tuple(car.car_calls))
+                for car in self.cars]
+        calls = [Call(passenger.current_floor, 1 if passenger.desired_floor > passenger.current_floor else -1,
+                      now - passenger.call_time) for passenger in waiting]
+        return AssignmentProblem(cars, calls, self.get_travel_times(), self.cars[0].door.tick_rate)
+
+    def search(self, problem: AssignmentProblem, start: list) -> list:
+        """
+        Best assignment found within the budget
+
+        :param problem: AssignmentProblem
+        :param start: Car index of every call to start from
+        :return: car index of every call
+        """
+        if not self.workers:
+            return anneal(problem, start, self.budget, self.rng.getrandbits(32))[0]
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [self.executor.submit(anneal, problem, start, self.budget, self.rng.getrandbits(32))
+                   for worker in range(self.workers)]
+        return min((future.result() for future in futures), key=lambda result: result[1])[0]
+
+    def optimize(self) -> None:
+        """
+        One cycle: reassign the waiting calls, moving the calls whose car changed without events
+
+        :return: None
+        """
+        self.scheduled = False
+        waiting = [passenger for car in self.cars for passenger in car.pending_passengers.values()]
+        if not waiting:
+            return
+
+        numbers = {car: number for number, car in enumerate(self.cars)}
+        start = [numbers[passenger.car] for passenger in waiting]
+        for passenger, number in zip(waiting, self.search(self.get_problem(waiting), start)):
+            car = self.cars[number]
+            if car is not passenger.car:
+                passenger.car.transfer_call(passenger.id, car)
+        self.simulation.wake_elevators()
+        self.simulation.schedule(self.cycle, self.optimize)
+        self.scheduled = True
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes
+
+        :return: None
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -1,47 +1,39 @@
-from enum import Enum
-from time import sleep
 from collections import deque
-from itertools import islice
-from uuid import UUID
-
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, AsyncIterable
+
+from async_simulation import AsyncSimulation
+from capacity import ADULT, NO_GROUP, CarLoad, PassengerSize
+from energy import EnergyMeter
+from events import EventSink, EventType, CONSOLE_SINK
+from floors import CallQueue, FloorSet
+from scheduler import Scheduler, LookScheduler
+from states import DoorStatus, ElevatorStatus, ElevatorDirection
+from store import PassengerStore
+from simulation import Simulation, RealTimePacer, VirtualClock
 
 if TYPE_CHECKING:
+    from parking import ParkingPolicy
+    from energy import EnergyModel
+    from kinematics import TravelTimeTable
+    from metrics import Metrics
     from passenger import Passenger
-
-
-class DoorStatus(Enum):
-    CLOSED = 1
-    OPENED = 2
-
-
-class ElevatorStatus(Enum):
-    IDLE = 1
-    MOVING = 2
-
-
-class ElevatorDirection(Enum):
-    UP = 1
-    DOWN = 2
+    from profiling import Profiler
 
 
 class Door:
-    status = DoorStatus.CLOSED
-
-    def __init__(self, tick_rate=1.0):
+    def __init__(self, tick_rate=1.0, clock: VirtualClock = None):
+        self.status = DoorStatus.CLOSED
         self.tick_rate = tick_rate
+        self.clock = clock if clock is not None else VirtualClock()
 
     def open(self) -> None:
         if not self.is_opened():
             self.status = DoorStatus.OPENED
-            print("Door opened")
 
     def close(self) -> None:
-        print("Door closing...")
-        sleep(self.tick_rate)
+        self.clock.sleep(self.tick_rate)
         if self.is_opened():
             self.status = DoorStatus.CLOSED
-            print("Door closed")
 
     def is_opened(self) -> bool:
         if self.status is DoorStatus.OPENED:
@@ -51,20 +43,10 @@ class Door:
 
 
 class Elevator:
-    status = ElevatorStatus.IDLE
-    direction = ElevatorDirection.UP
-
-    pending_passengers = {}  # passengers waiting for the elevator
-    passengers = {}  # passengers in the elevator
-
-    current_floor = 1
-    min_floor = 1
-    need_to_stop = False
-
-    floor_to_reach = current_floor
-    call_queue = deque([])  # queue of floors which elevator have to visit
-
-    def __init__(self, max_floor: int, max_passengers: int, tick_rate=1.0):
+    def __init__(self, max_floor: int, max_passengers: int, tick_rate=1.0, event_sink: EventSink = CONSOLE_SINK,
+                 scheduler: Scheduler = None, travel_times: "TravelTimeTable" = None,
+                 energy_model: "EnergyModel" = None, parking_policy: "ParkingPolicy" = None,
+                 rated_load: float = None, car_area: float = None, reservations: bool = False):
         if max_floor < 1:
             raise ValueError("max_floor must be higher than 1")
         else:
@@ -79,7 +61,84 @@ class Elevator:
             raise ValueError("tick_rate must be higher than 1")
         else:
             self.tick_rate = tick_rate  # Delay in performing actions (opening a door, moving one floor)
-        self.door = Door(tick_rate)
+
+        # All state lives on the instance, so that a snapshot of the elevator is complete
+        self.status = ElevatorStatus.IDLE
+        self.direction = ElevatorDirection.UP
+        self.current_floor = 1
+        self.min_floor = 1
+        self.need_to_stop = False
+        self.floor_to_reach = self.current_floor
+        self.departure_floor = self.current_floor  # floor where the current flight started
+
+        self.clock = VirtualClock()  # Simulated time, replaced by the simulation's clock when added to one
+        self.door = Door(tick_rate, self.clock)
+        self.event_sink = event_sink  # Receives the events of the car instead of printing them
+        self.number = 0  # Number of the car in its building
+        self.scheduler = scheduler if scheduler is not None else LookScheduler()
+        self.travel_times = travel_times  # Kinematic flight times, one tick_rate per floor when omitted
+        self.energy_meter = None  # Energy accumulator, when an energy model was given
+        if energy_model is not None:
+            self.energy_meter = EnergyMeter(energy_model, max_passengers,
+                                            travel_times.positions if travel_times is not None else None)
+        self.parking_policy = parking_policy  # Where the car waits when it has nothing to do
+        if parking_policy is not None:
+            parking_policy.attach([self])
+        self.repositioning = False  # moving to the parking floor without passengers
+        self.repositioned = False  # parked by the policy since the last call served
+        self.route_cost = None  # Incremental ETA of the stops, created by the dispatcher which uses it
+
+        # Load by passengers, kilograms and square metres; only the number of passengers is limited by default
+        self.load = CarLoad(max_passengers, rated_load, car_area)
+        self.reservations = reservations  # hold room for every passenger assigned to the car when it calls
+        self.reserved_waiting = {}  # (floor, direction) -> number of waiting passengers with reserved room
+        self.group_calls = False  # passengers of a group have called, they board together
+        self.capacity_version = 0  # changed with the load, the reservations and the hall queues
+        self._boardable = (-1, 0, 0)  # (capacity_version, up bits, down bits) of get_boardable_hall_calls()
+
+        # Every car has its own passengers and calls, so several elevators can run in one process
+        self.passenger_store = PassengerStore()  # data of the passengers, shared by the cars of a building
+        self.pending_passengers = {}  # passengers waiting for the elevator
+        self.passengers = {}  # passengers in the elevator
+        self.riders = {}  # Passenger instances of the passengers in the elevator
+        self.waiting = {}  # (floor, direction) -> deque of waiting Passenger instances in call order
+        self.alighting = {}  # desired floor -> IDs of the passengers in the elevator going there
+        self.floors_door_will_open = []  # floors on the way to floor_to_reach where the doors will open
+        self.call_queue = CallQueue()  # queue of floors which elevator have to visit
+
+        # Indexes maintained on every call, entry and exit so that no method has to scan the passengers
+        self.hall_calls_up = FloorSet()  # floors of waiting passengers who go up
+        self.hall_calls_down = FloorSet()  # floors of waiting passengers who go down
+        self.pending_desired_floors = FloorSet()  # floors where waiting passengers need to go
+        self.car_calls = FloorSet()  # floors where passengers in the elevator need to go
+
+    @property
+    def call_queue(self) -> CallQueue:
+        return self._call_queue
+
+    @call_queue.setter
+    def call_queue(self, floors) -> None:
+        self._call_queue = floors if isinstance(floors, CallQueue) else CallQueue(floors)
+
+    def get_hall_calls(self, passenger_instance: "Passenger") -> FloorSet:
+        """
+        Returns the index of waiting passengers going in the same direction as the passenger
+
+        :param passenger_instance: Passenger instance
+        :return: FloorSet of hall calls up or down
+        """
+        if passenger_instance.desired_floor > passenger_instance.current_floor:
+            return self.hall_calls_up
+        return self.hall_calls_down
+
+    def is_floor_awaited(self, floor: int) -> bool:
+        """
+        Checking whether passengers are waiting for the elevator on the floor
+
+        :param floor: Floor number
+        :return: bool
+        """
+        return floor in self.hall_calls_up or floor in self.hall_calls_down
 
     def print_status(self) -> None:
         """
@@ -90,6 +149,18 @@ class Elevator:
         print(f'Elevator status is: {self.status}')
         print('------------------')
 
+    def get_travel_time(self, origin: int, destination: int) -> float:
+        """
+        Time of a flight from origin to destination without stopping
+
+        :param origin: Floor where the flight starts
+        :param destination: Floor where the flight ends
+        :return: simulated seconds
+        """
+        if self.travel_times is None:
+            return abs(destination - origin) * self.tick_rate
+        return self.travel_times.get(origin, destination)
+
     def move(self) -> None:
         """
         Move the elevator one floor
@@ -97,49 +168,338 @@ class Elevator:
         :return: None
         """
         if self.status is ElevatorStatus.MOVING:
+            previous_floor = self.current_floor
             if self.direction is ElevatorDirection.UP and self.current_floor < self.max_floor:
                 self.current_floor += 1
             if self.direction is ElevatorDirection.DOWN and self.current_floor > self.min_floor:
                 self.current_floor -= 1
-            sleep(self.tick_rate)
-            print(f'Im on {self.current_floor} floor')
+            if self.travel_times is None:
+                duration = self.tick_rate
+            else:
+                # The hops of one flight add up to the flight time from the departure floor to the stop
+                duration = self.travel_times.get(self.departure_floor, self.current_floor) - \
+                    self.travel_times.get(self.departure_floor, previous_floor)
+            self.clock.sleep(duration)
+            if self.energy_meter is not None:
+                self.energy_meter.record_hop(previous_floor, self.current_floor, len(self.passengers), duration)
+            if self.event_sink.enabled:
+                self.event_sink.emit(self.clock.now, EventType.ARRIVE, self.number, self.current_floor)
 
-    def call_elevator(self, passenger_instance: "Passenger") -> None:
+    def call_elevator(self, passenger_instance: "Passenger", announce: bool = True) -> None:
         """
         Passenger calling the elevator
         This method determines whether the call was made from inside or outside
 
         :param passenger_instance: Passenger instance
+        :param announce: Emit the hall call, False for a call moved from another car
         :return: None
         """
-        self.pending_passengers[passenger_instance.uuid] = passenger_instance
-        if passenger_instance.uuid not in self.passengers.keys():
+        if self.load.limited and passenger_instance.id not in self.passengers and \
+                not self.load.fits_empty(passenger_instance.size):
+            raise ValueError("passenger does not fit in the empty car")
+        if passenger_instance.call_time is None:
+            passenger_instance.call_time = self.clock.now
+        if passenger_instance.id not in self.pending_passengers:
+            self.capacity_version += 1
+            if passenger_instance.group != NO_GROUP:
+                self.group_calls = True
+            self.get_hall_calls(passenger_instance).add(passenger_instance.current_floor)
+            self.pending_desired_floors.add(passenger_instance.desired_floor)
+            direction = ElevatorDirection.UP if passenger_instance.desired_floor > passenger_instance.current_floor \
+                else ElevatorDirection.DOWN
+            key = (passenger_instance.current_floor, direction)
+            if key not in self.waiting:
+                self.waiting[key] = deque()
+            self.waiting[key].append(passenger_instance)
+            if announce and self.event_sink.enabled:
+                # At the time of the call, which a dispatcher collecting calls may pass on later
+                self.event_sink.emit(passenger_instance.call_time, EventType.HALL_CALL, self.number,
+                                     passenger_instance.current_floor, passenger_instance.id)
+        self.pending_passengers[passenger_instance.id] = passenger_instance
+        if passenger_instance.id not in self.passengers:
+            if self.reservations:
+                self.reserve(passenger_instance)
             self.call_outside_elevator(passenger_instance.current_floor, passenger_instance.desired_floor)
         else:
             self.call_inside_elevator(passenger_instance.desired_floor)
 
-    def can_enter_elevator(self, current_passenger_floor: int) -> bool:
+    def cancel_call(self, passenger_id: int, announce: bool = True) -> bool:
+        """
+        Withdraw the call of a waiting passenger and take the passenger out of its hall queue
+
+        :param passenger_id: Passenger ID
+        :param announce: Emit the cancellation, False for a call moved to another car
+        :return: bool, False if the passenger is not waiting for this car
+        """
+        passenger_instance = self.pending_passengers.pop(passenger_id, None)
+        if passenger_instance is None:
+            return False
+        self.get_hall_calls(passenger_instance).remove(passenger_instance.current_floor)
+        self.pending_desired_floors.remove(passenger_instance.desired_floor)
+        self.release_reservation(passenger_instance)
+        key = (passenger_instance.current_floor, self.get_call_direction(passenger_instance))
+        queue = self.waiting.get(key)
+        if queue is not None:
+            for index, waiting_passenger in enumerate(queue):
+                if waiting_passenger.id == passenger_id:
+                    del queue[index]
+                    break
+            if not queue:
+                del self.waiting[key]
+        self.capacity_version += 1
+        if announce and self.event_sink.enabled:
+            self.event_sink.emit(self.clock.now, EventType.CANCEL, self.number, passenger_instance.current_floor,
+                                 passenger_id)
+        return True
+
+    def transfer_call(self, passenger_id: int, car: "Elevator") -> bool:
+        """
+        Move the call of a waiting passenger to another car of the building without emitting
+        events: for the passenger nothing happened. The reservation follows if the car has room
+
+        :param passenger_id: Passenger ID
+        :param car: Elevator instance taking over the call
+        :return: bool, False if the passenger is not waiting for this car
+        """
+        passenger_instance = self.pending_passengers.get(passenger_id)
+        if passenger_instance is None or not self.cancel_call(passenger_id, announce=False):
+            return False
+        passenger_instance.car = car
+        car.call_elevator(passenger_instance, announce=False)
+        return True
+
+    def can_enter_elevator(self, current_passenger_floor: int, passenger_id: int = None) -> bool:
         """
         Checking whether a passenger can enter the elevator
 
         :param current_passenger_floor:
+        :param passenger_id: Passenger ID, whose size and reservation are taken into account
+        :return: bool
+        """
+        if current_passenger_floor != self.current_floor:
+            return False
+        if passenger_id is None:
+            return self.has_room()
+        if passenger_id in self.load.reserved:
+            return True
+        store = self.passenger_store
+        return self.load.fits(len(self.passengers) + 1, store.weights[passenger_id], store.areas[passenger_id])
+
+    def has_room(self, size: PassengerSize = ADULT) -> bool:
+        """
+        Checking whether a passenger without reservation would fit in the car now
+
+        :param size: PassengerSize
+        :return: bool
+        """
+        if not self.load.limited:
+            return len(self.passengers) + len(self.load.reserved) < self.max_passengers
+        return self.load.fits(len(self.passengers) + 1, size.weight, size.area)
+
+    def reserve(self, passenger_instance: "Passenger") -> bool:
+        """
+        Hold room in the car for a waiting passenger assigned to it. Passengers of a group get no
+        reservation: the group boards together
+
+        :param passenger_instance: Passenger instance waiting for the car
+        :return: bool, False if there is no room left to hold
+        """
+        if passenger_instance.id not in self.pending_passengers or passenger_instance.group != NO_GROUP:
+            return False
+        if passenger_instance.id in self.load.reserved:
+            return True
+        if not self.load.reserve(passenger_instance.id, passenger_instance.size, len(self.passengers)):
+            return False
+        key = (passenger_instance.current_floor, self.get_call_direction(passenger_instance))
+        self.reserved_waiting[key] = self.reserved_waiting.get(key, 0) + 1
+        self.capacity_version += 1
+        return True
+
+    def release_reservation(self, passenger_instance: "Passenger") -> None:
+        """
+        Give up the room held for the passenger
+
+        :param passenger_instance: Passenger instance
+        :return: None
+        """
+        if self.load.release(passenger_instance.id):
+            key = (passenger_instance.current_floor, self.get_call_direction(passenger_instance))
+            self.reserved_waiting[key] -= 1
+            if not self.reserved_waiting[key]:
+                del self.reserved_waiting[key]
+            self.capacity_version += 1
+
+    @staticmethod
+    def get_call_direction(passenger_instance: "Passenger") -> ElevatorDirection:
+        if passenger_instance.desired_floor > passenger_instance.current_floor:
+            return ElevatorDirection.UP
+        return ElevatorDirection.DOWN
+
+    def fits(self, unit: list) -> bool:
+        """
+        Checking whether waiting passengers boarding together fit in the car
+
+        :param unit: Passenger instances
+        :return: bool
+        """
+        count, weight, area = len(self.passengers), 0.0, 0.0
+        for passenger_instance in unit:
+            # Reserved room is already counted
+            if passenger_instance.id not in self.load.reserved:
+                size = passenger_instance.size
+                count += 1
+                weight += size.weight
+                area += size.area
+        return self.load.fits(count, weight, area)
+
+    def get_boarding(self, unit: list) -> list:
+        """
+        Passengers of the unit who can enter now: all of them, or none unless the car is empty,
+        where a group too large for the car boards in part
+
+        :param unit: Passenger instances boarding together
+        :return: list of Passenger instances
+        """
+        if self.fits(unit):
+            return unit
+        if self.passengers or len(unit) == 1:
+            return []
+        boarding = []
+        for passenger_instance in unit:
+            if not self.fits(boarding + [passenger_instance]):
+                break
+            boarding.append(passenger_instance)
+        return boarding
+
+    def get_head_unit(self, queue: deque) -> list:
+        """
+        Passengers at the head of a hall queue who board together: one passenger, or the following
+        passengers of the same group. Passengers who are no longer waiting are skipped
+
+        :param queue: deque of Passenger instances in call order
+        :return: list of Passenger instances
+        """
+        unit = []
+        group = NO_GROUP
+        for passenger_instance in queue:
+            if passenger_instance.id not in self.pending_passengers:
+                continue
+            if not unit:
+                unit.append(passenger_instance)
+                group = passenger_instance.group
+                if group == NO_GROUP:
+                    break
+            elif passenger_instance.group == group:
+                unit.append(passenger_instance)
+            else:
+                break
+        return unit
+
+    def pop_unit(self, queue: deque) -> list:
+        """
+        Remove the head unit from the hall queue, with the passengers no longer waiting before it
+
+        :param queue: deque of Passenger instances in call order
+        :return: list of Passenger instances, see get_head_unit()
+        """
+        unit = self.get_head_unit(queue)
+        for passenger_instance in unit:
+            while queue.popleft() is not passenger_instance:
+                pass
+        return unit
+
+    def can_board(self, floor: int, direction: ElevatorDirection) -> bool:
+        """
+        Checking whether somebody of the hall queue would enter if the car opened its doors
+
+        :param floor: Floor number
+        :param direction: Direction of the queue
         :return: bool
         """
-        if len(self.passengers) < self.max_passengers and current_passenger_floor == self.current_floor:
+        # A reserved passenger always fits and does not wait behind the others
+        if self.reserved_waiting.get((floor, direction)):
             return True
-        return False
+        queue = self.waiting.get((floor, direction))
+        return bool(queue) and bool(self.get_boarding(self.get_head_unit(queue)))
+
+    def get_boardable_hall_calls(self, direction: ElevatorDirection = None) -> int:
+        """
+        Bitset of the floors with hall calls the car can take now, so that a car without room for
+        the waiting passengers does not stop for them
 
-    def enter_elevator(self, passenger_uuid: UUID, desired_floor: int) -> None:
+        :param direction: Direction of the hall calls, both when omitted
+        :return: int
+        """
+        if len(self.passengers) >= self.max_passengers:
+            return 0
+        if not self.load.limited and not self.load.reserved and not self.group_calls:
+            up, down = self.hall_calls_up.bits, self.hall_calls_down.bits
+        else:
+            version, up, down = self._boardable
+            if version != self.capacity_version:
+                up = sum(1 << floor for floor in self.hall_calls_up if self.can_board(floor, ElevatorDirection.UP))
+                down = sum(1 << floor for floor in self.hall_calls_down
+                           if self.can_board(floor, ElevatorDirection.DOWN))
+                self._boardable = (self.capacity_version, up, down)
+        if direction is ElevatorDirection.UP:
+            return up
+        if direction is ElevatorDirection.DOWN:
+            return down
+        return up | down
+
+    def enter_elevator(self, passenger_id: int, desired_floor: int) -> None:
         """
         Method of entry of one passenger into the elevator
 
-        :param passenger_uuid: Passenger ID
+        :param passenger_id: Passenger ID
         :param desired_floor: The floor needs to go to
         :return: None
         """
-        self.passengers[passenger_uuid] = desired_floor
-        self.pending_passengers.pop(passenger_uuid)
-        print(f'Passenger with uuid = {passenger_uuid} entered elevator')
+        passenger_instance = self.pending_passengers[passenger_id]
+        self.release_reservation(passenger_instance)
+        del self.pending_passengers[passenger_id]
+        self.get_hall_calls(passenger_instance).remove(passenger_instance.current_floor)
+        self.pending_desired_floors.remove(passenger_instance.desired_floor)
+        self.board(passenger_instance, desired_floor)
+
+    def add_rider(self, passenger_instance: "Passenger") -> None:
+        """
+        Car call of a passenger who is already in the car at its current floor: the passenger is
+        on board at once, without a hall call
+
+        :param passenger_instance: Passenger instance at the floor of the car
+        :return: None
+        """
+        if passenger_instance.current_floor != self.current_floor:
+            raise ValueError("current_floor must be the floor of the car")
+        if passenger_instance.call_time is None:
+            passenger_instance.call_time = self.clock.now
+        passenger_instance.car = self
+        self.board(passenger_instance, passenger_instance.desired_floor)
+        self.call_inside_elevator(passenger_instance.desired_floor)
+
+    def board(self, passenger_instance: "Passenger", desired_floor: int) -> None:
+        """
+        Put the passenger in the car
+
+        :param passenger_instance: Passenger instance
+        :param desired_floor: The floor needs to go to
+        :return: None
+        """
+        passenger_id = passenger_instance.id
+        if self.load.limited:
+            self.load.add(passenger_instance.size)
+        self.capacity_version += 1
+        passenger_instance.board_time = self.clock.now
+        self.passengers[passenger_id] = desired_floor
+        self.riders[passenger_id] = passenger_instance
+        self.car_calls.add(desired_floor)
+        if desired_floor in self.alighting:
+            self.alighting[desired_floor].append(passenger_id)
+        else:
+            self.alighting[desired_floor] = [passenger_id]
+        if self.event_sink.enabled:
+            self.event_sink.emit(self.clock.now, EventType.BOARD, self.number, self.current_floor, passenger_id)
 
     def call_inside_elevator(self, desired_floor: int) -> None:
         """
@@ -166,8 +526,7 @@ class Elevator:
 
         # The case when the queue already contains desired_floor with a zero element, i.e. the elevator is already
         # heading there, but the passenger did not enter the elevator due to overcrowding
-        if desired_floor not in list(
-                islice(self.call_queue, 1, len(self.call_queue))):
+        if self.call_queue.count(desired_floor) == 1 and self.call_queue.peek() == desired_floor:
             self.call_queue.append(desired_floor)
 
     def release_passengers(self) -> None:
@@ -176,10 +535,20 @@ class Elevator:
 
         :return: None
         """
-        for key, desired_floor in list(self.passengers.items()):
-            if desired_floor == self.current_floor:
-                self.passengers.pop(key)
-                print(f'Passenger with uuid = {key} exited from elevator')
+        if self.current_floor not in self.car_calls:
+            return
+
+        # Only the passengers going to this floor are touched
+        for key in self.alighting.pop(self.current_floor):
+            self.passengers.pop(key)
+            passenger_instance = self.riders.pop(key)
+            passenger_instance.alight_time = self.clock.now
+            if self.load.limited:
+                self.load.remove(passenger_instance.size)
+            self.capacity_version += 1
+            self.car_calls.remove(self.current_floor)
+            if self.event_sink.enabled:
+                self.event_sink.emit(self.clock.now, EventType.ALIGHT, self.number, self.current_floor, key)
 
     def stop_elevator(self) -> None:
         """
@@ -195,14 +564,64 @@ class Elevator:
 
         :return: None
         """
-        for key, passenger_instance in list(self.pending_passengers.items()):
-            if passenger_instance.current_floor == self.current_floor:
-                passenger_instance.enter_elevator()
-
-        # Passengers who do not have time to enter are put back in queue
-        for key, passenger_instance in list(self.pending_passengers.items()):
-            if passenger_instance.current_floor == self.current_floor:
-                passenger_instance.call_elevator()
+        if not self.is_floor_awaited(self.current_floor):
+            return
+
+        # Passengers going in the direction of the car first, each queue in call order. On the way
+        # to floor_to_reach the car keeps its direction, so the other queue boards only where the
+        # trip ends and the car may turn around
+        directions = [self.direction]
+        if self.status is ElevatorStatus.IDLE or self.current_floor == self.floor_to_reach:
+            directions.append(ElevatorDirection.DOWN if self.direction is ElevatorDirection.UP
+                              else ElevatorDirection.UP)
+        for direction in directions:
+            key = (self.current_floor, direction)
+            queue = self.waiting.get(key)
+            if queue:
+                self.board_queue(key, queue)
+            if queue is not None and not queue:
+                del self.waiting[key]
+
+        # Passengers who do not have time to enter stay in their queue, the elevator only has to come back
+        if self.is_floor_awaited(self.current_floor) and self.current_floor not in self.call_queue:
+            self.call_queue.append(self.current_floor)
+
+    def board_queue(self, key: tuple, queue: deque) -> None:
+        """
+        Let the passengers of one hall queue in, in call order and a group all at once. The first
+        passenger who does not fit stops the queue; only passengers with reserved room go past
+
+        :param key: (floor, direction) of the queue
+        :param queue: deque of Passenger instances in call order
+        :return: None
+        """
+        if not self.load.limited and not self.load.reserved and not self.group_calls:
+            while queue and len(self.passengers) < self.max_passengers:
+                passenger_instance = queue.popleft()
+                # Passengers who entered on their own are removed from the queue only now
+                if passenger_instance.id in self.pending_passengers:
+                    self.enter_elevator(passenger_instance.id, passenger_instance.desired_floor)
+            return
+
+        skipped = []
+        blocked = False
+        while queue:
+            unit = self.pop_unit(queue)
+            if not unit:
+                break
+            reserved = unit[0].id in self.load.reserved
+            if reserved or not blocked:
+                boarding = self.get_boarding(unit)
+                for passenger_instance in boarding:
+                    self.enter_elevator(passenger_instance.id, passenger_instance.desired_floor)
+                unit = unit[len(boarding):]
+                if not unit:
+                    continue
+            blocked = True
+            skipped.extend(unit)
+            if not self.reserved_waiting.get(key):
+                break
+        queue.extendleft(reversed(skipped))
 
     def get_pending_floors(self) -> list:
         """
@@ -227,9 +646,14 @@ class Elevator:
         :return: None
         """
         self.door.open()
+        if self.event_sink.enabled:
+            self.event_sink.emit(self.clock.now, EventType.DOOR_OPEN, self.number, self.current_floor)
         self.release_passengers()
         self.enter_pending_passengers()
         self.door.close()
+        self.departure_floor = self.current_floor
+        if self.event_sink.enabled:
+            self.event_sink.emit(self.clock.now, EventType.DOOR_CLOSE, self.number, self.current_floor)
 
     def set_direction(self) -> None:
         """
@@ -239,9 +663,13 @@ class Elevator:
         """
         if self.current_floor < self.floor_to_reach:
             self.direction = ElevatorDirection.UP
-        else:
+        elif self.current_floor > self.floor_to_reach:
             self.direction = ElevatorDirection.DOWN
         self.status = ElevatorStatus.MOVING
+        self.departure_floor = self.current_floor
+        self.floors_door_will_open = []
+        if self.event_sink.enabled:
+            self.event_sink.emit(self.clock.now, EventType.DEPART, self.number, self.current_floor)
 
     def get_floors_to_open(self) -> list:
         """
@@ -249,74 +677,117 @@ class Elevator:
 
         :return: list of floors to visit
         """
-        pending_floors = self.get_pending_floors()
-        desired_floors = self.get_desired_floors()
-        floors_door_will_open = []
-
         if self.direction is ElevatorDirection.UP:
-            possible_floors = [x for x in self.call_queue if self.current_floor <= x <= self.floor_to_reach]
-            for floor in possible_floors:
-                # Check that the floor in the queue is expected by either internal elevator passengers or
-                # waiting passengers
-                if floor in self.passengers.values() or floor in pending_floors:
-                    floors_door_will_open.append(floor)
-
-                    # Do not remove from the queue floors that are in the next queue, but which are needed
-                    # by waiting passengers
-                    if floor not in pending_floors and floor not in desired_floors:
-                        self.call_queue = deque([x for x in self.call_queue if x != floor])
+            lowest_floor, highest_floor = self.current_floor, self.floor_to_reach
         else:
-            possible_floors = [x for x in self.call_queue if self.current_floor >= x >= self.floor_to_reach]
-            for floor in possible_floors:
-                if floor in self.passengers.values() or floor in pending_floors:
-                    floors_door_will_open.append(floor)
+            lowest_floor, highest_floor = self.floor_to_reach, self.current_floor
 
-                    if floor not in pending_floors and floor not in desired_floors:
-                        self.call_queue = deque([x for x in self.call_queue if x != floor])
+        # Floors in the queue which are expected by either internal elevator passengers or waiting passengers
+        stops = self.call_queue.floors.bits & \
+            (self.car_calls.bits | self.hall_calls_up.bits | self.hall_calls_down.bits) & \
+            FloorSet.range_mask(lowest_floor, highest_floor)
+        floors_door_will_open = FloorSet.bits_to_floors(stops, self.direction is ElevatorDirection.DOWN)
+
+        for floor in floors_door_will_open:
+            # Do not remove from the queue floors that are in the next queue, but which are needed
+            # by waiting passengers
+            if not self.is_floor_awaited(floor) and floor not in self.pending_desired_floors:
+                self.call_queue.remove_floor(floor)
 
         return floors_door_will_open
 
-    def run(self) -> None:
+    def is_finished(self) -> bool:
         """
-        Starting the elevator
+        Checking whether the elevator was stopped and has nothing left to do
 
-        :return: None
+        :return: bool
         """
-        while True:
-            self.print_status()
+        return self.need_to_stop and len(self.passengers) == 0 and \
+            len(self.pending_passengers) == 0 and self.status is ElevatorStatus.IDLE
 
-            # Stopping elevator when passengers do not need it and when it is not moving anywhere
-            if self.need_to_stop and len(self.passengers) == 0 and \
-                    len(self.pending_passengers) == 0 and self.status is ElevatorStatus.IDLE:
-                break
+    def is_parked(self) -> bool:
+        """
+        Checking whether the elevator is standing without calls
 
-            if self.status is ElevatorStatus.IDLE:
-                if self.call_queue:
-                    self.floor_to_reach = self.call_queue.popleft()
+        :return: bool
+        """
+        return self.status is ElevatorStatus.IDLE and not self.scheduler.has_calls(self)
 
-                    # If floor where elevator is currently going is still awaited by passengers
-                    # outside the elevator, add it to the queue
-                    if self.floor_to_reach in self.get_desired_floors():
-                        self.call_queue.append(self.floor_to_reach)
+    def park(self) -> bool:
+        """
+        Send the idle car to the floor chosen by its parking policy, once after every call served
 
-                    # If passengers inside the elevator do not need to go to that floor
-                    if self.floor_to_reach not in self.passengers.values():
-                        # if floor_to_reach for none of the waiting passengers matches their current floor
-                        pending_floors = self.get_pending_floors()
-                        if self.floor_to_reach not in pending_floors:
-                            continue  # move to the next floor in the queue
+        :return: whether the car moves
+        """
+        if self.parking_policy is None or self.repositioned:
+            return False
+        self.repositioned = True
+        floor = self.parking_policy.get_home_floor(self)
+        if floor is None or floor == self.current_floor:
+            return False
+        self.floor_to_reach = floor
+        self.repositioning = True
+        self.set_direction()
+        return True
 
-                    self.set_direction()
-            else:
-                floors_door_will_open = []
-                while self.current_floor != self.floor_to_reach:
-                    floors_door_will_open.extend(self.get_floors_to_open())
+    def step(self) -> float:
+        """
+        Perform one action of the elevator: choose the next floor to reach, or move one floor
+        towards it opening the doors where passengers are waiting or leaving
 
-                    # Opening doors on all floors along the route
-                    if self.current_floor in floors_door_will_open:
-                        self.open_release_enter_close()
-                    self.move()
+        :return: simulated seconds the action took
+        """
+        started = self.clock.now
 
+        if self.status is ElevatorStatus.IDLE:
+            floor_to_reach = self.scheduler.get_next_floor(self)
+            if floor_to_reach is None:
+                if not self.scheduler.has_calls(self):
+                    return self.clock.now - started
+            else:
+                self.floor_to_reach = floor_to_reach
+                self.repositioned = False
+                self.set_direction()
+        elif self.current_floor != self.floor_to_reach:
+            # Opening doors on the floors along the route chosen by the scheduler
+            if self.scheduler.should_stop(self):
+                self.open_release_enter_close()
+            self.move()
+            return self.clock.now - started
+        else:
+            # A car sent to its parking floor opens only if somebody is there
+            if not self.repositioning or self.is_floor_awaited(self.current_floor) or \
+                    self.current_floor in self.car_calls:
                 self.open_release_enter_close()
-                self.status = ElevatorStatus.IDLE
-            sleep(self.tick_rate)
+            self.repositioning = False
+            self.status = ElevatorStatus.IDLE
+
+        self.clock.sleep(self.tick_rate)
+        return self.clock.now - started
+
+    def run(self, metrics: "Metrics" = None, profiler: "Profiler" = None) -> None:
+        """
+        Starting the elevator in real time: the simulation waits tick_rate seconds between actions
+
+        :param metrics: Optional KPI collector, exported when all cars have stopped
+        :param profiler: Optional per-phase timing of the control loop
+        :return: None
+        """
+        simulation = Simulation(pacer=RealTimePacer(), metrics=metrics, profiler=profiler)
+        simulation.add_elevator(self)
+        simulation.run()
+
+    async def run_async(self, source: "AsyncIterable[Passenger]" = None, speed: float = 1.0,
+                        metrics: "Metrics" = None) -> None:
+        """
+        Starting the elevator as coroutines on the running event loop; passengers from source
+        call while it is running
+
+        :param source: Optional async iterable of passengers
+        :param speed: How many simulated seconds pass in one wall-clock second
+        :param metrics: Optional KPI collector, exported when all cars have stopped
+        :return: None
+        """
+        simulation = AsyncSimulation(speed, metrics)
+        simulation.add_elevator(self)
+        await simulation.run(source)
@@ -1,5 +1,6 @@
 import pytest
 from elevator import Elevator, ElevatorDirection
+from events import MemorySink, EventType, NULL_SINK
 from passenger import Passenger
 from collections import deque
 
@@ -155,8 +156,7 @@ def test_enter_elevator_true():
     passenger = Passenger(3, 6, elevator)
 
     elevator.current_floor = 3
-    elevator.passengers = {}
-    elevator.pending_passengers[passenger.uuid] = passenger.desired_floor
+    elevator.call_elevator(passenger)
     elevator.enter_elevator(passenger.uuid, passenger.desired_floor)
 
     assert len(elevator.pending_passengers) == 0
@@ -194,9 +194,10 @@ def test_elevator_release_passengers():
     elevator = Elevator(10, 4, 0.1)
     passenger = Passenger(3, 6, elevator)
 
-    elevator.passengers = {}
+    elevator.current_floor = 3
+    passenger.call_elevator()
+    passenger.enter_elevator()
     elevator.current_floor = 6
-    elevator.passengers[passenger.uuid] = 6
 
     elevator.release_passengers()
     assert len(elevator.passengers) == 0
@@ -206,9 +207,8 @@ def test_elevator_enter_pending_passengers():
     elevator = Elevator(10, 4, 0.1)
     passenger = Passenger(3, 6, elevator)
 
-    elevator.passengers = {}
     elevator.current_floor = 3
-    elevator.pending_passengers[passenger.uuid] = passenger
+    passenger.call_elevator()
 
     elevator.enter_pending_passengers()
     assert len(elevator.passengers) == 1
@@ -216,13 +216,11 @@ def test_elevator_enter_pending_passengers():
 
 def test_elevator_get_pending_floors():
     elevator = Elevator(10, 4, 0.1)
-    elevator.pending_passengers = {}
-
     passenger1 = Passenger(3, 6, elevator)
     passenger2 = Passenger(4, 6, elevator)
 
-    elevator.pending_passengers[passenger1.uuid] = passenger1
-    elevator.pending_passengers[passenger2.uuid] = passenger2
+    passenger1.call_elevator()
+    passenger2.call_elevator()
 
     assert elevator.get_pending_floors() == [3, 4]
 
@@ -233,9 +231,9 @@ def test_elevator_get_floors_to_open():
     passenger2 = Passenger(5, 6, elevator)
     passenger3 = Passenger(1, 8, elevator)
 
-    elevator.pending_passengers[passenger1.uuid] = passenger1
-    elevator.pending_passengers[passenger2.uuid] = passenger2
-    elevator.pending_passengers[passenger3.uuid] = passenger3
+    passenger1.call_elevator()
+    passenger2.call_elevator()
+    passenger3.call_elevator()
 
     # Elevator travels from the 3rd to the 7th floor, on the way stopping at 4th, 5th, 6th floors, ignoring 1st
     elevator.call_queue = [4, 5, 6, 1]
@@ -316,3 +314,50 @@ def test_passenger_elevator_dict():
     elevator = Elevator(10, 4, 0.1)
     with pytest.raises(AttributeError):
         Passenger(1, 6, {"8": 16})
+
+
+def test_elevator_overflow_passengers_stay_queued():
+    sink = MemorySink()
+    elevator = Elevator(10, 2, 0.1, event_sink=sink)
+    passengers = [Passenger(3, 7, elevator) for item in range(3)]
+    for passenger in passengers:
+        passenger.call_elevator()
+    elevator.current_floor = 3
+    elevator.enter_pending_passengers()
+
+    assert list(elevator.passengers) == [passengers[0].id, passengers[1].id]
+    assert list(elevator.pending_passengers) == [passengers[2].id]
+    assert list(elevator.waiting[(3, ElevatorDirection.UP)]) == [passengers[2]]
+    assert [event.type for event in sink.events].count(EventType.HALL_CALL) == 3
+
+
+
+def test_elevator_cancel_and_transfer_leave_no_queue_entries():
+    elevator, other = Elevator(10, 4, 0.1, event_sink=NULL_SINK), Elevator(10, 4, 0.1, event_sink=NULL_SINK)
+    first, second = Passenger(3, 7, elevator), Passenger(3, 7, elevator)
+    first.call_elevator()
+    second.call_elevator()
+
+    assert elevator.cancel_call(first.id)
+    assert list(elevator.waiting[(3, ElevatorDirection.UP)]) == [second]
+    for item in range(5):
+        assert elevator.transfer_call(second.id, other)
+        assert other.transfer_call(second.id, elevator)
+    assert list(elevator.waiting[(3, ElevatorDirection.UP)]) == [second]
+    assert not other.waiting
+    assert elevator.cancel_call(second.id)
+    assert not elevator.waiting and not elevator.is_floor_awaited(3)
+
+def test_elevator_release_only_passengers_of_the_floor():
+    elevator = Elevator(10, 4, 0.1, event_sink=NULL_SINK)
+    first, second = Passenger(2, 5, elevator), Passenger(2, 8, elevator)
+    first.call_elevator()
+    second.call_elevator()
+    elevator.current_floor = 2
+    elevator.enter_pending_passengers()
+    elevator.current_floor = 5
+    elevator.release_passengers()
+
+    assert list(elevator.passengers) == [second.id]
+    assert elevator.alighting == {8: [second.id]}
+    assert first.alight_time is not None
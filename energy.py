@@ -0,0 +1,129 @@
+import numpy as np
+
+GRAVITY = 9.81
+JOULES_PER_KWH = 3.6e6
+
+
+class EnergyModel:
+    """
+    Traction energy of a counterweighted car. Moving the heavier side up draws energy from the
+    motor, letting it go down gives part of it back through regenerative braking; friction is
+    paid in both directions, and the drive draws standby power whenever the car is not moving
+    """
+
+    def __init__(self, car_mass: float = 1000.0, passenger_mass: float = 75.0, capacity: int = 8,
+                 counterweight_ratio: float = 0.5, efficiency: float = 0.8, regeneration: float = 0.6,
+                 friction: float = 150.0, standby_power: float = 200.0, floor_height: float = 3.5):
+        if not 0 < efficiency <= 1:
+            raise ValueError("efficiency must be higher than 0 and at most 1")
+        if not 0 <= regeneration <= 1:
+            raise ValueError("regeneration must be between 0 and 1")
+        self.car_mass = car_mass  # kg
+        self.passenger_mass = passenger_mass  # kg
+        # The counterweight balances the empty car plus a share of the rated load
+        self.counterweight_mass = car_mass + counterweight_ratio * capacity * passenger_mass
+        self.efficiency = efficiency  # motor and drive, when consuming
+        self.regeneration = regeneration  # share of the released potential energy recovered
+        self.friction = friction  # N, guide and rope losses
+        self.standby_power = standby_power  # W
+        self.floor_height = floor_height  # m, when the car has no travel time table
+
+    def get_energy_per_metre(self, loads: np.ndarray) -> tuple:
+        """
+        Energy drawn per metre travelled up and down for every load; negative when the car
+        regenerates more than friction costs
+
+        :param loads: Numbers of passengers in the car
+        :return: (joules per metre up, joules per metre down) arrays
+        """
+        imbalance = (self.car_mass + np.asarray(loads) * self.passenger_mass - self.counterweight_mass) * GRAVITY
+        friction = self.friction / self.efficiency
+        up = np.where(imbalance > 0, imbalance / self.efficiency, imbalance * self.regeneration) + friction
+        down = np.where(imbalance < 0, -imbalance / self.efficiency, -imbalance * self.regeneration) + friction
+        return up, down
+
+    def get_trip_energy(self, load: int, distance: float) -> float:
+        """
+        Energy of one trip, for estimates outside of the simulation
+
+        :param load: Number of passengers in the car
+        :param distance: Metres, positive up and negative down
+        :return: joules
+        """
+        up, down = self.get_energy_per_metre(load)
+        return float((up if distance > 0 else down) * abs(distance))
+
+
+class EnergyMeter:
+    """
+    Energy accumulator of one car. The hot loop only adds the distance of every hop to the
+    counter of the car's load and direction; energy is computed from the counters at once when
+    a report is made
+    """
+
+    def __init__(self, model: EnergyModel, capacity: int, positions: list = None):
+        self.model = model
+        self.positions = positions  # height of every floor, from the travel time table
+        self.up_distance = [0.0] * (capacity + 1)  # metres travelled up with every load
+        self.down_distance = [0.0] * (capacity + 1)
+        self.moving_time = 0.0
+
+    def record_hop(self, previous_floor: int, floor: int, load: int, duration: float) -> None:
+        """
+        Account one hop of the car
+
+        :param previous_floor: Floor the car left
+        :param floor: Floor the car reached
+        :param load: Number of passengers in the car
+        :param duration: Simulated seconds of the hop
+        :return: None
+        """
+        if self.positions is None:
+            distance = (floor - previous_floor) * self.model.floor_height
+        else:
+            distance = self.positions[floor] - self.positions[previous_floor]
+        if distance > 0:
+            self.up_distance[load] += distance
+        else:
+            self.down_distance[load] -= distance
+        self.moving_time += duration
+
+    def get_summary(self, elapsed: float) -> dict:
+        """
+        Energy used so far
+
+        :param elapsed: Simulated seconds the car has been in service
+        :return: dict of kWh and metres
+        """
+        loads = np.arange(len(self.up_distance))
+        up, down = self.model.get_energy_per_metre(loads)
+        energy = np.concatenate((up * self.up_distance, down * self.down_distance))
+        traction = energy[energy > 0].sum() / JOULES_PER_KWH
+        regenerated = -energy[energy < 0].sum() / JOULES_PER_KWH
+        standby = self.model.standby_power * max(0.0, elapsed - self.moving_time) / JOULES_PER_KWH
+        return {
+            'traction_kwh': traction,
+            'regenerated_kwh': regenerated,
+            'standby_kwh': standby,
+            'total_kwh': traction - regenerated + standby,
+            'distance_m': sum(self.up_distance) + sum(self.down_distance),
+        }
+
+
+def summarize_energy(meters: dict, elapsed: float, trips: int) -> dict:
+    """
+    Energy of all cars and per delivered passenger
+
+    :param meters: car number -> EnergyMeter
+    :param elapsed: Simulated seconds
+    :param trips: Number of passengers who reached their floor
+    :return: dict
+    """
+    cars = {car: meter.get_summary(elapsed) for car, meter in sorted(meters.items())}
+    total = sum(summary['total_kwh'] for summary in cars.values())
+    return {
+        'total_kwh': total,
+        'regenerated_kwh': sum(summary['regenerated_kwh'] for summary in cars.values()),
+        'kwh_per_trip': total / trips if trips else None,
+        'cars': cars,
+    }
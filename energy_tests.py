@@ -0,0 +1,71 @@
+import pytest
+from building import Building
+from dispatcher import EnergyAwareDispatcher, RouteCostDispatcher
+from energy import EnergyModel, EnergyMeter, JOULES_PER_KWH
+from events import NULL_SINK
+from metrics import Metrics
+from passenger import Passenger
+from simulation import Simulation
+
+
+def test_energy_model_invalid_efficiency():
+    with pytest.raises(ValueError):
+        EnergyModel(efficiency=0)
+
+
+def test_balanced_car_pays_friction_only():
+    model = EnergyModel(capacity=8, counterweight_ratio=0.5)
+    up, down = model.get_energy_per_metre([4])
+
+    assert up[0] == pytest.approx(model.friction / model.efficiency)
+    assert down[0] == pytest.approx(model.friction / model.efficiency)
+
+
+def test_empty_car_regenerates_going_up():
+    model = EnergyModel()
+    up, down = model.get_energy_per_metre([0])
+
+    assert up[0] < 0 < down[0]
+    assert model.get_trip_energy(0, 10.0) < 0 < model.get_trip_energy(0, -10.0)
+
+
+def test_energy_meter_summary():
+    model = EnergyModel(friction=0, standby_power=100, floor_height=3)
+    meter = EnergyMeter(model, 8)
+    meter.record_hop(1, 2, 8, 2.0)  # full car up: consumes
+    meter.record_hop(2, 1, 8, 2.0)  # full car down: regenerates
+
+    summary = meter.get_summary(elapsed=14.0)
+    imbalance = (model.car_mass + 8 * model.passenger_mass - model.counterweight_mass) * 9.81 * 3
+    assert summary['traction_kwh'] == pytest.approx(imbalance / model.efficiency / JOULES_PER_KWH)
+    assert summary['regenerated_kwh'] == pytest.approx(imbalance * model.regeneration / JOULES_PER_KWH)
+    assert summary['standby_kwh'] == pytest.approx(100 * 10 / JOULES_PER_KWH)
+    assert summary['distance_m'] == 6
+
+
+def test_metrics_report_energy_per_trip():
+    building = Building(10, 2, 8, 1, event_sink=NULL_SINK, energy_model=EnergyModel())
+    metrics = Metrics()
+    simulation = Simulation(metrics=metrics)
+    simulation.add_building(building)
+    for item in range(10):
+        simulation.add_passenger(Passenger(1, 2 + item % 9, building), item * 5.0)
+    building.stop_elevator()
+    simulation.run()
+
+    energy = metrics.get_summary(simulation.now)['energy']
+    assert energy['total_kwh'] > 0
+    assert energy['kwh_per_trip'] == pytest.approx(energy['total_kwh'] / 10)
+    assert set(energy['cars']) == {0, 1}
+    assert all(car['standby_kwh'] > 0 for car in energy['cars'].values())
+
+
+def test_energy_aware_dispatcher_prefers_regenerating_car():
+    def select(dispatcher):
+        building = Building(10, 2, 8, 1, dispatcher=dispatcher, event_sink=NULL_SINK, energy_model=EnergyModel())
+        above, below = building.cars
+        above.current_floor, below.current_floor = 8, 2
+        return building.cars.index(dispatcher.select_car(building.cars, Passenger(5, 9, building)))
+
+    assert select(RouteCostDispatcher()) == 0  # equal times, the first car
+    assert select(EnergyAwareDispatcher(energy_weight=1.0)) == 1  # an empty car going up gives energy back
@@ -0,0 +1,181 @@
+from states import ElevatorDirection
+
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from elevator import Elevator
+
+
+class StopIndex:
+    """
+    Stops of one sweep direction in floor order. Besides the bitset of the stops it keeps, in a
+    Fenwick tree, the flight time from every stop to the stop below it, so the time of a run
+    through any number of stops is two prefix sums. Adding or removing a stop changes two legs,
+    O(log n)
+    """
+
+    def __init__(self, max_floor: int, travel_time: Callable[[int, int], float]):
+        self.max_floor = max_floor
+        self.travel_time = travel_time
+        self.counts = {}  # floor -> number of FloorSets of the car holding it
+        self.bits = 0
+        self.legs = [0.0] * (max_floor + 2)  # leg of every stop, to read back the value to replace
+        self._tree = [0.0] * (max_floor + 2)
+
+    def __contains__(self, floor: int) -> bool:
+        return self.bits >> floor & 1 == 1
+
+    def _update(self, floor: int, delta: float) -> None:
+        while floor < len(self._tree):
+            self._tree[floor] += delta
+            floor += floor & -floor
+
+    def _set_leg(self, floor: int, leg: float) -> None:
+        self._update(floor, leg - self.legs[floor])
+        self.legs[floor] = leg
+
+    def prefix(self, floor: int) -> float:
+        """
+        Sum of the legs of the stops up to the floor inclusive
+
+        :return: float
+        """
+        total = 0.0
+        while floor > 0:
+            total += self._tree[floor]
+            floor -= floor & -floor
+        return total
+
+    def below(self, floor: int) -> int:
+        """
+        Highest stop below the floor, None if there is none
+        """
+        bits = self.bits & ((1 << floor) - 1)
+        return bits.bit_length() - 1 if bits else None
+
+    def above(self, floor: int) -> int:
+        """
+        Lowest stop above the floor, None if there is none
+        """
+        bits = self.bits >> (floor + 1)
+        return (bits & -bits).bit_length() + floor if bits else None
+
+    def floor_added(self, floor: int) -> None:
+        if floor in self.counts:
+            self.counts[floor] += 1
+            return
+        self.counts[floor] = 1
+        lower, upper = self.below(floor), self.above(floor)
+        self.bits |= 1 << floor
+        self._set_leg(floor, self.travel_time(lower, floor) if lower is not None else 0.0)
+        if upper is not None:
+            self._set_leg(upper, self.travel_time(floor, upper))
+
+    def floor_removed(self, floor: int) -> None:
+        if self.counts[floor] > 1:
+            self.counts[floor] -= 1
+            return
+        del self.counts[floor]
+        self.bits &= ~(1 << floor)
+        self._set_leg(floor, 0.0)
+        lower, upper = self.below(floor), self.above(floor)
+        if upper is not None:
+            self._set_leg(upper, self.travel_time(lower, upper) if lower is not None else 0.0)
+
+    def run_time(self, start: int, end: int, stop_time: float) -> float:
+        """
+        Time from start to end, stopping at every stop strictly between them
+
+        :param start: Floor where the run starts
+        :param end: Floor where the run ends
+        :param stop_time: Time of one stop
+        :return: float
+        """
+        lowest, highest = min(start, end), max(start, end)
+        first, last = self.above(lowest), self.below(highest)
+        if first is None or last is None or first > last:
+            return self.travel_time(lowest, highest)
+        stops = (self.bits >> first).bit_count() - (self.bits >> (last + 1)).bit_count()
+        # Flight times are symmetric, so a run down costs what the run up costs
+        return self.travel_time(lowest, first) + self.prefix(last) - self.prefix(first) + \
+            self.travel_time(last, highest) + stops * stop_time
+
+
+class RouteCost:
+    """
+    Incremental estimate of the time a car following collective control (LookScheduler) needs to
+    serve a new call. The stops of the up and down sweeps are kept in StopIndexes which the
+    FloorSets of the car update whenever a floor appears or disappears, so the cost of inserting
+    a call is a few lookups instead of a walk along the route
+    """
+
+    def __init__(self, elevator: "Elevator"):
+        self.elevator = elevator
+        self.up_stops = StopIndex(elevator.max_floor, elevator.get_travel_time)
+        self.down_stops = StopIndex(elevator.max_floor, elevator.get_travel_time)
+        # Passengers in the car stop it in both sweeps, waiting passengers only in their direction
+        for floor_set, indexes in ((elevator.car_calls, (self.up_stops, self.down_stops)),
+                                   (elevator.hall_calls_up, (self.up_stops,)),
+                                   (elevator.hall_calls_down, (self.down_stops,))):
+            for index in indexes:
+                for floor in floor_set:
+                    index.floor_added(floor)
+                floor_set.observers.append(index)
+
+    def get_direction(self) -> ElevatorDirection:
+        """
+        Direction of the current or next sweep, chosen as LookScheduler does
+
+        :return: ElevatorDirection
+        """
+        elevator = self.elevator
+        requests = self.up_stops.bits | self.down_stops.bits
+        above = requests >> (elevator.current_floor + 1)
+        below = requests & ((1 << elevator.current_floor) - 1)
+        if elevator.direction is ElevatorDirection.UP:
+            return ElevatorDirection.UP if above or not below else ElevatorDirection.DOWN
+        return ElevatorDirection.DOWN if below or not above else ElevatorDirection.UP
+
+    def insertion_cost(self, floor: int, direction: ElevatorDirection) -> float:
+        """
+        Estimated time until the car reaches the floor to serve a call in the given direction,
+        stopping for the calls it has already committed to
+
+        :param floor: Floor of the call
+        :param direction: Direction the passenger travels
+        :return: simulated seconds
+        """
+        elevator = self.elevator
+        position = elevator.current_floor
+        stop_time = elevator.door.tick_rate
+        requests = self.up_stops.bits | self.down_stops.bits
+        if not requests:
+            return elevator.get_travel_time(position, floor)
+
+        top = max(requests.bit_length() - 1, position)
+        bottom = min((requests & -requests).bit_length() - 1, position)
+        sweep_direction = self.get_direction()
+        if sweep_direction is ElevatorDirection.UP:
+            sweep, reverse_sweep = self.up_stops, self.down_stops
+            ahead = floor >= position
+            turn, next_turn = max(top, floor), min(bottom, floor)
+        else:
+            sweep, reverse_sweep = self.down_stops, self.up_stops
+            ahead = floor <= position
+            turn, next_turn = min(bottom, floor), max(top, floor)
+
+        if direction is sweep_direction and ahead:
+            return sweep.run_time(position, floor, stop_time)
+        # To the end of the sweep, where the car stops for the request that made it go there
+        cost = sweep.run_time(position, turn, stop_time)
+        if turn == floor:
+            return cost
+        cost += stop_time if requests >> turn & 1 else 0.0
+        if direction is not sweep_direction:
+            return cost + reverse_sweep.run_time(turn, floor, stop_time)
+        # Back to the other end and once more in the direction of the first sweep
+        cost += reverse_sweep.run_time(turn, next_turn, stop_time)
+        if next_turn == floor:
+            return cost
+        cost += stop_time if requests >> next_turn & 1 else 0.0
+        return cost + sweep.run_time(next_turn, floor, stop_time)
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+from building import Building
+from dispatcher import RouteCostDispatcher
+from elevator import Elevator, ElevatorDirection, ElevatorStatus
+from eta import StopIndex, RouteCost
+from events import NULL_SINK
+from kinematics import MotionProfile, get_travel_time_table
+from passenger import Passenger
+from simulation import Simulation
+
+
+def naive_run_time(stops, start, end, travel_time, stop_time):
+    lowest, highest = min(start, end), max(start, end)
+    route = [lowest] + sorted(floor for floor in stops if lowest < floor < highest) + [highest]
+    return sum(travel_time(a, b) for a, b in zip(route, route[1:])) + (len(route) - 2) * stop_time
+
+
+def test_stop_index_matches_naive_route():
+    table = get_travel_time_table(40, MotionProfile())
+    index = StopIndex(40, table.get)
+    stops = {}
+    rng = random.Random(1)
+    for item in range(500):
+        floor = rng.randint(1, 40)
+        if stops.get(floor) and rng.random() < 0.5:
+            stops[floor] -= 1
+            index.floor_removed(floor)
+        else:
+            stops[floor] = stops.get(floor, 0) + 1
+            index.floor_added(floor)
+        start, end = rng.randint(1, 40), rng.randint(1, 40)
+        live = [floor for floor, count in stops.items() if count]
+        assert index.run_time(start, end, 2.0) == pytest.approx(naive_run_time(live, start, end, table.get, 2.0))
+
+
+def test_route_cost_follows_look_sweeps():
+    elevator = Elevator(10, 4, 1, event_sink=NULL_SINK)
+    route_cost = RouteCost(elevator)
+    elevator.current_floor = 5
+    elevator.direction = ElevatorDirection.UP
+    elevator.status = ElevatorStatus.MOVING
+    elevator.car_calls.add(8)
+    elevator.hall_calls_down.add(3)
+
+    # Up call ahead: on the way
+    assert route_cost.insertion_cost(7, ElevatorDirection.UP) == 2
+    # Down call: up to 8, stop, down to 6
+    assert route_cost.insertion_cost(6, ElevatorDirection.DOWN) == 3 + 1 + 2
+    # Up call behind: up to 8, down through the stop on 3 to 2
+    assert route_cost.insertion_cost(2, ElevatorDirection.UP) == 3 + 1 + 5 + 1 + 1
+
+
+def test_route_cost_idle_car_without_calls():
+    elevator = Elevator(10, 4, 1, event_sink=NULL_SINK)
+    elevator.current_floor = 4
+
+    assert RouteCost(elevator).insertion_cost(9, ElevatorDirection.DOWN) == 5
+
+
+def test_route_cost_stays_in_step_with_the_car():
+    building = Building(15, 3, 4, 1, dispatcher=RouteCostDispatcher(), event_sink=NULL_SINK)
+    simulation = Simulation()
+    simulation.add_building(building)
+    rng = random.Random(5)
+    for item in range(60):
+        current_floor = rng.randint(1, 15)
+        desired_floor = rng.choice([floor for floor in range(1, 16) if floor != current_floor])
+        simulation.add_passenger(Passenger(current_floor, desired_floor, building), item * 3.0)
+    building.stop_elevator()
+    simulation.run(until=90)
+
+    for car in building.cars:
+        fresh = RouteCost(car)
+        assert car.route_cost.up_stops.bits == fresh.up_stops.bits
+        assert car.route_cost.down_stops.bits == fresh.down_stops.bits
+        assert car.route_cost.up_stops.prefix(15) == pytest.approx(fresh.up_stops.prefix(15))
+
+    simulation.run()
+    assert len(building.passenger_store.get_journey_times()) == 60
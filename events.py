@@ -0,0 +1,271 @@
+import csv
+from array import array
+from collections import namedtuple
+from enum import Enum, IntEnum
+
+
+class EventLevel(IntEnum):
+    DEBUG = 1
+    INFO = 2
+
+
+class EventType(Enum):
+    HALL_CALL = 1
+    DEPART = 2
+    ARRIVE = 3
+    DOOR_OPEN = 4
+    DOOR_CLOSE = 5
+    BOARD = 6
+    ALIGHT = 7
+    CANCEL = 8
+
+    @property
+    def level(self) -> EventLevel:
+        if self in (EventType.ARRIVE, EventType.DOOR_OPEN, EventType.DOOR_CLOSE):
+            return EventLevel.DEBUG  # happen on every floor, needed only to follow the car closely
+        return EventLevel.INFO
+
+
+NO_PASSENGER = -1  # passenger of the events which concern the car only
+
+Event = namedtuple('Event', ['time', 'type', 'car', 'floor', 'passenger'])
+EVENT_FIELDS = Event._fields
+
+
+class EventSink:
+    """
+    Receiver of the elevator events. The elevator checks enabled before building an event, so a
+    disabled sink costs one attribute lookup per event
+    """
+    enabled = True
+
+    def __init__(self, level: EventLevel = EventLevel.DEBUG):
+        self.level = level
+
+    def emit(self, time: float, event_type: EventType, car: int, floor: int, passenger: int = NO_PASSENGER) -> None:
+        """
+        Record an event if its level passes the filter
+
+        :param time: Simulated time of the event
+        :param event_type: EventType
+        :param car: Number of the car
+        :param floor: Floor where the event happened
+        :param passenger: Passenger ID, NO_PASSENGER for car events
+        :return: None
+        """
+        if event_type.level >= self.level:
+            self.write(Event(time, event_type, car, floor, passenger))
+
+    def write(self, event: Event) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "EventSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class NullSink(EventSink):
+    """
+    Discards everything; the elevator never even builds the events
+    """
+    enabled = False
+
+    def write(self, event: Event) -> None:
+        pass
+
+
+class TeeSink(EventSink):
+    """
+    Sends every event to several sinks, each of them applying its own level filter
+    """
+
+    def __init__(self, *sinks: EventSink):
+        super().__init__()
+        self.sinks = [sink for sink in sinks if sink.enabled]
+        self.enabled = bool(self.sinks)
+
+    def emit(self, time: float, event_type: EventType, car: int, floor: int, passenger: int = NO_PASSENGER) -> None:
+        for sink in self.sinks:
+            sink.emit(time, event_type, car, floor, passenger)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+class ConsoleSink(EventSink):
+    """
+    Human-readable lines on stdout, as the elevator always printed them
+    """
+
+    MESSAGES = {
+        EventType.HALL_CALL: 'Elevator called to {floor} floor',
+        EventType.DEPART: 'Elevator departs from {floor} floor',
+        EventType.ARRIVE: 'Im on {floor} floor',
+        EventType.DOOR_OPEN: 'Door opened',
+        EventType.DOOR_CLOSE: 'Door closed',
+        EventType.BOARD: 'Passenger with id = {passenger} entered elevator',
+        EventType.ALIGHT: 'Passenger with id = {passenger} exited from elevator',
+        EventType.CANCEL: 'Call of passenger with id = {passenger} cancelled',
+    }
+
+    def write(self, event: Event) -> None:
+        print(self.MESSAGES[event.type].format(floor=event.floor, passenger=event.passenger))
+
+
+class MemorySink(EventSink):
+    """
+    Keeps the events in a list
+    """
+
+    def __init__(self, level: EventLevel = EventLevel.DEBUG):
+        super().__init__(level)
+        self.events = []
+
+    def write(self, event: Event) -> None:
+        self.events.append(event)
+
+
+class JsonlSink(EventSink):
+    """
+    One JSON object per line, through a buffered file
+    """
+
+    def __init__(self, path: str, level: EventLevel = EventLevel.INFO, buffer_size: int = 1 << 20):
+        super().__init__(level)
+        self.path = path
+        self.buffer_size = buffer_size
+        self.file = open(path, 'w', buffering=buffer_size)
+
+    def __getstate__(self) -> dict:
+        # A snapshot keeps the path only; the restored sink appends to what was written so far
+        self.file.flush()
+        return {'level': self.level, 'path': self.path, 'buffer_size': self.buffer_size}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.file = open(self.path, 'a', buffering=self.buffer_size)
+
+    def write(self, event: Event) -> None:
+        # Formatted by hand: every field is a number or an enum name, json.dumps would only be slower
+        self.file.write(f'{{"time": {event.time!r}, "type": "{event.type.name}", "car": {event.car}, '
+                        f'"floor": {event.floor}, "passenger": {event.passenger}}}\n')
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class CsvSink(EventSink):
+    """
+    CSV with a header row, through a buffered file
+    """
+
+    def __init__(self, path: str, level: EventLevel = EventLevel.INFO, buffer_size: int = 1 << 20):
+        super().__init__(level)
+        self.path = path
+        self.buffer_size = buffer_size
+        self.file = open(path, 'w', buffering=buffer_size, newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(EVENT_FIELDS)
+
+    def __getstate__(self) -> dict:
+        self.file.flush()
+        return {'level': self.level, 'path': self.path, 'buffer_size': self.buffer_size}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.file = open(self.path, 'a', buffering=self.buffer_size, newline='')
+        self.writer = csv.writer(self.file)
+
+    def write(self, event: Event) -> None:
+        self.writer.writerow((event.time, event.type.name, event.car, event.floor, event.passenger))
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ArrowSink(EventSink):
+    """
+    Columnar output: events are buffered in typed columns and written as record batches to a
+    Parquet file or an Arrow IPC file. Requires pyarrow
+    """
+
+    def __init__(self, path: str, level: EventLevel = EventLevel.INFO, batch_size: int = 65536,
+                 file_format: str = 'parquet'):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("ArrowSink requires pyarrow: pip install pyarrow")
+        if file_format not in ('parquet', 'arrow'):
+            raise ValueError("file_format must be 'parquet' or 'arrow'")
+
+        super().__init__(level)
+        self.pyarrow = pyarrow
+        self.path = path
+        self.batch_size = batch_size
+        self.file_format = file_format
+        self.schema = pyarrow.schema([('time', pyarrow.float64()), ('type', pyarrow.string()),
+                                      ('car', pyarrow.int32()), ('floor', pyarrow.int32()),
+                                      ('passenger', pyarrow.int64())])
+        self.writer = None
+        self._reset_columns()
+
+    def __getstate__(self) -> dict:
+        raise TypeError("ArrowSink cannot be snapshotted: Parquet and Arrow files cannot be appended to")
+
+    def _reset_columns(self) -> None:
+        self.times = array('d')
+        self.types = []
+        self.cars = array('l')
+        self.floors = array('l')
+        self.passengers = array('q')
+
+    def write(self, event: Event) -> None:
+        self.times.append(event.time)
+        self.types.append(event.type.name)
+        self.cars.append(event.car)
+        self.floors.append(event.floor)
+        self.passengers.append(event.passenger)
+        if len(self.times) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.writer is None:
+            if self.file_format == 'parquet':
+                import pyarrow.parquet
+                self.writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+            else:
+                import pyarrow.ipc
+                self.writer = pyarrow.ipc.new_file(self.path, self.schema)
+        if self.times:
+            columns = [self.times, self.types, self.cars, self.floors, self.passengers]
+            batch = self.pyarrow.record_batch([self.pyarrow.array(column, type=field.type)
+                                               for column, field in zip(columns, self.schema)], schema=self.schema)
+            self.writer.write_batch(batch)
+            self._reset_columns()
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+NULL_SINK = NullSink()
+CONSOLE_SINK = ConsoleSink()
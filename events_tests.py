@@ -0,0 +1,109 @@
+import csv
+import json
+
+import pytest
+from building import Building
+from elevator import Elevator
+from events import EventLevel, EventType, NullSink, ConsoleSink, MemorySink, JsonlSink, CsvSink, ArrowSink, \
+    NO_PASSENGER
+from passenger import Passenger
+from simulation import Simulation
+
+
+def run_one_trip(event_sink) -> Elevator:
+    elevator = Elevator(10, 4, 1.0, event_sink)
+    simulation = Simulation()
+    simulation.add_elevator(elevator)
+    simulation.add_passenger(Passenger(3, 5, elevator))
+    elevator.stop_elevator()
+    simulation.run()
+    return elevator
+
+
+def test_memory_sink_records_trip():
+    sink = MemorySink(EventLevel.INFO)
+    run_one_trip(sink)
+
+    assert [event.type for event in sink.events] == [EventType.HALL_CALL, EventType.DEPART, EventType.BOARD,
+                                                     EventType.DEPART, EventType.ALIGHT]
+    assert sink.events[2].floor == 3
+    assert sink.events[4].floor == 5
+    assert sink.events[4].passenger == 0
+
+
+def test_memory_sink_debug_level_records_doors_and_floors():
+    sink = MemorySink(EventLevel.DEBUG)
+    run_one_trip(sink)
+    types = [event.type for event in sink.events]
+
+    assert types.count(EventType.DOOR_OPEN) == types.count(EventType.DOOR_CLOSE) == 2
+    assert [event.floor for event in sink.events if event.type is EventType.ARRIVE] == [2, 3, 4, 5]
+    assert all(event.passenger == NO_PASSENGER for event in sink.events if event.type is EventType.ARRIVE)
+
+
+def test_events_are_in_time_order():
+    sink = MemorySink()
+    run_one_trip(sink)
+    times = [event.time for event in sink.events]
+
+    assert times == sorted(times)
+
+
+def test_null_sink_is_disabled():
+    sink = NullSink()
+    run_one_trip(sink)
+
+    assert sink.enabled is False
+
+
+def test_console_sink(capsys):
+    ConsoleSink().emit(0.0, EventType.BOARD, 0, 3, 7)
+    captured = capsys.readouterr()
+
+    assert captured.out == "Passenger with id = 7 entered elevator\n"
+
+
+def test_jsonl_sink(tmp_path):
+    path = tmp_path / "events.jsonl"
+    with JsonlSink(str(path)) as sink:
+        run_one_trip(sink)
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+
+    assert events[0] == {"time": 0.0, "type": "HALL_CALL", "car": 0, "floor": 3, "passenger": 0}
+    assert events[-1]["type"] == "ALIGHT"
+
+
+def test_csv_sink(tmp_path):
+    path = tmp_path / "events.csv"
+    with CsvSink(str(path)) as sink:
+        run_one_trip(sink)
+    with open(path, newline='') as file:
+        rows = list(csv.DictReader(file))
+
+    assert len(rows) == 5
+    assert rows[2]["type"] == "BOARD"
+
+
+def test_arrow_sink_parquet(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "events.parquet"
+    with ArrowSink(str(path), EventLevel.DEBUG, batch_size=4) as sink:
+        run_one_trip(sink)
+    table = parquet.read_table(str(path))
+
+    assert table.num_rows == 13
+    assert table.column("type").to_pylist()[0] == "HALL_CALL"
+
+
+def test_arrow_sink_wrong_format(tmp_path):
+    pytest.importorskip("pyarrow")
+    with pytest.raises(ValueError):
+        ArrowSink(str(tmp_path / "events.orc"), file_format='orc')
+
+
+def test_building_cars_are_numbered():
+    sink = MemorySink(EventLevel.INFO)
+    building = Building(10, 3, 4, 1.0, event_sink=sink)
+
+    assert [car.number for car in building.cars] == [0, 1, 2]
+    assert all(car.event_sink is sink for car in building.cars)
@@ -0,0 +1,203 @@
+from collections import deque
+
+
+class FloorSet:
+    """
+    Multiset of floors. Besides the count of every floor it keeps a bitset (bit N is set while
+    floor N is in the set), so membership is O(1) and the floors within a range are found
+    with a few integer operations instead of a scan. Observers (objects with floor_added and
+    floor_removed) are told whenever a floor enters or leaves the set
+    """
+
+    def __init__(self, floors=()):
+        self.counts = {}
+        self.bits = 0
+        self.observers = []
+        for floor in floors:
+            self.add(floor)
+
+    def __contains__(self, floor: int) -> bool:
+        return self.bits >> floor & 1 == 1
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __iter__(self):
+        return iter(self.floors_between(0, self.bits.bit_length()))
+
+    def count(self, floor: int) -> int:
+        return self.counts.get(floor, 0)
+
+    def add(self, floor: int) -> None:
+        """
+        Add one occurrence of the floor
+
+        :param floor: Floor number
+        :return: None
+        """
+        if floor in self.counts:
+            self.counts[floor] += 1
+        else:
+            self.counts[floor] = 1
+            self.bits |= 1 << floor
+            for observer in self.observers:
+                observer.floor_added(floor)
+
+    def remove(self, floor: int) -> None:
+        """
+        Remove one occurrence of the floor
+
+        :param floor: Floor number
+        :return: None
+        """
+        if self.counts[floor] > 1:
+            self.counts[floor] -= 1
+        else:
+            del self.counts[floor]
+            self.bits &= ~(1 << floor)
+            for observer in self.observers:
+                observer.floor_removed(floor)
+
+    def discard_all(self, floor: int) -> None:
+        """
+        Remove every occurrence of the floor
+
+        :param floor: Floor number
+        :return: None
+        """
+        if self.counts.pop(floor, None) is not None:
+            self.bits &= ~(1 << floor)
+            for observer in self.observers:
+                observer.floor_removed(floor)
+
+    @staticmethod
+    def range_mask(lowest_floor: int, highest_floor: int) -> int:
+        """
+        Bitset of all floors from lowest_floor to highest_floor inclusive
+
+        :return: int
+        """
+        if highest_floor < lowest_floor:
+            return 0
+        return ((1 << (highest_floor - lowest_floor + 1)) - 1) << lowest_floor
+
+    @staticmethod
+    def bits_to_floors(bits: int, descending: bool = False) -> list:
+        """
+        Floors set in the bitset, in ascending or descending order
+
+        :param bits: Bitset of floors
+        :param descending: Order from the top floor
+        :return: list of floors
+        """
+        floors = []
+        while bits:
+            if descending:
+                floor = bits.bit_length() - 1
+                bits ^= 1 << floor
+            else:
+                lowest_bit = bits & -bits
+                floor = lowest_bit.bit_length() - 1
+                bits ^= lowest_bit
+            floors.append(floor)
+        return floors
+
+    def floors_between(self, lowest_floor: int, highest_floor: int, descending: bool = False) -> list:
+        """
+        Floors of the set between lowest_floor and highest_floor inclusive
+
+        :return: list of floors
+        """
+        return self.bits_to_floors(self.bits & self.range_mask(lowest_floor, highest_floor), descending)
+
+
+class CallQueue:
+    """
+    FIFO queue of floors the elevator has to visit. Membership and per-floor counts are kept in a
+    FloorSet, and removing every occurrence of a floor is O(1): the entries are only marked stale
+    (by bumping the floor's generation) and skipped when they reach the head of the queue
+    """
+
+    def __init__(self, floors=()):
+        self.floors = FloorSet()
+        self._entries = deque()  # (floor, generation of the floor when it was appended)
+        self._generations = {}
+        self._size = 0  # number of live entries
+        for floor in floors:
+            self.append(floor)
+
+    def __contains__(self, floor: int) -> bool:
+        return floor in self.floors
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self.floors.bits != 0
+
+    def __iter__(self):
+        return (floor for floor, generation in self._entries if self._generations.get(floor, 0) == generation)
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f'CallQueue({list(self)})'
+
+    def count(self, floor: int) -> int:
+        return self.floors.count(floor)
+
+    def append(self, floor: int) -> None:
+        """
+        Add the floor to the end of the queue
+
+        :param floor: Floor number
+        :return: None
+        """
+        self._entries.append((floor, self._generations.get(floor, 0)))
+        self.floors.add(floor)
+        self._size += 1
+
+    def _drop_stale(self) -> None:
+        while self._entries and self._generations.get(self._entries[0][0], 0) != self._entries[0][1]:
+            self._entries.popleft()
+
+    def peek(self) -> int:
+        """
+        Floor at the head of the queue
+
+        :return: floor number
+        """
+        self._drop_stale()
+        return self._entries[0][0]
+
+    def popleft(self) -> int:
+        """
+        Remove and return the floor at the head of the queue
+
+        :return: floor number
+        """
+        self._drop_stale()
+        floor, generation = self._entries.popleft()
+        self.floors.remove(floor)
+        self._size -= 1
+        return floor
+
+    def remove_floor(self, floor: int) -> None:
+        """
+        Remove every occurrence of the floor from the queue
+
+        :param floor: Floor number
+        :return: None
+        """
+        if floor in self.floors:
+            self._generations[floor] = self._generations.get(floor, 0) + 1
+            self._size -= self.floors.count(floor)
+            self.floors.discard_all(floor)
+            if len(self._entries) > 2 * self._size + 64:
+                self._compact()
+
+    def _compact(self) -> None:
+        # Stale entries of floors that are never popped again would otherwise pile up
+        self._entries = deque((floor, generation) for floor, generation in self._entries
+                              if self._generations.get(floor, 0) == generation)
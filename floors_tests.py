@@ -0,0 +1,78 @@
+from collections import deque
+
+from floors import FloorSet, CallQueue
+
+
+def test_floor_set_counts_and_bits():
+    floors = FloorSet([3, 3, 5])
+
+    assert 3 in floors
+    assert floors.count(3) == 2
+    floors.remove(3)
+    assert 3 in floors
+    floors.remove(3)
+    assert 3 not in floors
+    assert list(floors) == [5]
+
+
+def test_floor_set_discard_all():
+    floors = FloorSet([7, 7, 7])
+    floors.discard_all(7)
+
+    assert 7 not in floors
+    assert floors.bits == 0
+
+
+def test_floor_set_floors_between():
+    floors = FloorSet([1, 4, 6, 9, 120])
+
+    assert floors.floors_between(2, 9) == [4, 6, 9]
+    assert floors.floors_between(2, 120, descending=True) == [120, 9, 6, 4]
+    assert floors.floors_between(7, 5) == []
+
+
+def test_call_queue_fifo():
+    queue = CallQueue([4, 2, 8])
+
+    assert queue.popleft() == 4
+    assert queue == deque([2, 8])
+    assert len(queue) == 2
+
+
+def test_call_queue_remove_floor():
+    queue = CallQueue([4, 2, 4, 8])
+    queue.remove_floor(4)
+
+    assert 4 not in queue
+    assert len(queue) == 2
+    assert queue.popleft() == 2
+
+
+def test_call_queue_append_after_remove_floor():
+    queue = CallQueue([4, 2])
+    queue.remove_floor(4)
+    queue.append(4)
+
+    assert list(queue) == [2, 4]
+    assert queue.popleft() == 2
+    assert queue.popleft() == 4
+    assert not queue
+
+
+def test_call_queue_peek_skips_removed_floors():
+    queue = CallQueue([5, 6])
+    queue.remove_floor(5)
+
+    assert queue.peek() == 6
+    assert queue.count(6) == 1
+
+
+def test_call_queue_compacts_stale_entries():
+    queue = CallQueue()
+    for item in range(100):
+        queue.append(3)
+        queue.append(5)
+        queue.remove_floor(3)
+
+    assert list(queue) == [5] * 100
+    assert len(queue._entries) <= 2 * len(queue) + 64
@@ -0,0 +1,82 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Rated speed (m/s), acceleration (m/s^2), jerk (m/s^3), and the time (s) added to every flight for
+# starting the drive and leveling the car at the landing
+MotionProfile = namedtuple('MotionProfile', ['speed', 'acceleration', 'jerk', 'start_delay', 'leveling_time'],
+                           defaults=(2.5, 1.0, 1.5, 0.5, 1.0))
+
+
+def flight_times(distances: np.ndarray, profile: MotionProfile) -> np.ndarray:
+    """
+    Times of jerk-limited flights from standstill to standstill. Depending on the distance the car
+    reaches the rated speed, only the rated acceleration, or neither
+
+    :param distances: Distances in metres
+    :param profile: MotionProfile
+    :return: array of times in seconds, 0 for a distance of 0
+    """
+    if profile.speed <= 0 or profile.acceleration <= 0 or profile.jerk <= 0:
+        raise ValueError("speed, acceleration and jerk must be higher than 0")
+
+    distances = np.asarray(distances, dtype=float)
+    speed, jerk = profile.speed, profile.jerk
+    # A slow car reaches its rated speed before the jerk lets it reach the rated acceleration
+    acceleration = min(profile.acceleration, np.sqrt(speed * jerk))
+    jerk_time = acceleration / jerk
+
+    full_profile = distances / speed + speed / acceleration + jerk_time
+    no_cruise = jerk_time + np.sqrt(jerk_time ** 2 + 4 * distances / acceleration)
+    no_constant_acceleration = np.cbrt(32 * distances / jerk)
+
+    times = np.where(distances >= speed ** 2 / acceleration + speed * jerk_time, full_profile,
+                     np.where(distances >= 2 * acceleration ** 3 / jerk ** 2, no_cruise, no_constant_acceleration))
+    times = times + profile.start_delay + profile.leveling_time
+    return np.where(distances > 0, times, 0.0)
+
+
+class TravelTimeTable:
+    """
+    Flight times between every pair of floors, computed once, so a lookup during the simulation
+    or the dispatch is two list indexings
+    """
+
+    def __init__(self, max_floor: int, profile: MotionProfile = MotionProfile(), floor_heights: tuple = (3.5,)):
+        if max_floor < 1:
+            raise ValueError("max_floor must be higher than 1")
+        if len(floor_heights) not in (1, max_floor - 1):
+            raise ValueError("floor_heights must have one height or one per floor except the top one")
+        if min(floor_heights) <= 0:
+            raise ValueError("floor_heights must be higher than 0")
+
+        self.max_floor = max_floor
+        self.profile = profile
+        heights = np.broadcast_to(np.asarray(floor_heights, dtype=float), (max_floor - 1,))
+        # Position of every floor above the ground floor; index 0 is unused, floors start at 1
+        positions = np.concatenate(([0.0, 0.0], np.cumsum(heights)))
+        self.positions = positions.tolist()
+        self.times = flight_times(np.abs(positions[:, None] - positions[None, :]), profile).tolist()
+
+    def get(self, origin: int, destination: int) -> float:
+        """
+        Flight time from origin to destination without stopping
+
+        :return: seconds
+        """
+        return self.times[origin][destination]
+
+
+@lru_cache(maxsize=32)
+def get_travel_time_table(max_floor: int, profile: MotionProfile = MotionProfile(),
+                          floor_heights: tuple = (3.5,)) -> TravelTimeTable:
+    """
+    Travel time table of a building, shared by all cars and runs with the same parameters
+
+    :param max_floor: Number of floors
+    :param profile: MotionProfile
+    :param floor_heights: Height of every floor except the top one, or one height for all
+    :return: TravelTimeTable
+    """
+    return TravelTimeTable(max_floor, profile, tuple(floor_heights))
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from building import Building
+from dispatcher import EtaDispatcher
+from elevator import Elevator
+from events import NULL_SINK
+from kinematics import MotionProfile, TravelTimeTable, flight_times, get_travel_time_table
+from passenger import Passenger
+from simulation import Simulation
+
+PROFILE = MotionProfile(speed=2.5, acceleration=1.0, jerk=1.5, start_delay=0, leveling_time=0)
+
+
+def test_flight_time_full_profile():
+    # Long flight: reaches the rated speed, time = d / v + v / a + a / j
+    assert flight_times(100.0, PROFILE) == pytest.approx(100 / 2.5 + 2.5 / 1.0 + 1.0 / 1.5)
+
+
+def test_flight_time_is_continuous_between_regimes():
+    speed, acceleration, jerk = PROFILE.speed, PROFILE.acceleration, PROFILE.jerk
+    for boundary in (speed ** 2 / acceleration + speed * acceleration / jerk, 2 * acceleration ** 3 / jerk ** 2):
+        below, above = flight_times(np.array([boundary - 1e-9, boundary + 1e-9]), PROFILE)
+        assert below == pytest.approx(above, abs=1e-6)
+
+
+def test_flight_time_short_hop():
+    # Short flight: the car reaches neither its rated acceleration nor its rated speed
+    assert flight_times(0.5, PROFILE) == pytest.approx((32 * 0.5 / 1.5) ** (1 / 3))
+    assert flight_times(0.0, PROFILE) == 0
+
+
+def test_flight_time_invalid_profile():
+    with pytest.raises(ValueError):
+        flight_times(10.0, MotionProfile(speed=0))
+
+
+def test_travel_time_table_lookup():
+    table = TravelTimeTable(20, PROFILE, (3.5,))
+
+    assert table.get(1, 1) == 0
+    assert table.get(1, 20) == pytest.approx(float(flight_times(19 * 3.5, PROFILE)))
+    assert table.get(5, 2) == table.get(2, 5)
+    # Stopping costs time: one flight is faster than two
+    assert table.get(1, 10) < table.get(1, 5) + table.get(5, 10)
+
+
+def test_travel_time_table_express_zone():
+    heights = (3.5,) * 4 + (40.0,) + (3.5,) * 4  # floors 5 -> 6 cross an express zone
+    table = TravelTimeTable(10, PROFILE, heights)
+
+    assert table.positions[10] == pytest.approx(8 * 3.5 + 40)
+    assert table.get(5, 6) > table.get(1, 5)
+
+
+def test_travel_time_table_invalid_heights():
+    with pytest.raises(ValueError):
+        TravelTimeTable(10, PROFILE, (3.5, 3.5))
+
+
+def test_travel_time_table_is_cached():
+    assert get_travel_time_table(30, PROFILE) is get_travel_time_table(30, PROFILE)
+
+
+def journey_time(travel_times=None):
+    elevator = Elevator(12, 4, 1, event_sink=NULL_SINK, travel_times=travel_times)
+    passenger = Passenger(1, 12, elevator)
+    simulation = Simulation()
+    simulation.add_elevator(elevator)
+    simulation.add_passenger(passenger, 0)
+    elevator.stop_elevator()
+    simulation.run()
+    return passenger.get_journey_time()
+
+
+def test_elevator_flight_takes_table_time():
+    table = get_travel_time_table(12, PROFILE)
+
+    # Only the flight from the ground floor to the top differs from eleven hops of one tick
+    assert journey_time(table) - journey_time() == pytest.approx(table.get(1, 12) - 11)
+
+
+def test_eta_dispatcher_uses_travel_times():
+    table = get_travel_time_table(20, PROFILE)
+    building = Building(20, 2, 4, 1, dispatcher=EtaDispatcher(), event_sink=NULL_SINK, travel_times=table)
+    car = building.cars[0]
+    car.current_floor = 1
+
+    assert EtaDispatcher().estimate_time(car, 15) == pytest.approx(table.get(1, 15))
@@ -0,0 +1,315 @@
+import argparse
+import time
+
+import numpy as np
+
+from batch import DEFAULT_CONFIG, run_replication
+
+UP, DOWN = 0, 1  # index of the direction of a hall call
+NO_KEY = -1  # key of a passenger who has not called yet or has arrived
+NO_MATCH = -2  # key looked for by a car which lets nobody out or in
+MAX_FLOOR = 62  # floors are bits of one int64
+NEVER = np.iinfo(np.int64).max  # tick of an arrival which will not happen
+
+
+def generate_scenarios(scenarios: int, max_floor: int, passengers: int, arrival_rate, seed: int = 0) -> tuple:
+    """
+    Random trips with Poisson arrivals for every scenario at once
+
+    :param scenarios: Number of scenarios K
+    :param max_floor: Number of floors
+    :param passengers: Passengers per scenario N
+    :param arrival_rate: Passengers per simulated second, one rate or one per scenario
+    :param seed: Seed of the NumPy random generator
+    :return: (arrival times, origins, destinations), K x N arrays sorted by arrival time in every row
+    """
+    if max_floor < 2:
+        raise ValueError("max_floor must be higher than 2")
+    rng = np.random.default_rng(seed)
+    rates = np.broadcast_to(np.asarray(arrival_rate, dtype=float), (scenarios,))
+    arrival_times = np.cumsum(rng.exponential(1.0 / rates[:, None], (scenarios, passengers)), axis=1)
+    origins = rng.integers(1, max_floor + 1, (scenarios, passengers))
+    destinations = rng.integers(1, max_floor, (scenarios, passengers))
+    destinations += destinations >= origins
+    return arrival_times, origins, destinations
+
+
+class LockstepSimulation:
+    """
+    K independent scenarios advanced together, one tick at a time, with array operations. A tick
+    is tick_rate seconds: every car either moves one floor, or stops for door_ticks ticks to let
+    its passengers out and the waiting passengers of its direction in, up to its capacity, in order
+    of arrival. Cars follow collective control (as LookScheduler does) and a hall call goes to the
+    nearest car of its scenario when it is made, so the dispatch is simpler than with Building.
+
+    The C cars of scenario k are rows k * C .. k * C + C - 1 of the car arrays. Like the FloorSets
+    of Elevator, every row keeps counts of passengers per floor and bitsets of the floors with a
+    count, updated only where passengers arrive, board or alight; the decisions of a tick are then
+    a few shifts and masks over all rows. Passengers are K x N arrays in order of arrival, and only
+    the window between the first passenger who has not arrived and the next one to call is scanned
+    """
+
+    def __init__(self, arrival_times: np.ndarray, origins: np.ndarray, destinations: np.ndarray, max_floor: int,
+                 cars: int = 1, capacity=4, tick_rate: float = 1.0, door_ticks: int = 2):
+        if max_floor > MAX_FLOOR:
+            raise ValueError(f"max_floor must be at most {MAX_FLOOR}")
+        if cars < 1:
+            raise ValueError("cars must be higher than 1")
+        if tick_rate <= 0:
+            raise ValueError("tick_rate must be higher than 0")
+        scenarios, passengers = np.shape(origins)
+        self.cars_per_scenario = cars
+        self.max_floor = max_floor
+        self.tick_rate = tick_rate
+        self.door_ticks = door_ticks
+        self.tick = 0
+
+        self.arrival_ticks = np.ceil(np.asarray(arrival_times) / tick_rate).astype(np.int64)
+        self.origins = np.asarray(origins, dtype=np.int64)
+        self.destinations = np.asarray(destinations, dtype=np.int64)
+        self.directions = np.where(self.destinations > self.origins, UP, DOWN)
+        # What every passenger waits for, as one number so a scan compares a single array: a car row,
+        # direction and floor while waiting, a car row and floor while riding, NO_KEY otherwise.
+        # One column more than passengers, for windows running past the last passenger
+        self.keys = np.full((scenarios, passengers + 1), NO_KEY, dtype=np.int64)
+        self.board_ticks = np.full((scenarios, passengers), -1, dtype=np.int64)
+        self.alight_ticks = np.full((scenarios, passengers), -1, dtype=np.int64)
+        self.first_active = np.zeros(scenarios, dtype=np.int64)  # first passenger who has not arrived
+        self.next_arrival = np.zeros(scenarios, dtype=np.int64)  # next passenger to call
+        self.next_arrival_tick = self.arrival_ticks[:, 0].copy() if passengers else \
+            np.full(scenarios, NEVER, dtype=np.int64)
+        self.remaining = scenarios * passengers  # passengers who have not arrived
+
+        rows = scenarios * cars
+        self.positions = np.ones(rows, dtype=np.int64)
+        self.going_up = np.ones(rows, dtype=bool)
+        self.loads = np.zeros(rows, dtype=np.int64)
+        self.capacities = np.repeat(np.broadcast_to(np.asarray(capacity, dtype=np.int64), (scenarios,)), cars)
+        self.busy_until = np.zeros(rows, dtype=np.int64)  # tick until which the doors are open
+        # Passengers per floor (index = floor) and bitsets of the floors where the count is not 0
+        self.hall_counts = np.zeros((2, rows, max_floor + 1), dtype=np.int64)
+        self.car_counts = np.zeros((rows, max_floor + 1), dtype=np.int64)
+        self.hall_bits = np.zeros((2, rows), dtype=np.int64)
+        self.car_bits = np.zeros(rows, dtype=np.int64)
+
+    def get_waiting_key(self, rows: np.ndarray, directions: np.ndarray, floors: np.ndarray) -> np.ndarray:
+        return ((rows * 2 + directions) * (self.max_floor + 1) + floors) * 2
+
+    def get_riding_key(self, rows: np.ndarray, floors: np.ndarray) -> np.ndarray:
+        return (rows * (self.max_floor + 1) + floors) * 2 + 1
+
+    def is_finished(self) -> bool:
+        return self.remaining == 0
+
+    def arrive(self) -> None:
+        """
+        Passengers whose arrival tick has come call the nearest car of their scenario
+
+        :return: None
+        """
+        passengers = self.arrival_ticks.shape[1]
+        cars = self.cars_per_scenario
+        scenarios = np.flatnonzero(self.next_arrival_tick <= self.tick)
+        while len(scenarios):
+            indexes = self.next_arrival[scenarios]
+            origins = self.origins[scenarios, indexes]
+            directions = self.directions[scenarios, indexes]
+            positions = self.positions.reshape(-1, cars)[scenarios]
+            rows = scenarios * cars + np.abs(positions - origins[:, None]).argmin(axis=1)
+            self.keys[scenarios, indexes] = self.get_waiting_key(rows, directions, origins)
+            np.add.at(self.hall_counts, (directions, rows, origins), 1)
+            bits = self.hall_bits[directions, rows] | (1 << origins)
+            self.hall_bits[directions, rows] = bits
+
+            indexes += 1
+            self.next_arrival[scenarios] = indexes
+            self.next_arrival_tick[scenarios] = np.where(
+                indexes < passengers, self.arrival_ticks[scenarios, np.minimum(indexes, passengers - 1)], NEVER)
+            scenarios = scenarios[self.next_arrival_tick[scenarios] <= self.tick]
+
+    def get_window(self, scenarios: np.ndarray) -> np.ndarray:
+        """
+        Columns of the passengers of the scenarios who have called and not arrived yet, among
+        some who have already arrived
+
+        :param scenarios: Scenario indexes
+        :return: K' x W column indexes, past the last passenger the padding column of self.keys
+        """
+        first = self.first_active[scenarios]
+        width = int((self.next_arrival[scenarios] - first).max())
+        columns = first[:, None] + np.arange(width)
+        return np.minimum(columns, self.arrival_ticks.shape[1])
+
+    def stop(self, rows: np.ndarray) -> None:
+        """
+        Doors open: the passengers of the floor get out, then the waiting passengers of the
+        direction of the car get in, in order of arrival, as long as there is room
+
+        :param rows: Car rows which stop
+        :return: None
+        """
+        floors = self.positions[rows]
+        floor_bits = 1 << floors
+        self.busy_until[rows] = self.tick + self.door_ticks
+        scenarios = rows // self.cars_per_scenario
+        columns = self.get_window(scenarios)
+        keys = self.keys[scenarios[:, None], columns]
+
+        alighting = (self.car_bits[rows] & floor_bits) != 0
+        leaving = keys == np.where(alighting, self.get_riding_key(rows, floors), NO_MATCH)[:, None]
+        line_indexes, column_indexes = np.nonzero(leaving)
+        passengers = (scenarios[line_indexes], columns[line_indexes, column_indexes])
+        self.keys[passengers] = NO_KEY
+        self.alight_ticks[passengers] = self.tick
+        self.remaining -= len(line_indexes)
+        self.loads[rows] -= self.car_counts[rows, floors]
+        self.car_counts[rows, floors] = 0
+        self.car_bits[rows] &= ~floor_bits
+        self.advance_first_active(scenarios[alighting])
+
+        directions = (~self.going_up[rows]).astype(np.int64)
+        free = self.capacities[rows] - self.loads[rows]
+        boarding = ((self.hall_bits[directions, rows] & floor_bits) != 0) & (free > 0)
+        # A riding key is odd and a waiting key even, so the keys read before alighting can be reused
+        entering = keys == np.where(boarding, self.get_waiting_key(rows, directions, floors), NO_MATCH)[:, None]
+        # Passengers are in order of arrival, so the first ones to fit are the first ranks
+        entering &= np.cumsum(entering, axis=1) <= free[:, None]
+        line_indexes, column_indexes = np.nonzero(entering)
+        passengers = (scenarios[line_indexes], columns[line_indexes, column_indexes])
+        self.board_ticks[passengers] = self.tick
+        entered = entering.sum(axis=1)
+        self.loads[rows] += entered
+        counts = self.hall_counts[directions, rows, floors] - entered
+        self.hall_counts[directions, rows, floors] = counts
+        self.hall_bits[directions, rows] &= ~(floor_bits * (counts == 0))
+        destinations = self.destinations[passengers]
+        riders = rows[line_indexes]
+        self.keys[passengers] = self.get_riding_key(riders, destinations)
+        np.add.at(self.car_counts, (riders, destinations), 1)
+        np.bitwise_or.at(self.car_bits, riders, 1 << destinations)
+
+    def advance_first_active(self, scenarios: np.ndarray) -> None:
+        """
+        Move the start of the window of the scenarios past the passengers who have arrived
+
+        :param scenarios: Scenario indexes
+        :return: None
+        """
+        passengers = self.arrival_ticks.shape[1]
+        while len(scenarios):
+            first = self.first_active[scenarios]
+            arrived = self.alight_ticks[scenarios, np.minimum(first, passengers - 1)] >= 0
+            scenarios = scenarios[arrived & (first < passengers)]
+            self.first_active[scenarios] += 1
+
+    def step(self) -> None:
+        """
+        Advance all scenarios by one tick
+
+        :return: None
+        """
+        self.arrive()
+        positions = self.positions
+        going_up = self.going_up
+        floor_bits = 1 << positions
+        # Selections are written as masks: np.where on random conditions costs several times more
+        open_rows = self.loads < self.capacities  # a full car does not answer hall calls
+        requests = self.car_bits | (self.hall_bits[UP] | self.hall_bits[DOWN]) * open_rows
+        above = (requests >> (positions + 1)) != 0
+        below = (requests & (floor_bits - 1)) != 0
+        here = (requests & floor_bits) != 0
+        car_calls_here = (self.car_bits & floor_bits) != 0
+        up_here = open_rows & ((self.hall_bits[UP] & floor_bits) != 0)
+        down_here = open_rows & ((self.hall_bits[DOWN] & floor_bits) != 0)
+
+        # Turn at the end of the sweep, unless there is a reason to stop here in the current direction
+        keep = car_calls_here | (going_up & up_here) | (~going_up & down_here)
+        going_up = (keep & going_up) | (~keep & ((going_up & (above | ~below)) | (~going_up & above & ~below)))
+        waiting_here = (going_up & up_here) | (~going_up & down_here)
+        # Nothing ahead: a call here in the other direction turns the car
+        ready = self.busy_until <= self.tick
+        turning = ready & here & ~car_calls_here & ~waiting_here & ~((going_up & above) | (~going_up & below))
+        going_up ^= turning
+        self.going_up = going_up
+        stopping = ready & here & (car_calls_here | waiting_here | turning)
+        rows = np.flatnonzero(stopping)
+        if len(rows):
+            self.stop(rows)
+
+        moving = ready & ~stopping & (above | below)
+        positions += moving & going_up
+        positions -= moving & ~going_up
+        self.tick += 1
+
+    def run(self, max_ticks: int = None) -> None:
+        """
+        Step until every passenger has arrived
+
+        :param max_ticks: Tick to give up at
+        :return: None
+        """
+        while not self.is_finished():
+            if max_ticks is not None and self.tick >= max_ticks:
+                break
+            self.step()
+
+    def get_results(self) -> dict:
+        """
+        Waiting and journey times of every scenario, with nearest-rank percentiles as batch.py
+
+        :return: dict of arrays with one value per scenario
+        """
+        results = {'served': (self.alight_ticks >= 0).sum(axis=1)}
+        for name, ticks in (('wait', self.board_ticks), ('journey', self.alight_ticks)):
+            done = ticks >= 0
+            count = done.sum(axis=1)
+            times = np.where(done, (ticks - self.arrival_ticks) * self.tick_rate, np.inf)
+            times.sort(axis=1)
+            rank = np.maximum(0, np.ceil(0.95 * count).astype(np.int64) - 1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                results[f'{name}_mean'] = np.where(done, times, 0.0).sum(axis=1) / count
+            results[f'{name}_p95'] = np.where(count > 0, np.take_along_axis(times, rank[:, None], axis=1)[:, 0],
+                                              np.nan)
+        return results
+
+
+def run_lockstep(config: dict, scenarios: int, seed: int = 0) -> dict:
+    """
+    Simulate replications of a batch configuration (see batch.DEFAULT_CONFIG) in lockstep
+
+    :param config: Configuration of the replications
+    :param scenarios: Number of replications
+    :param seed: Seed of the traffic
+    :return: dict of arrays with one value per replication
+    """
+    trips = generate_scenarios(scenarios, config['max_floor'], config['passengers'], config['arrival_rate'], seed)
+    simulation = LockstepSimulation(*trips, config['max_floor'], config['cars'], config['max_passengers'],
+                                    config['tick_rate'])
+    simulation.run()
+    return simulation.get_results()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Scenario throughput of the lockstep kernel and of the simulation')
+    parser.add_argument('--scenarios', type=int, default=2000)
+    parser.add_argument('--reference', type=int, default=50, help='scenarios run with the object simulation')
+    parser.add_argument('--cars', type=int, default=DEFAULT_CONFIG['cars'])
+    parser.add_argument('--max-floor', type=int, default=DEFAULT_CONFIG['max_floor'])
+    args = parser.parse_args()
+
+    config = {**DEFAULT_CONFIG, 'cars': args.cars, 'max_floor': args.max_floor}
+    started = time.perf_counter()
+    results = run_lockstep(config, args.scenarios)
+    lockstep = args.scenarios / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    reference_waits = [np.mean(run_replication(config, seed)[0]) for seed in range(args.reference)]
+    reference = args.reference / (time.perf_counter() - started)
+
+    print(f"lockstep  {lockstep:10.1f} scenarios/s  wait mean {np.mean(results['wait_mean']):.2f}")
+    print(f"simulation {reference:9.1f} scenarios/s  wait mean {np.mean(reference_waits):.2f}")
+    print(f"speedup {lockstep / reference:.1f}x", flush=True)
+
+
+if __name__ == '__main__':
+    main()
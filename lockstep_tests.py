@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from batch import DEFAULT_CONFIG, run_replication
+from lockstep import generate_scenarios, LockstepSimulation, run_lockstep
+
+
+def test_generate_scenarios():
+    arrival_times, origins, destinations = generate_scenarios(20, 10, 30, [0.1] * 10 + [1.0] * 10, seed=1)
+
+    assert arrival_times.shape == origins.shape == destinations.shape == (20, 30)
+    assert (np.diff(arrival_times, axis=1) >= 0).all()
+    assert (origins != destinations).all()
+    assert origins.min() >= 1 and destinations.max() <= 10
+    assert arrival_times[10:, -1].mean() < arrival_times[:10, -1].mean()
+
+
+def test_lockstep_too_many_floors():
+    with pytest.raises(ValueError):
+        LockstepSimulation(np.zeros((1, 1)), np.ones((1, 1)), np.full((1, 1), 2), 100)
+
+
+def test_lockstep_single_trip():
+    simulation = LockstepSimulation(np.array([[0.0]]), np.array([[3]]), np.array([[6]]), 10)
+    simulation.run()
+
+    # Two floors up, doors for two ticks, three floors up
+    assert simulation.board_ticks.tolist() == [[2]]
+    assert simulation.alight_ticks.tolist() == [[7]]
+    assert simulation.get_results()['journey_mean'].tolist() == [7.0]
+
+
+def test_lockstep_capacity_and_order():
+    origins = np.array([[1] * 6])
+    destinations = np.array([[5] * 6])
+    simulation = LockstepSimulation(np.zeros((1, 6)), origins, destinations, 10, capacity=4)
+    simulation.run()
+
+    boarded = simulation.board_ticks[0]
+    assert (boarded[:4] == 0).all()
+    assert (boarded[4:] > 0).all()
+    assert simulation.is_finished()
+
+
+def test_lockstep_scenarios_are_independent():
+    trips = generate_scenarios(50, 12, 40, 0.2, seed=3)
+    together = LockstepSimulation(*trips, 12, cars=2)
+    together.run()
+    alone = LockstepSimulation(*(array[7:8] for array in trips), 12, cars=2)
+    alone.run()
+
+    assert np.array_equal(together.board_ticks[7], alone.board_ticks[0])
+    assert np.array_equal(together.alight_ticks[7], alone.alight_ticks[0])
+
+
+def test_run_lockstep_close_to_simulation():
+    results = run_lockstep(DEFAULT_CONFIG, 400)
+    reference = [np.mean(run_replication(DEFAULT_CONFIG, seed)[0]) for seed in range(40)]
+
+    assert (results['served'] == DEFAULT_CONFIG['passengers']).all()
+    assert results['wait_mean'].mean() == pytest.approx(np.mean(reference), rel=0.25)
@@ -0,0 +1,238 @@
+import json
+
+from energy import summarize_energy
+from events import EventSink, EventLevel, EventType, Event, TeeSink
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from elevator import Elevator
+
+
+class StreamingHistogram:
+    """
+    HDR-style histogram in constant memory: values are counted in buckets whose width doubles with
+    every power of two, each power split into 2 ** sub_bucket_bits linear sub-buckets, so every
+    recorded value is known within a relative error of 2 ** (1 - sub_bucket_bits)
+    """
+
+    def __init__(self, resolution: float = 0.01, sub_bucket_bits: int = 7):
+        if resolution <= 0:
+            raise ValueError("resolution must be higher than 0")
+        self.resolution = resolution  # smallest distinguishable value
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = {}  # lower bound of the bucket in units of resolution -> count
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value: float) -> None:
+        """
+        Count one value
+
+        :param value: Non-negative value
+        :return: None
+        """
+        units = int(value / self.resolution)
+        shift = max(0, units.bit_length() - self.sub_bucket_bits)
+        lower_bound = units >> shift << shift
+        self.counts[lower_bound] = self.counts.get(lower_bound, 0) + 1
+
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def get_mean(self) -> float:
+        return self.total / self.count if self.count else None
+
+    def get_percentile(self, fraction: float) -> float:
+        """
+        Value below which the given fraction of the recorded values falls
+
+        :param fraction: Percentile as a fraction, e.g. 0.95
+        :return: highest value of the bucket holding the percentile, None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for lower_bound in sorted(self.counts):
+            seen += self.counts[lower_bound]
+            if seen >= rank:
+                shift = max(0, lower_bound.bit_length() - self.sub_bucket_bits)
+                highest_equivalent = (lower_bound + (1 << shift) - 1) * self.resolution
+                return min(highest_equivalent, self.max)
+        return self.max
+
+    def get_summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.get_mean(),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.get_percentile(0.5),
+            'p95': self.get_percentile(0.95),
+            'p99': self.get_percentile(0.99),
+        }
+
+
+class CarStats:
+    """
+    Utilization counters of one car
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.departures = 0
+        self.stops = 0  # door openings
+        self.floors_travelled = 0
+        self.boarded = 0
+        self.alighted = 0
+        self.load = 0
+        self.load_time = 0.0  # integral of the load over time
+        self.first_time = None
+        self.last_time = None
+
+    def update_load(self, time: float, change: int) -> None:
+        """
+        Account the load carried since the last change and apply the new change
+
+        :param time: Simulated time of the change
+        :param change: +1 on boarding, -1 on alighting
+        :return: None
+        """
+        if self.last_time is not None:
+            self.load_time += self.load * (time - self.last_time)
+        self.last_time = time
+        self.load += change
+
+    def get_summary(self, now: float) -> dict:
+        load_time = self.load_time
+        if self.last_time is not None:
+            load_time += self.load * (now - self.last_time)
+        elapsed = now - self.first_time if self.first_time is not None else 0
+        return {
+            'departures': self.departures,
+            'stops': self.stops,
+            'floors_travelled': self.floors_travelled,
+            'boarded': self.boarded,
+            'alighted': self.alighted,
+            'stops_per_departure': self.stops / self.departures if self.departures else None,
+            'load_factor': load_time / (elapsed * self.capacity) if elapsed > 0 else None,
+        }
+
+
+class Metrics(EventSink):
+    """
+    Key performance indicators of a simulation, collected from the events of the elevators:
+    waiting time (call -> boarding), time to destination (call -> alighting), stops per ride and
+    per-car utilization. Memory does not grow with the number of passengers served
+    """
+
+    def __init__(self, resolution: float = 0.01, path: str = None):
+        super().__init__(EventLevel.DEBUG)
+        self.path = path  # JSON file written by export()
+        self.wait_time = StreamingHistogram(resolution)
+        self.journey_time = StreamingHistogram(resolution)
+        self.ride_stops = StreamingHistogram(1)  # stops a passenger sat through, their own included
+        self.cars = {}
+        self.energy_meters = {}  # car number -> EnergyMeter of the cars which have one
+        self.called = 0
+        self._call_times = {}  # passengers who have not arrived yet
+        self._stops_at_boarding = {}
+
+    def attach(self, elevator: "Elevator") -> None:
+        """
+        Start collecting the elevator's events, keeping its current sink. Passengers who called
+        before are taken from the elevator, with the call times kept by their store
+
+        :param elevator: Elevator instance
+        :return: None
+        """
+        self.cars[elevator.number] = CarStats(elevator.max_passengers)
+        for passenger_instance in list(elevator.pending_passengers.values()) + list(elevator.riders.values()):
+            if passenger_instance.id not in self._call_times and passenger_instance.call_time is not None:
+                self.called += 1
+                self._call_times[passenger_instance.id] = passenger_instance.call_time
+        for passenger_id in elevator.riders:
+            self._stops_at_boarding.setdefault(passenger_id, 0)
+        self.cars[elevator.number].load = len(elevator.riders)
+        if elevator.energy_meter is not None:
+            self.energy_meters[elevator.number] = elevator.energy_meter
+        if elevator.event_sink is not self:
+            elevator.event_sink = TeeSink(elevator.event_sink, self)
+
+    def get_car_stats(self, car: int) -> CarStats:
+        if car not in self.cars:
+            self.cars[car] = CarStats(1)
+        return self.cars[car]
+
+    def write(self, event: Event) -> None:
+        car_stats = self.get_car_stats(event.car)
+        if car_stats.first_time is None:
+            car_stats.first_time = event.time
+
+        if event.type is EventType.HALL_CALL:
+            self.called += 1
+            self._call_times[event.passenger] = event.time
+        elif event.type is EventType.BOARD:
+            if event.passenger in self._call_times:
+                self.wait_time.record(event.time - self._call_times[event.passenger])
+            self._stops_at_boarding[event.passenger] = car_stats.stops
+            car_stats.boarded += 1
+            car_stats.update_load(event.time, 1)
+        elif event.type is EventType.ALIGHT:
+            # Passengers who boarded before the collection started without a known call have no times
+            if event.passenger in self._call_times:
+                self.journey_time.record(event.time - self._call_times.pop(event.passenger))
+            if event.passenger in self._stops_at_boarding:
+                self.ride_stops.record(car_stats.stops - self._stops_at_boarding.pop(event.passenger))
+            car_stats.alighted += 1
+            car_stats.update_load(event.time, -1)
+        elif event.type is EventType.CANCEL:
+            if self._call_times.pop(event.passenger, None) is not None:
+                self.called -= 1
+        elif event.type is EventType.DEPART:
+            car_stats.departures += 1
+        elif event.type is EventType.ARRIVE:
+            car_stats.floors_travelled += 1
+        elif event.type is EventType.DOOR_OPEN:
+            car_stats.stops += 1
+
+    def get_summary(self, now: float) -> dict:
+        """
+        Summary of the indicators collected so far
+
+        :param now: Current simulated time
+        :return: dict
+        """
+        summary = {
+            'time': now,
+            'called': self.called,
+            'waiting': self.called - self.wait_time.count,
+            'riding': self.wait_time.count - self.journey_time.count,
+            'wait_time': self.wait_time.get_summary(),
+            'journey_time': self.journey_time.get_summary(),
+            'ride_stops': self.ride_stops.get_summary(),
+            'cars': {car: car_stats.get_summary(now) for car, car_stats in sorted(self.cars.items())},
+        }
+        if self.energy_meters:
+            summary['energy'] = summarize_energy(self.energy_meters, now, self.journey_time.count)
+        return summary
+
+    def export(self, now: float) -> dict:
+        """
+        Summary of the indicators, also written as JSON to path when it was given
+
+        :param now: Current simulated time
+        :return: dict
+        """
+        summary = self.get_summary(now)
+        if self.path is not None:
+            with open(self.path, 'w') as file:
+                json.dump(summary, file, indent=2)
+        return summary
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+from building import Building
+from elevator import Elevator
+from events import NULL_SINK, MemorySink, TeeSink
+from metrics import StreamingHistogram, Metrics
+from passenger import Passenger
+from simulation import Simulation
+
+
+def test_histogram_summary():
+    histogram = StreamingHistogram(resolution=1)
+    for value in range(1, 101):
+        histogram.record(value)
+
+    assert histogram.count == 100
+    assert histogram.get_mean() == 50.5
+    assert histogram.get_percentile(0.5) == 50
+    assert histogram.get_percentile(0.99) == 99
+    assert histogram.min == 1 and histogram.max == 100
+
+
+def test_histogram_relative_error():
+    for value in (1234.5, 98765.4, 0.37):
+        histogram = StreamingHistogram(resolution=0.01, sub_bucket_bits=7)
+        histogram.record(value)
+        histogram.record(value * 2)
+
+        assert histogram.get_percentile(0.5) == pytest.approx(value, rel=2 ** -6)
+
+
+def test_histogram_memory_is_bounded():
+    histogram = StreamingHistogram(resolution=0.01, sub_bucket_bits=5)
+    for value in range(100000):
+        histogram.record(value * 0.37)
+
+    assert len(histogram.counts) < 32 * 24
+
+
+def test_histogram_empty():
+    histogram = StreamingHistogram()
+
+    assert histogram.get_mean() is None
+    assert histogram.get_percentile(0.95) is None
+
+
+def test_histogram_resolution_zero():
+    with pytest.raises(ValueError):
+        StreamingHistogram(0)
+
+
+def test_metrics_one_trip():
+    elevator = Elevator(10, 4, 1.0, NULL_SINK)
+    metrics = Metrics(resolution=0.5)
+    simulation = Simulation(metrics=metrics)
+    simulation.add_elevator(elevator)
+    simulation.add_passenger(Passenger(3, 5, elevator))
+    elevator.stop_elevator()
+    simulation.run()
+    summary = metrics.get_summary(simulation.now)
+
+    # Leaving for the 3rd floor takes a tick, two floors more; the doors and leaving for the 5th
+    # floor take two ticks, two floors more
+    assert summary['called'] == 1
+    assert summary['wait_time']['mean'] == 3.0
+    assert summary['journey_time']['mean'] == 8.0
+    assert summary['ride_stops']['max'] == 1
+    assert summary['cars'][0]['floors_travelled'] == 4
+    assert summary['cars'][0]['stops'] == 2
+    assert 0 < summary['cars'][0]['load_factor'] < 1
+
+
+def test_metrics_keep_existing_sink():
+    sink = MemorySink()
+    elevator = Elevator(10, 4, 1.0, sink)
+    metrics = Metrics()
+    metrics.attach(elevator)
+
+    assert isinstance(elevator.event_sink, TeeSink)
+    assert elevator.event_sink.sinks == [sink, metrics]
+
+
+def test_metrics_summary_while_running():
+    building = Building(10, 2, 4, 1.0, event_sink=NULL_SINK)
+    metrics = Metrics()
+    simulation = Simulation(metrics=metrics)
+    simulation.add_building(building)
+    for floor in range(2, 10):
+        simulation.add_passenger(Passenger(floor, 1, building), floor * 10)
+    simulation.run(until=45)
+    summary = metrics.get_summary(simulation.now)
+
+    assert summary['called'] == 3
+    assert summary['journey_time']['count'] < 3
+    assert set(summary['cars']) == {0, 1}
+
+
+def test_metrics_exported_at_end_of_run(tmp_path):
+    path = tmp_path / "kpi.json"
+    elevator = Elevator(10, 4, 1.0, NULL_SINK)
+    simulation = Simulation(metrics=Metrics(path=str(path)))
+    simulation.add_elevator(elevator)
+    simulation.add_passenger(Passenger(2, 8, elevator))
+    elevator.stop_elevator()
+    simulation.run()
+
+    assert json.loads(path.read_text())['journey_time']['count'] == 1
+
+
+def test_metrics_passengers_called_before_run():
+    elevator = Elevator(10, 4, 0.001, NULL_SINK)
+    Passenger(3, 6, elevator).call_elevator()
+    elevator.stop_elevator()
+    metrics = Metrics()
+    elevator.run(metrics=metrics)
+
+    assert metrics.called == 1
+    assert metrics.wait_time.count == metrics.journey_time.count == 1
+
+    building = Building(10, 2, 4, 0.001, event_sink=NULL_SINK)
+    for floor in (2, 5, 9):
+        Passenger(floor, 1, building).call_elevator()
+    building.stop_elevator()
+    metrics = Metrics()
+    building.run(metrics=metrics)
+
+    assert metrics.called == 3
+    assert metrics.journey_time.count == 3
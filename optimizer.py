@@ -0,0 +1,128 @@
+import random
+import time
+from collections import namedtuple
+from math import exp
+
+# State of a car for the search: floor, +1 up or -1 down, and the floors its passengers go to
+CarState = namedtuple('CarState', ['position', 'direction', 'stops'])
+# Hall call: floor, +1 up or -1 down, and the simulated seconds the passenger has already waited
+Call = namedtuple('Call', ['floor', 'direction', 'waited'])
+
+
+class AssignmentProblem:
+    """
+    Assignment of the waiting hall calls to the cars. A car serves its calls the way collective
+    control does: first the calls ahead in its direction, then the calls of the other direction on
+    the way back, then the calls behind it in its direction. The cost of an assignment is the sum
+    of the squared predicted waiting times, so one very long wait weighs more than several short ones.
+    The problem holds plain data only, so it can be sent to worker processes
+    """
+
+    def __init__(self, cars: list, calls: list, travel_times: list, stop_time: float):
+        self.cars = cars  # CarState of every car
+        self.calls = calls  # Call of every waiting passenger
+        self.travel_times = travel_times  # flight time between every pair of floors, index = floor
+        self.stop_time = stop_time  # simulated seconds of one stop
+
+    def get_car_cost(self, car: int, call_indexes: list) -> float:
+        """
+        Cost of the calls served by one car
+
+        :param car: Index of the car
+        :param call_indexes: Indexes of the calls given to the car
+        :return: sum of the squared predicted waiting times
+        """
+        if not call_indexes:
+            return 0.0
+        state = self.cars[car]
+        direction, position = state.direction, state.position
+        # (phase, order within the phase, floor, call index or -1 for a stop of the passengers in the car)
+        stops = [((0, floor * direction) if (floor - position) * direction >= 0 else (1, -floor * direction),
+                  floor, -1) for floor in state.stops]
+        for index in call_indexes:
+            call = self.calls[index]
+            if call.direction != direction:
+                key = (1, -call.floor * direction)
+            else:
+                key = (0 if (call.floor - position) * direction >= 0 else 2, call.floor * direction)
+            stops.append((key, call.floor, index))
+        stops.sort()
+
+        travel_times = self.travel_times
+        elapsed = 0.0
+        previous = None
+        cost = 0.0
+        for key, floor, index in stops:
+            if key != previous:
+                if previous is not None:
+                    elapsed += self.stop_time
+                elapsed += travel_times[position][floor]
+                position, previous = floor, key
+            if index >= 0:
+                wait = self.calls[index].waited + elapsed
+                cost += wait * wait
+        return cost
+
+    def get_cost(self, assignment: list) -> float:
+        """
+        Cost of a complete assignment
+
+        :param assignment: Index of the car of every call
+        :return: float
+        """
+        calls = [[] for car in self.cars]
+        for index, car in enumerate(assignment):
+            calls[car].append(index)
+        return sum(self.get_car_cost(car, call_indexes) for car, call_indexes in enumerate(calls))
+
+
+def anneal(problem: AssignmentProblem, start: list, budget: float, seed: int = 0) -> tuple:
+    """
+    Simulated annealing over the assignment: a move gives one call to another car, and only the
+    costs of the two cars involved are recomputed. The temperature falls linearly with the CPU time
+    used, and the search stops when the budget is spent
+
+    :param problem: AssignmentProblem
+    :param start: Index of the car of every call to start from, e.g. the best assignment of the previous cycle
+    :param budget: CPU seconds of this process
+    :param seed: Seed of the random moves
+    :return: (best assignment, its cost, number of moves tried)
+    """
+    deadline = time.process_time() + budget
+    rng = random.Random(seed)
+    assignment = list(start)
+    calls = [[] for car in problem.cars]
+    for index, car in enumerate(assignment):
+        calls[car].append(index)
+    costs = [problem.get_car_cost(car, call_indexes) for car, call_indexes in enumerate(calls)]
+    cost = sum(costs)
+    best, best_cost = list(assignment), cost
+    if len(problem.cars) < 2 or not assignment:
+        return best, best_cost, 0
+
+    initial_temperature = cost / len(assignment) * 0.1 + 1e-9
+    moves = 0
+    while True:
+        if moves % 8 == 0:
+            remaining = deadline - time.process_time()
+            if remaining <= 0:
+                break
+            temperature = initial_temperature * remaining / budget
+        moves += 1
+
+        index = rng.randrange(len(assignment))
+        old_car = assignment[index]
+        new_car = rng.randrange(len(problem.cars) - 1)
+        new_car += new_car >= old_car
+        old_calls = [call for call in calls[old_car] if call != index]
+        new_calls = calls[new_car] + [index]
+        old_cost, new_cost = problem.get_car_cost(old_car, old_calls), problem.get_car_cost(new_car, new_calls)
+        delta = old_cost + new_cost - costs[old_car] - costs[new_car]
+        if delta <= 0 or rng.random() < exp(-delta / temperature):
+            assignment[index] = new_car
+            calls[old_car], calls[new_car] = old_calls, new_calls
+            costs[old_car], costs[new_car] = old_cost, new_cost
+            cost += delta
+            if cost < best_cost - 1e-9:
+                best, best_cost = list(assignment), cost
+    return best, problem.get_cost(best), moves
@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+import pytest
+from building import Building
+from capacity import NO_GROUP
+from dispatcher import OptimizingDispatcher
+from events import NULL_SINK, MemorySink, EventType
+from metrics import Metrics
+from optimizer import AssignmentProblem, CarState, Call, anneal
+from passenger import Passenger
+from simulation import Simulation
+from traffic import generate_trips, iter_trips, TripFeeder
+
+TRAVEL_TIMES = [[abs(destination - origin) * 1.0 for destination in range(11)] for origin in range(11)]
+
+
+def test_car_cost_follows_collective_control():
+    # Car at 5 going up: the call up at 8 first, then down from 9, then up from 2
+    problem = AssignmentProblem([CarState(5, 1, ())], [Call(2, 1, 0.0), Call(8, 1, 0.0), Call(9, -1, 0.0)],
+                                TRAVEL_TIMES, 1.0)
+
+    assert problem.get_car_cost(0, [1]) == 3.0 ** 2
+    assert problem.get_car_cost(0, [1, 2]) == 3.0 ** 2 + 5.0 ** 2
+    assert problem.get_car_cost(0, [0, 1, 2]) == 3.0 ** 2 + 5.0 ** 2 + 13.0 ** 2
+
+
+def test_car_cost_counts_car_calls_and_waited_time():
+    problem = AssignmentProblem([CarState(1, 1, (4,))], [Call(6, 1, 10.0)], TRAVEL_TIMES, 2.0)
+
+    assert problem.get_car_cost(0, [0]) == (10.0 + 3.0 + 2.0 + 2.0) ** 2
+
+
+def test_anneal_improves_start_within_budget():
+    problem = AssignmentProblem([CarState(1, 1, ()), CarState(10, -1, ())],
+                                [Call(floor, 1 if floor < 5 else -1, 0.0) for floor in (2, 3, 8, 9)], TRAVEL_TIMES, 1.0)
+    start = [1, 1, 0, 0]
+
+    started = time.process_time()
+    best, cost, moves = anneal(problem, start, 0.02, seed=1)
+
+    assert time.process_time() - started < 0.5
+    assert moves > 0
+    assert best == [0, 0, 1, 1]
+    assert cost == problem.get_cost(best) < problem.get_cost(start)
+
+
+def test_optimizing_dispatcher_invalid_budget():
+    with pytest.raises(ValueError):
+        OptimizingDispatcher(budget=0)
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_optimizing_dispatcher_serves_everybody(workers):
+    trips = generate_trips({'interfloor': 0.2}, 300.0, 10, rng=np.random.default_rng(2))
+    dispatcher = OptimizingDispatcher(cycle=5.0, budget=0.002, workers=workers)
+    building = Building(10, 3, 8, event_sink=NULL_SINK, dispatcher=dispatcher)
+    metrics = Metrics()
+    simulation = Simulation(metrics=metrics)
+    simulation.add_building(building)
+    TripFeeder(simulation, building, iter_trips(*trips))
+    building.stop_elevator()
+    simulation.run()
+    dispatcher.close()
+
+    assert metrics.journey_time.count == len(trips[0])
+    assert metrics.called == len(trips[0])
+    assert not dispatcher.scheduled
+
+
+def test_optimizing_dispatcher_moves_calls_silently():
+    trips = generate_trips({'interfloor': 0.3}, 300.0, 10, rng=np.random.default_rng(4))
+    dispatcher = OptimizingDispatcher(cycle=2.0, budget=0.002)
+    sink = MemorySink()
+    building = Building(10, 3, 8, event_sink=sink, dispatcher=dispatcher, reservations=True)
+    simulation = Simulation()
+    simulation.add_building(building)
+    arrival_times, origins, destinations = trips
+    for index, (arrival_time, origin, destination) in enumerate(zip(arrival_times, origins, destinations)):
+        # Pairs of passengers travelling together
+        passenger = Passenger(int(origin), int(destination), building, group=index // 2 if index % 4 < 2 else NO_GROUP)
+        simulation.add_passenger(passenger, float(arrival_time))
+    building.stop_elevator()
+    simulation.run()
+
+    types = [event.type for event in sink.events]
+    assert types.count(EventType.HALL_CALL) == len(arrival_times)
+    assert types.count(EventType.CANCEL) == 0
+    assert types.count(EventType.ALIGHT) == len(arrival_times)
@@ -0,0 +1,188 @@
+import argparse
+from math import exp
+
+import numpy as np
+
+from building import Building
+from events import EventSink, EventLevel, EventType, Event, TeeSink, NULL_SINK
+from metrics import Metrics
+from simulation import Simulation
+from traffic import daily_rates, generate_trips, iter_trips, TripFeeder
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from elevator import Elevator
+
+
+class ParkingPolicy:
+    """
+    Decides where an idle car without calls waits for the next one
+    """
+
+    def attach(self, cars: list) -> None:
+        """
+        Called with all cars of the group when the policy is given to them
+
+        :param cars: Elevator instances
+        :return: None
+        """
+        self.cars = cars
+
+    def get_home_floor(self, car: "Elevator") -> Optional[int]:
+        """
+        Floor the idle car goes to
+
+        :param car: Elevator instance
+        :return: floor number, None to stay in place
+        """
+        raise NotImplementedError
+
+
+class StayInPlace(ParkingPolicy):
+    """
+    The car waits where it served its last call
+    """
+
+    def get_home_floor(self, car: "Elevator") -> Optional[int]:
+        return None
+
+
+class LobbyReturn(ParkingPolicy):
+    """
+    Every idle car returns to the lobby, where most trips start in the morning
+    """
+
+    def __init__(self, lobby: int = 1):
+        self.lobby = lobby
+
+    def get_home_floor(self, car: "Elevator") -> Optional[int]:
+        return self.lobby
+
+
+class ZoneHoming(ParkingPolicy):
+    """
+    The floors are split evenly into one zone per car, and an idle car waits in the middle of its zone
+    """
+
+    def get_home_floor(self, car: "Elevator") -> Optional[int]:
+        cars = len(self.cars)
+        floors_count = car.max_floor - car.min_floor + 1
+        first_floor = car.min_floor + floors_count * car.number // cars
+        last_floor = max(first_floor, car.min_floor + floors_count * (car.number + 1) // cars - 1)
+        return (first_floor + last_floor) // 2
+
+
+class DemandEstimator(EventSink):
+    """
+    Rolling estimate of the hall calls per second of every floor: every call adds to its floor's
+    count and the counts decay exponentially with the given half-life
+    """
+
+    def __init__(self, max_floor: int, half_life: float = 300.0):
+        super().__init__(EventLevel.INFO)
+        if half_life <= 0:
+            raise ValueError("half_life must be higher than 0")
+        self.time_constant = half_life / np.log(2)
+        self.counts = np.zeros(max_floor + 1)
+        self.updated = 0.0  # time the counts were last decayed to
+
+    def decay(self, now: float) -> None:
+        if now > self.updated:
+            self.counts *= exp((self.updated - now) / self.time_constant)
+            self.updated = now
+
+    def write(self, event: Event) -> None:
+        if event.type is EventType.HALL_CALL:
+            self.decay(event.time)
+            self.counts[event.floor] += 1
+
+    def get_rates(self, now: float) -> np.ndarray:
+        """
+        Estimated calls per second of every floor, index = floor
+
+        :param now: Current simulated time
+        :return: array
+        """
+        self.decay(now)
+        return self.counts / self.time_constant
+
+
+class ForecastHoming(ParkingPolicy):
+    """
+    Idle cars are spread over the floors with the highest estimated demand: each car goes to the
+    busiest floor that no other idle or repositioning car covers yet, the nearest one on a tie
+    """
+
+    def __init__(self, max_floor: int, half_life: float = 300.0):
+        self.estimator = DemandEstimator(max_floor, half_life)
+
+    def attach(self, cars: list) -> None:
+        super().attach(cars)
+        for car in cars:
+            if car.event_sink is not self.estimator:
+                car.event_sink = TeeSink(car.event_sink, self.estimator)
+
+    def get_home_floor(self, car: "Elevator") -> Optional[int]:
+        rates = self.estimator.get_rates(car.clock.now)
+        if not rates.any():
+            return None
+        covered = {other.floor_to_reach if other.repositioning else other.current_floor
+                   for other in self.cars if other is not car and (other.repositioning or other.is_parked())}
+        floors = [floor for floor in np.flatnonzero(rates).tolist() if floor not in covered]
+        if not floors:
+            return None
+        return max(floors, key=lambda floor: (rates[floor], -abs(floor - car.current_floor)))
+
+
+POLICIES = {
+    'stay': lambda max_floor: StayInPlace(),
+    'lobby': lambda max_floor: LobbyReturn(),
+    'zone': lambda max_floor: ZoneHoming(),
+    'forecast': lambda max_floor: ForecastHoming(max_floor),
+}
+
+
+def compare_policies(max_floor: int = 16, cars: int = 4, population: int = 800, seed: int = 0,
+                     policies: list = None) -> dict:
+    """
+    Simulate one office day with every parking policy on the same trips
+
+    :param max_floor: Number of floors
+    :param cars: Number of cars
+    :param population: Number of people in the building
+    :param seed: Seed of the traffic
+    :param policies: Names from POLICIES, all when omitted
+    :return: policy name -> summary of the waiting times
+    """
+    trips = generate_trips(daily_rates(population), 300.0, max_floor, rng=np.random.default_rng(seed))
+    results = {}
+    for name in policies or POLICIES:
+        building = Building(max_floor, cars, 12, event_sink=NULL_SINK, parking_policy=POLICIES[name](max_floor))
+        metrics = Metrics()
+        simulation = Simulation(metrics=metrics)
+        simulation.add_building(building)
+        TripFeeder(simulation, building, iter_trips(*trips))
+        building.stop_elevator()
+        simulation.run()
+        results[name] = metrics.get_summary(simulation.now)['wait_time']
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare idle car parking policies over one office day')
+    parser.add_argument('--max-floor', type=int, default=16)
+    parser.add_argument('--cars', type=int, default=4)
+    parser.add_argument('--population', type=int, default=800)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policies', nargs='+', choices=list(POLICIES), default=None)
+    args = parser.parse_args()
+
+    for name, wait_time in compare_policies(args.max_floor, args.cars, args.population, args.seed,
+                                            args.policies).items():
+        print(f"{name:<10} wait mean {wait_time['mean']:8.2f} p95 {wait_time['p95']:8.2f} "
+              f"p99 {wait_time['p99']:8.2f}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
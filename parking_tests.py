@@ -0,0 +1,65 @@
+import pytest
+from building import Building
+from elevator import Elevator
+from events import MemorySink, EventType, Event, NULL_SINK
+from parking import ZoneHoming, LobbyReturn, DemandEstimator, ForecastHoming, compare_policies
+from passenger import Passenger
+from simulation import Simulation
+
+
+def test_zone_homing_floors():
+    building = Building(12, 3, 8, event_sink=NULL_SINK, parking_policy=ZoneHoming())
+    policy = building.cars[0].parking_policy
+
+    assert [policy.get_home_floor(car) for car in building.cars] == [2, 6, 10]
+
+
+def test_demand_estimator_decay():
+    estimator = DemandEstimator(10, half_life=60.0)
+    estimator.write(Event(0.0, EventType.HALL_CALL, 0, 5, 1))
+
+    rates = estimator.get_rates(60.0)
+    assert estimator.counts[5] == pytest.approx(0.5)
+    assert rates[5] == pytest.approx(0.5 / estimator.time_constant)
+    assert rates.argmax() == 5
+
+
+def test_demand_estimator_invalid_half_life():
+    with pytest.raises(ValueError):
+        DemandEstimator(10, half_life=0)
+
+
+def test_lobby_return_does_not_open_doors():
+    sink = MemorySink()
+    elevator = Elevator(10, 4, 1.0, event_sink=sink, parking_policy=LobbyReturn())
+    simulation = Simulation()
+    simulation.add_elevator(elevator)
+    simulation.add_passenger(Passenger(5, 8, elevator))
+    elevator.stop_elevator()
+    simulation.run()
+
+    assert elevator.current_floor == 1
+    assert not elevator.repositioning
+    opened = [event.floor for event in sink.events if event.type is EventType.DOOR_OPEN]
+    assert opened == [5, 8]
+
+
+def test_forecast_homing_goes_to_busiest_floor():
+    building = Building(10, 2, 8, event_sink=NULL_SINK, parking_policy=ForecastHoming(10))
+    policy = building.cars[0].parking_policy
+    assert policy.get_home_floor(building.cars[0]) is None
+
+    for floor in (7, 7, 3):
+        policy.estimator.write(Event(0.0, EventType.HALL_CALL, 0, floor, 1))
+    assert policy.get_home_floor(building.cars[0]) == 7
+
+    # The other car already waits at floor 7
+    building.cars[1].current_floor = 7
+    assert policy.get_home_floor(building.cars[0]) == 3
+
+
+def test_compare_policies():
+    results = compare_policies(max_floor=8, cars=2, population=100, policies=['stay', 'lobby'])
+
+    assert list(results) == ['stay', 'lobby']
+    assert all(wait_time['count'] > 0 for wait_time in results.values())
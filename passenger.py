@@ -1,31 +1,124 @@
-from uuid import uuid4
-from typing import TYPE_CHECKING
+from math import isnan
 
-if TYPE_CHECKING:
-    from elevator import Elevator
+from elevator import Elevator
+from building import Building
+from capacity import ADULT, NO_GROUP, PassengerSize
+from store import PassengerStore, NOT_YET
 
 
 class Passenger:
-    def __init__(self, current_floor: int, desired_floor: int, elevator: "Elevator"):
+    """
+    View of one passenger of a PassengerStore; the passenger's data lives in the store's columns
+    """
+    __slots__ = ('id', 'store', 'elevator', 'car')
+
+    def __init__(self, current_floor: int, desired_floor: int, elevator: "Elevator | Building",
+                 size: PassengerSize = ADULT, group: int = NO_GROUP):
         if current_floor < 1:
             raise ValueError("current_floor must be higher than 1")
-        else:
-            self.current_floor = current_floor
 
         if desired_floor < 1 or desired_floor > elevator.max_floor:
             raise ValueError("desired_floor must be higher than 1 and less than 'elevator.max_floor'")
-        else:
-            self.desired_floor = desired_floor
 
-        if str(type(elevator)) == "<class 'elevator.Elevator'>":
+        # The passenger calls either a single elevator or the group controller of a building,
+        # which assigns the car
+        if isinstance(elevator, (Elevator, Building)):
             self.elevator = elevator
         else:
-            raise ValueError("elevator must be Elevator class instance")
-        self.uuid = uuid4()
+            raise ValueError("elevator must be Elevator or Building class instance")
+        self.car = elevator if isinstance(elevator, Elevator) else None
+        self.store = elevator.passenger_store
+        self.id = self.store.add(current_floor, desired_floor, size, group)
+
+    @classmethod
+    def view(cls, store: PassengerStore, passenger_id: int, elevator: "Elevator | Building") -> "Passenger":
+        """
+        View of a passenger already in the store
+
+        :param store: PassengerStore instance
+        :param passenger_id: ID of the passenger
+        :param elevator: Elevator or Building the passenger calls
+        :return: Passenger instance
+        """
+        passenger = cls.__new__(cls)
+        passenger.id = passenger_id
+        passenger.store = store
+        passenger.elevator = elevator
+        passenger.car = elevator if isinstance(elevator, Elevator) else None
+        return passenger
+
+    @property
+    def uuid(self) -> int:
+        # Kept for compatibility: passengers are identified by their integer ID
+        return self.id
+
+    @property
+    def current_floor(self) -> int:
+        return self.store.current_floors[self.id]
+
+    @property
+    def desired_floor(self) -> int:
+        return self.store.desired_floors[self.id]
+
+    @property
+    def size(self) -> PassengerSize:
+        return PassengerSize(self.store.weights[self.id], self.store.areas[self.id])
+
+    @property
+    def group(self) -> int:
+        return self.store.groups[self.id]
+
+    # Simulated time of the call, of entering and of leaving the elevator, None until it happens
+    @property
+    def call_time(self) -> float:
+        call_time = self.store.call_times[self.id]
+        return None if isnan(call_time) else call_time
+
+    @call_time.setter
+    def call_time(self, value: float) -> None:
+        self.store.call_times[self.id] = NOT_YET if value is None else value
+
+    @property
+    def board_time(self) -> float:
+        board_time = self.store.board_times[self.id]
+        return None if isnan(board_time) else board_time
+
+    @board_time.setter
+    def board_time(self, value: float) -> None:
+        self.store.board_times[self.id] = NOT_YET if value is None else value
+
+    @property
+    def alight_time(self) -> float:
+        alight_time = self.store.alight_times[self.id]
+        return None if isnan(alight_time) else alight_time
+
+    @alight_time.setter
+    def alight_time(self, value: float) -> None:
+        self.store.alight_times[self.id] = NOT_YET if value is None else value
 
     def call_elevator(self):
         self.elevator.call_elevator(self)
 
+    def get_wait_time(self) -> float:
+        """
+        Time from the call until the passenger entered the elevator
+
+        :return: simulated seconds, None if the passenger has not entered yet
+        """
+        if self.board_time is None:
+            return None
+        return self.board_time - self.call_time
+
+    def get_journey_time(self) -> float:
+        """
+        Time from the call until the passenger reached the desired floor
+
+        :return: simulated seconds, None if the passenger has not arrived yet
+        """
+        if self.alight_time is None:
+            return None
+        return self.alight_time - self.call_time
+
     def enter_elevator(self):
-        if self.elevator.can_enter_elevator(self.current_floor):
-            self.elevator.enter_elevator(self.uuid, self.desired_floor)
+        if self.car.can_enter_elevator(self.current_floor, self.id):
+            self.car.enter_elevator(self.id, self.desired_floor)
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from math import ceil
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from building import Building
+from events import NULL_SINK
+from metrics import Metrics
+from parking import POLICIES
+from simulation import Simulation
+from traffic import PATTERNS, daily_rates, generate_trips, iter_trips, TripFeeder
+
+DEFAULT_BUILDING = {
+    'name': None,
+    'max_floor': 10,
+    'cars': 2,
+    'max_passengers': 8,
+    'tick_rate': 1.0,
+    'traffic': 'daily',  # 'daily' or one of traffic.PATTERNS
+    'population': 500,  # people in the building; for a pattern, arrivals per hour
+    'duration': 3600.0,  # simulated seconds of a pattern, a daily profile always lasts 24 hours
+    'parking': 'stay',  # one of parking.POLICIES
+    'seed': 0,
+}
+
+# Columns of the shared result buffer, one row per building; a row of NaN is not simulated yet
+RESULT_FIELDS = ('served', 'wait_mean', 'wait_p95', 'wait_p99', 'journey_mean', 'journey_p95', 'journey_p99',
+                 'elapsed')
+
+
+def load_portfolio(path: str) -> list:
+    """
+    Building configurations of a JSON Lines file, one building per line, completed with the
+    default configuration
+
+    :param path: File path
+    :return: list of configurations
+    """
+    configs = []
+    with open(path) as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            config = json.loads(line)
+            unknown = set(config) - set(DEFAULT_BUILDING)
+            if unknown:
+                raise ValueError(f'line {line_number}: unknown parameters: {", ".join(sorted(unknown))}')
+            if config.get('traffic', 'daily') not in ('daily',) + PATTERNS:
+                raise ValueError(f"line {line_number}: traffic must be 'daily' or one of {', '.join(PATTERNS)}")
+            if config.get('parking', 'stay') not in POLICIES:
+                raise ValueError(f"line {line_number}: parking must be one of {', '.join(POLICIES)}")
+            configs.append({**DEFAULT_BUILDING, **config})
+    return configs
+
+
+def run_building(config: dict) -> tuple:
+    """
+    Simulate one building. Trips are fed lazily and the KPIs are histograms, so the memory of a
+    run does not grow with the length of the day
+
+    :param config: Configuration of the building
+    :return: row of RESULT_FIELDS
+    """
+    rng = np.random.default_rng(config['seed'])
+    max_floor = config['max_floor']
+    if config['traffic'] == 'daily':
+        trips = generate_trips(daily_rates(config['population']), 300.0, max_floor, rng=rng)
+    else:
+        trips = generate_trips({config['traffic']: config['population'] / 3600}, config['duration'], max_floor,
+                               rng=rng)
+
+    building = Building(max_floor, config['cars'], config['max_passengers'], config['tick_rate'],
+                        event_sink=NULL_SINK, parking_policy=POLICIES[config['parking']](max_floor))
+    metrics = Metrics()
+    simulation = Simulation(metrics=metrics)
+    simulation.add_building(building)
+    TripFeeder(simulation, building, iter_trips(*trips))
+    building.stop_elevator()
+    simulation.run()
+
+    summary = metrics.get_summary(simulation.now)
+    wait_time, journey_time = summary['wait_time'], summary['journey_time']
+    return (journey_time['count'], wait_time['mean'], wait_time['p95'], wait_time['p99'], journey_time['mean'],
+            journey_time['p95'], journey_time['p99'], simulation.now)
+
+
+def attach_results(name: str, buildings: int) -> tuple:
+    """
+    Attach to the shared result buffer created by the parent process
+
+    :param name: Name of the shared memory block
+    :param buildings: Number of buildings of the portfolio
+    :return: (SharedMemory, array view)
+    """
+    memory = SharedMemory(name)
+    return memory, np.ndarray((buildings, len(RESULT_FIELDS)), dtype=np.float64, buffer=memory.buf)
+
+
+def run_shard(name: str, buildings: int, shard: list) -> list:
+    """
+    Simulate a shard of buildings in one worker task, writing every row straight into the shared
+    result buffer so only the indexes travel back through the pipe
+
+    :param name: Name of the shared memory block
+    :param buildings: Number of buildings of the portfolio
+    :param shard: list of (index, configuration)
+    :return: indexes of the simulated buildings
+    """
+    memory, results = attach_results(name, buildings)
+    try:
+        for index, config in shard:
+            results[index] = run_building(config)
+    finally:
+        del results
+        memory.close()
+    return [index for index, config in shard]
+
+
+def read_progress(path: str, configs: list) -> dict:
+    """
+    Results of an interrupted run
+
+    :param path: Progress file of the run, missing when the run has not started
+    :param configs: Configurations of the portfolio
+    :return: index -> row of RESULT_FIELDS
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path) as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a record cut off by the interruption
+            index = record['index']
+            if index >= len(configs) or record['config'] != configs[index]:
+                raise ValueError(f"{path} belongs to another portfolio")
+            done[index] = tuple(record[field] for field in RESULT_FIELDS)
+    return done
+
+
+def run_portfolio(configs: list, workers: int = None, shard_size: int = None, progress: str = None,
+                  callback=None) -> np.ndarray:
+    """
+    Simulate every building of the portfolio in a process pool. Buildings are sharded into tasks,
+    at most two tasks per worker are in flight so the pending configurations stay bounded, and
+    results are written by the workers into one shared memory buffer. With a progress file every
+    finished shard is appended to it, and a later run with the same file skips those buildings
+
+    :param configs: Building configurations, see load_portfolio()
+    :param workers: Number of worker processes, all cores when omitted
+    :param shard_size: Buildings per task, sized to give every worker several tasks when omitted
+    :param progress: Path of the JSON Lines progress file
+    :param callback: Called with (done, total) after every shard
+    :return: buildings x RESULT_FIELDS array
+    """
+    workers = workers or os.cpu_count()
+    done = read_progress(progress, configs) if progress is not None else {}
+    pending = [(index, config) for index, config in enumerate(configs) if index not in done]
+    shard_size = shard_size or max(1, ceil(len(pending) / (workers * 4)))
+    shards = iter([pending[start:start + shard_size] for start in range(0, len(pending), shard_size)])
+
+    memory = SharedMemory(create=True, size=max(1, len(configs) * len(RESULT_FIELDS) * 8))
+    try:
+        results = np.ndarray((len(configs), len(RESULT_FIELDS)), dtype=np.float64, buffer=memory.buf)
+        results[:] = np.nan
+        for index, row in done.items():
+            results[index] = row
+
+        progress_file = open(progress, 'a') if progress is not None else None
+        if progress_file is not None and progress_file.tell() > 0:
+            progress_file.write('\n')  # end a record cut off by the interruption
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = set()
+                while True:
+                    for shard in shards:
+                        futures.add(executor.submit(run_shard, memory.name, len(configs), shard))
+                        if len(futures) >= 2 * workers:
+                            break
+                    if not futures:
+                        break
+                    finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        for index in future.result():
+                            done[index] = results[index]
+                            if progress_file is not None:
+                                record = dict(zip(RESULT_FIELDS, results[index].tolist()))
+                                progress_file.write(json.dumps({'index': index, 'config': configs[index], **record})
+                                                    + '\n')
+                        if progress_file is not None:
+                            progress_file.flush()
+                        if callback is not None:
+                            callback(len(done), len(configs))
+        finally:
+            if progress_file is not None:
+                progress_file.close()
+        output = results.copy()
+        del results
+    finally:
+        memory.close()
+        memory.unlink()
+    return output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Simulate a portfolio of independent buildings')
+    parser.add_argument('portfolio', help='JSON Lines file, one building configuration per line')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shard-size', type=int, default=None)
+    parser.add_argument('--progress', default=None, help='progress file, resumes the run it belongs to')
+    parser.add_argument('--output', default=None, help='CSV file of the results')
+    args = parser.parse_args()
+
+    configs = load_portfolio(args.portfolio)
+    results = run_portfolio(configs, args.workers, args.shard_size, args.progress,
+                            lambda done, total: print(f'{done}/{total} buildings', flush=True))
+    if args.output is not None:
+        np.savetxt(args.output, results, delimiter=',', header=','.join(RESULT_FIELDS), comments='')
+    for index, (config, row) in enumerate(zip(configs, results)):
+        name = config['name'] if config['name'] is not None else index
+        print(name, dict(zip(RESULT_FIELDS, row.tolist())), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pytest
+from portfolio import load_portfolio, run_building, run_portfolio, read_progress, DEFAULT_BUILDING, RESULT_FIELDS
+
+BUILDINGS = [
+    {'name': 'a', 'max_floor': 6, 'traffic': 'up_peak', 'population': 200, 'duration': 300.0, 'seed': 1},
+    {'name': 'b', 'max_floor': 8, 'cars': 1, 'traffic': 'interfloor', 'population': 100, 'duration': 300.0},
+    {'name': 'c', 'max_floor': 5, 'traffic': 'down_peak', 'population': 200, 'duration': 300.0, 'parking': 'lobby'},
+]
+
+
+@pytest.fixture
+def portfolio_path(tmp_path):
+    path = tmp_path / 'portfolio.jsonl'
+    path.write_text(''.join(json.dumps(building) + '\n' for building in BUILDINGS))
+    return str(path)
+
+
+def test_load_portfolio(portfolio_path):
+    configs = load_portfolio(portfolio_path)
+
+    assert len(configs) == 3
+    assert configs[1] == {**DEFAULT_BUILDING, **BUILDINGS[1]}
+
+
+def test_load_portfolio_unknown_parameter(tmp_path):
+    path = tmp_path / 'portfolio.jsonl'
+    path.write_text('{"floors": 10}\n')
+    with pytest.raises(ValueError):
+        load_portfolio(str(path))
+
+
+def test_run_portfolio_matches_run_building(portfolio_path):
+    configs = load_portfolio(portfolio_path)
+    results = run_portfolio(configs, workers=2, shard_size=1)
+
+    assert results.shape == (3, len(RESULT_FIELDS))
+    assert np.array_equal(results[2], run_building(configs[2]))
+    assert (results[:, 0] > 0).all()
+
+
+def test_run_portfolio_resumes(portfolio_path, tmp_path):
+    configs = load_portfolio(portfolio_path)
+    progress = str(tmp_path / 'progress.jsonl')
+    first = run_portfolio(configs[:2], workers=1, progress=progress)
+    # Interrupted while writing a record
+    with open(progress, 'a') as file:
+        file.write('{"index": 2, "con')
+
+    assert sorted(read_progress(progress, configs)) == [0, 1]
+    calls = []
+    results = run_portfolio(configs, workers=1, progress=progress, callback=lambda done, total: calls.append(done))
+
+    assert calls == [3]
+    assert np.array_equal(results[:2], first)
+    assert sorted(read_progress(progress, configs)) == [0, 1, 2]
+
+
+def test_read_progress_other_portfolio(portfolio_path, tmp_path):
+    configs = load_portfolio(portfolio_path)
+    progress = str(tmp_path / 'progress.jsonl')
+    run_portfolio(configs[:1], workers=1, progress=progress)
+
+    with pytest.raises(ValueError):
+        read_progress(progress, configs[1:])
@@ -0,0 +1,296 @@
+import argparse
+import os
+import random
+import sys
+import threading
+from time import perf_counter
+
+from building import Building
+from events import EventSink, NULL_SINK, NO_PASSENGER, EventType
+from passenger import Passenger
+from simulation import Simulation
+
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from elevator import Elevator
+
+# Methods of a car timed as phases; the times of nested phases are included in their callers
+ELEVATOR_PHASES = ('step', 'set_direction', 'move', 'open_release_enter_close', 'get_floors_to_open',
+                   'release_passengers', 'enter_pending_passengers')
+# Methods of the scheduler, which also maintain the call queue
+SCHEDULER_PHASES = ('get_next_floor', 'should_stop')
+# Events of the engine: a passenger's call with its dispatch, and a whole action of a car
+SIMULATION_PHASES = ('arrive', 'step_elevator')
+
+
+class PhaseCounter:
+    """
+    Number of calls of a phase with their cumulative and longest wall-clock time
+    """
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, elapsed: float) -> None:
+        """
+        Count one call of the phase
+
+        :param elapsed: Wall-clock seconds of the call
+        :return: None
+        """
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+
+class TimedCall:
+    """
+    Replaces a method on one instance and times every call of it on the monotonic clock, so
+    objects without a profiler run their methods untouched
+    """
+    __slots__ = ('function', 'counter')
+
+    def __init__(self, function: Callable, counter: PhaseCounter):
+        self.function = function
+        self.counter = counter
+
+    def __call__(self, *args, **kwargs):
+        started = perf_counter()
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            self.counter.record(perf_counter() - started)
+
+
+TIMED_CALL_CODE = TimedCall.__call__.__code__
+
+
+class TimedSink(EventSink):
+    """
+    Forwards the events to the car's sink and times the writing, i.e. the I/O of the sinks
+    """
+
+    def __init__(self, sink: EventSink, counter: PhaseCounter):
+        super().__init__()
+        self.sink = sink
+        self.counter = counter
+        self.enabled = sink.enabled
+
+    def emit(self, time: float, event_type: EventType, car: int, floor: int, passenger: int = NO_PASSENGER) -> None:
+        started = perf_counter()
+        self.sink.emit(time, event_type, car, floor, passenger)
+        self.counter.record(perf_counter() - started)
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+class StackSampler:
+    """
+    Sampling profiler: a background thread records the Python stack of the profiled thread every
+    interval seconds. The samples are written in the folded format of flamegraph.pl and speedscope,
+    one line per distinct stack: frames from the root separated by semicolons, then the count
+    """
+
+    def __init__(self, interval: float = 0.005):
+        if interval <= 0:
+            raise ValueError("interval must be higher than 0")
+        self.interval = interval
+        self.stacks = {}  # folded stack -> number of samples
+        self.samples = 0
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self, thread_id: Optional[int] = None) -> None:
+        """
+        Start sampling
+
+        :param thread_id: Identifier of the thread to sample, the calling thread when omitted
+        :return: None
+        """
+        if self._thread is not None:
+            raise RuntimeError("the sampler is already running")
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.sample, args=(target,), name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop sampling, keeping the samples
+
+        :return: None
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def sample(self, thread_id: int) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                # The timing wrappers of the phases are left out of the stacks
+                if code is not TIMED_CALL_CODE:
+                    frames.append(f'{os.path.splitext(os.path.basename(code.co_filename))[0]}:{code.co_name}')
+                frame = frame.f_back
+            stack = ';'.join(reversed(frames))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def write(self, path: str) -> None:
+        """
+        Write the samples as folded stacks
+
+        :param path: Path of the file
+        :return: None
+        """
+        with open(path, 'w') as file:
+            for stack, count in sorted(self.stacks.items()):
+                file.write(f'{stack} {count}\n')
+
+
+class Profiler:
+    """
+    Hot-path instrumentation of the control loop. Attaching it to a car replaces the methods of
+    every phase on that car with timed ones; cars without a profiler are not touched, so profiling
+    costs nothing when it is off. With sample_interval a StackSampler runs while the simulation runs
+    """
+
+    def __init__(self, sample_interval: Optional[float] = None):
+        self.phases = {}  # phase name -> PhaseCounter
+        self.sampler = StackSampler(sample_interval) if sample_interval is not None else None
+        self._schedulers = set()  # IDs of the schedulers already timed, they may be shared by cars
+
+    def get_counter(self, phase: str) -> PhaseCounter:
+        if phase not in self.phases:
+            self.phases[phase] = PhaseCounter()
+        return self.phases[phase]
+
+    def wrap(self, instance: object, method: str, phase: str) -> None:
+        """
+        Time the method on this instance only
+
+        :param instance: Object whose method is timed
+        :param method: Name of the method
+        :param phase: Name of the phase the calls are counted in
+        :return: None
+        """
+        setattr(instance, method, TimedCall(getattr(instance, method), self.get_counter(phase)))
+
+    def attach(self, elevator: "Elevator") -> None:
+        """
+        Time the phases of the car, of its scheduler and of its event sink
+
+        :param elevator: Elevator instance
+        :return: None
+        """
+        for method in ELEVATOR_PHASES:
+            self.wrap(elevator, method, method)
+        if id(elevator.scheduler) not in self._schedulers:
+            self._schedulers.add(id(elevator.scheduler))
+            for method in SCHEDULER_PHASES:
+                self.wrap(elevator.scheduler, method, f'scheduler.{method}')
+        elevator.event_sink = TimedSink(elevator.event_sink, self.get_counter('events'))
+
+    def attach_simulation(self, simulation: Simulation) -> None:
+        """
+        Time the events of the engine and the waiting of its pacer
+
+        :param simulation: Simulation instance
+        :return: None
+        """
+        for method in SIMULATION_PHASES:
+            self.wrap(simulation, method, f'simulation.{method}')
+        if simulation.pacer is not None:
+            self.wrap(simulation.pacer, 'wait_until', 'pacer.wait_until')
+
+    def start(self) -> None:
+        if self.sampler is not None:
+            self.sampler.start()
+
+    def stop(self) -> None:
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def get_stats(self) -> dict:
+        """
+        Counters of every phase
+
+        :return: phase name -> dict of count, total, mean and max seconds
+        """
+        return {phase: {'count': counter.count, 'total': counter.total,
+                        'mean': counter.total / counter.count if counter.count else 0.0, 'max': counter.max}
+                for phase, counter in self.phases.items()}
+
+    def format(self) -> str:
+        """
+        Table of the phases which were called, the most expensive first
+
+        :return: str
+        """
+        lines = [f"{'phase':<36}{'count':>10}{'total ms':>12}{'mean us':>10}{'max us':>10}"]
+        for phase, stats in sorted(self.get_stats().items(), key=lambda item: -item[1]['total']):
+            if not stats['count']:
+                continue
+            lines.append(f"{phase:<36}{stats['count']:>10}{stats['total'] * 1e3:>12.2f}"
+                         f"{stats['mean'] * 1e6:>10.2f}{stats['max'] * 1e6:>10.1f}")
+        return '\n'.join(lines)
+
+    def write_stacks(self, path: str) -> None:
+        """
+        Write the samples of the sampling profiler as folded stacks
+
+        :param path: Path of the file
+        :return: None
+        """
+        if self.sampler is None:
+            raise RuntimeError("the profiler was created without sample_interval")
+        self.sampler.write(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time the phases of the control loop over one simulation')
+    parser.add_argument('--max-floor', type=int, default=20)
+    parser.add_argument('--cars', type=int, default=4)
+    parser.add_argument('--passengers', type=int, default=5000)
+    parser.add_argument('--arrival-rate', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stacks', help='sample the stacks and write them to this file in the folded format')
+    parser.add_argument('--interval', type=float, default=0.001, help='seconds between two stack samples')
+    args = parser.parse_args()
+
+    profiler = Profiler(args.interval if args.stacks else None)
+    building = Building(args.max_floor, args.cars, 8, event_sink=NULL_SINK)
+    simulation = Simulation(profiler=profiler)
+    simulation.add_building(building)
+    rng = random.Random(args.seed)
+    arrival_time = 0.0
+    for item in range(args.passengers):
+        arrival_time += rng.expovariate(args.arrival_rate)
+        current_floor, desired_floor = rng.sample(range(1, args.max_floor + 1), 2)
+        simulation.add_passenger(Passenger(current_floor, desired_floor, building), arrival_time)
+    building.stop_elevator()
+    simulation.run()
+
+    print(profiler.format())
+    if args.stacks:
+        profiler.write_stacks(args.stacks)
+        print(f'{profiler.sampler.samples} samples written to {args.stacks}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import pickle
+
+import pytest
+from building import Building
+from elevator import Elevator
+from events import NULL_SINK, MemorySink, EventType
+from passenger import Passenger
+from profiling import Profiler, StackSampler, ELEVATOR_PHASES
+from simulation import Simulation
+
+
+def run_building(profiler: Profiler = None, event_sink=NULL_SINK) -> Building:
+    building = Building(10, 2, 4, event_sink=event_sink)
+    simulation = Simulation(profiler=profiler)
+    simulation.add_building(building)
+    for item in range(40):
+        simulation.add_passenger(Passenger(1 + item % 10, 10 - item % 9, building), item * 3.0)
+    building.stop_elevator()
+    simulation.run()
+    return building
+
+
+def test_profiler_counts_phases():
+    profiler = Profiler()
+    sink = MemorySink()
+    run_building(profiler, sink)
+    stats = profiler.get_stats()
+
+    # LookScheduler decides the stops itself, only FifoScheduler calls get_floors_to_open
+    assert stats['get_floors_to_open']['count'] == 0
+    phases = set(ELEVATOR_PHASES) - {'get_floors_to_open'} | \
+        {'scheduler.get_next_floor', 'scheduler.should_stop', 'events', 'simulation.arrive', 'simulation.step_elevator'}
+    for phase in phases:
+        assert stats[phase]['count'] > 0, phase
+        assert 0 <= stats[phase]['mean'] <= stats[phase]['max'] <= stats[phase]['total']
+    assert stats['simulation.arrive']['count'] == 40
+    assert stats['events']['count'] == len(sink.events)
+    assert stats['open_release_enter_close']['count'] == \
+        sum(event.type is EventType.DOOR_OPEN for event in sink.events)
+    # Nested phases are included in their callers
+    assert stats['step']['total'] >= stats['open_release_enter_close']['total']
+    assert 'open_release_enter_close' in profiler.format()
+
+
+def test_profiler_does_not_change_the_simulation():
+    sink, profiled_sink = MemorySink(), MemorySink()
+    run_building(None, sink)
+    run_building(Profiler(), profiled_sink)
+
+    assert profiled_sink.events == sink.events
+
+
+def test_cars_without_profiler_are_untouched():
+    building = run_building()
+
+    assert 'step' not in vars(building.cars[0])
+    assert type(building.cars[0].event_sink).__name__ != 'TimedSink'
+
+
+def test_profiled_elevator_can_be_pickled():
+    elevator = Elevator(10, 4, 1.0, event_sink=NULL_SINK)
+    Simulation(profiler=Profiler()).add_elevator(elevator)
+    restored = pickle.loads(pickle.dumps(elevator))
+
+    assert restored.step.function.__self__ is restored
+
+
+def test_stack_sampler_writes_folded_stacks(tmp_path):
+    profiler = Profiler(sample_interval=0.0005)
+    building = Building(20, 4, 8, event_sink=NULL_SINK)
+    simulation = Simulation(profiler=profiler)
+    simulation.add_building(building)
+    for item in range(3000):
+        simulation.add_passenger(Passenger(1 + item % 20, 20 - item % 19, building), item * 0.5)
+    building.stop_elevator()
+    simulation.run()
+    path = tmp_path / 'stacks.folded'
+    profiler.write_stacks(str(path))
+
+    lines = path.read_text().splitlines()
+    assert lines and profiler.sampler.samples > 0
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == profiler.sampler.samples
+    assert any('simulation:run_events;simulation:step_elevator' in line for line in lines)
+    assert not any('profiling:__call__' in line for line in lines)
+
+
+def test_stack_sampler_invalid_interval():
+    with pytest.raises(ValueError):
+        StackSampler(0)
+    with pytest.raises(RuntimeError):
+        Profiler().write_stacks('stacks.folded')
+
+
+def test_building_run_with_profiler():
+    building = Building(10, 2, 4, 0.001, event_sink=NULL_SINK)
+    for floor in (3, 7):
+        Passenger(floor, 1, building).call_elevator()
+    building.stop_elevator()
+    profiler = Profiler()
+    building.run(profiler=profiler)
+
+    stats = profiler.get_stats()
+    assert stats['release_passengers']['count'] > 0
+    assert stats['pacer.wait_until']['count'] > 0
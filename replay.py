@@ -0,0 +1,237 @@
+import argparse
+import csv
+import json
+import os
+from collections import namedtuple
+from math import isnan, nan
+
+from building import Building
+from dispatcher import NearestCarDispatcher, ZonedDispatcher, EtaDispatcher, RouteCostDispatcher, \
+    DestinationDispatcher, OptimizingDispatcher
+from events import EventSink, EventLevel, EventType, Event, TeeSink, NULL_SINK
+from passenger import Passenger
+from simulation import Simulation
+
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+if TYPE_CHECKING:
+    from elevator import Elevator
+
+TraceCall = namedtuple('TraceCall', ['time', 'origin', 'destination', 'passenger', 'board_time', 'alight_time'])
+
+RESULT_FIELDS = ('passenger', 'call_time', 'origin', 'destination', 'wait_time', 'journey_time',
+                 'recorded_wait_time', 'recorded_journey_time')
+
+
+def parse_call(row: dict, line: int) -> TraceCall:
+    """
+    One call of the trace: time, origin and destination are required; the passenger ID of the
+    trace and the recorded boarding and alighting times are optional
+
+    :param row: Column name -> value
+    :param line: Line number for the error messages
+    :return: TraceCall
+    """
+    try:
+        time = float(row['time'])
+        origin = int(row['origin'])
+        destination = int(row['destination'])
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"line {line}: time, origin and destination are required ({error})")
+    passenger = row.get('passenger')
+    board_time = row.get('board_time')
+    alight_time = row.get('alight_time')
+    return TraceCall(time, origin, destination, line if passenger in (None, '') else passenger,
+                     nan if board_time in (None, '') else float(board_time),
+                     nan if alight_time in (None, '') else float(alight_time))
+
+
+def read_trace(path: str, trace_format: str = None, buffer_size: int = 1 << 20) -> Iterator[TraceCall]:
+    """
+    Stream the calls of a CSV (with a header row) or JSONL trace through a buffered reader,
+    one line at a time, so the memory used does not depend on the length of the trace
+
+    :param path: Trace file
+    :param trace_format: 'csv' or 'jsonl', guessed from the extension when omitted
+    :param buffer_size: Size of the chunks read from the file
+    :return: generator of TraceCall in time order
+    """
+    if trace_format is None:
+        trace_format = 'jsonl' if os.path.splitext(path)[1] in ('.jsonl', '.json', '.ndjson') else 'csv'
+    if trace_format not in ('csv', 'jsonl'):
+        raise ValueError("trace_format must be 'csv' or 'jsonl'")
+
+    with open(path, newline='', buffering=buffer_size) as file:
+        if trace_format == 'csv':
+            rows = enumerate(csv.DictReader(file), start=2)
+        else:
+            rows = ((line, json.loads(text)) for line, text in enumerate(file, start=1) if text.strip())
+
+        last_time = None
+        for line, row in rows:
+            call = parse_call(row, line)
+            if last_time is not None and call.time < last_time:
+                raise ValueError(f"line {line}: the trace must be sorted by time")
+            last_time = call.time
+            yield call
+
+
+class ReplayLog(EventSink):
+    """
+    Result log of a replay: when a passenger alights, one CSV row is written with the simulated
+    waiting and journey times next to the recorded ones. Only passengers who are still in the
+    system are kept in memory
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        super().__init__(EventLevel.INFO)
+        self.file = open(path, 'w', buffering=buffer_size, newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(RESULT_FIELDS)
+        self._calls = {}  # passenger ID of the simulation -> (Passenger, TraceCall)
+        self.written = 0
+
+    def attach(self, elevator: "Elevator") -> None:
+        """
+        Start logging the elevator's passengers, keeping its current sink
+
+        :param elevator: Elevator instance
+        :return: None
+        """
+        if elevator.event_sink is not self:
+            elevator.event_sink = TeeSink(elevator.event_sink, self)
+
+    def track(self, passenger: Passenger, call: TraceCall) -> None:
+        self._calls[passenger.id] = (passenger, call)
+
+    def write(self, event: Event) -> None:
+        if event.type is not EventType.ALIGHT or event.passenger not in self._calls:
+            return
+        passenger, call = self._calls.pop(event.passenger)
+        self.writer.writerow((call.passenger, call.time, call.origin, call.destination,
+                              passenger.get_wait_time(), passenger.get_journey_time(),
+                              call.board_time - call.time, call.alight_time - call.time))
+        self.written += 1
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class TraceReplay:
+    """
+    Injects the calls of a trace into the simulation at their recorded times. Like TripFeeder only
+    the next call is scheduled at any time
+    """
+
+    def __init__(self, simulation: Simulation, elevator: "Elevator | Building", trace: Iterable[TraceCall],
+                 log: Optional[ReplayLog] = None):
+        self.simulation = simulation
+        self.elevator = elevator  # Elevator or Building the passengers call
+        self.trace = iter(trace)
+        self.log = log
+        if log is not None:
+            for car in simulation.elevators:
+                log.attach(car)
+        self.replayed = 0
+        self.schedule_next()
+
+    def schedule_next(self) -> None:
+        """
+        Schedule the next call of the trace
+
+        :return: None
+        """
+        call = next(self.trace, None)
+        if call is not None:
+            self.simulation.schedule_at(call.time, self.arrive, call)
+
+    def arrive(self, call: TraceCall) -> None:
+        """
+        Call event: create the passenger, call the elevator and schedule the next call
+
+        :param call: TraceCall
+        :return: None
+        """
+        passenger = Passenger(call.origin, call.destination, self.elevator)
+        if self.log is not None:
+            self.log.track(passenger, call)
+        self.simulation.arrive(passenger)
+        self.replayed += 1
+        self.schedule_next()
+
+
+def compare_results(path: str) -> dict:
+    """
+    Compare the simulated times of a result log with the recorded ones, in one pass
+
+    :param path: Result log written by ReplayLog
+    :return: dict of means and differences
+    """
+    totals = dict.fromkeys(('wait_time', 'journey_time', 'recorded_wait_time', 'recorded_journey_time'), 0.0)
+    counts = dict.fromkeys(totals, 0)
+    wait_delta = journey_delta = 0.0
+    compared = 0
+    with open(path, newline='') as file:
+        for row in csv.DictReader(file):
+            values = {name: float(row[name]) for name in totals}
+            for name, value in values.items():
+                if not isnan(value):
+                    totals[name] += value
+                    counts[name] += 1
+            if not isnan(values['recorded_wait_time']) and not isnan(values['recorded_journey_time']):
+                wait_delta += values['wait_time'] - values['recorded_wait_time']
+                journey_delta += values['journey_time'] - values['recorded_journey_time']
+                compared += 1
+
+    summary = {f'{name}_mean': totals[name] / counts[name] if counts[name] else None for name in totals}
+    summary['passengers'] = counts['wait_time']
+    summary['compared'] = compared
+    summary['wait_time_delta'] = wait_delta / compared if compared else None
+    summary['journey_time_delta'] = journey_delta / compared if compared else None
+    return summary
+
+
+def replay(trace_path: str, building: "Building | Elevator", result_path: str, trace_format: str = None) -> dict:
+    """
+    Replay a trace through the building and compare the result with the recorded times
+
+    :param trace_path: CSV or JSONL trace
+    :param building: Building (or Elevator) the recorded calls are sent to
+    :param result_path: CSV result log
+    :param trace_format: 'csv' or 'jsonl', guessed from the extension when omitted
+    :return: summary of compare_results()
+    """
+    simulation = Simulation()
+    if isinstance(building, Building):
+        simulation.add_building(building)
+    else:
+        simulation.add_elevator(building)
+    with ReplayLog(result_path) as log:
+        TraceReplay(simulation, building, read_trace(trace_path, trace_format), log)
+        building.stop_elevator()
+        simulation.run()
+    return compare_results(result_path)
+
+
+def main() -> None:
+    dispatchers = {'nearest': NearestCarDispatcher, 'zoned': ZonedDispatcher, 'eta': EtaDispatcher,
+                   'route': RouteCostDispatcher, 'destination': DestinationDispatcher,
+                   'optimizing': OptimizingDispatcher}
+    parser = argparse.ArgumentParser(description='Replay a recorded call trace')
+    parser.add_argument('trace')
+    parser.add_argument('result')
+    parser.add_argument('--max-floor', type=int, required=True)
+    parser.add_argument('--cars', type=int, default=1)
+    parser.add_argument('--max-passengers', type=int, default=8)
+    parser.add_argument('--tick-rate', type=float, default=1.0)
+    parser.add_argument('--dispatcher', choices=list(dispatchers), default='nearest')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), default=None)
+    args = parser.parse_args()
+
+    building = Building(args.max_floor, args.cars, args.max_passengers, args.tick_rate,
+                        dispatcher=dispatchers[args.dispatcher](), event_sink=NULL_SINK)
+    print(json.dumps(replay(args.trace, building, args.result, args.format), indent=2))
+
+
+if __name__ == '__main__':
+    main()
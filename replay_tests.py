@@ -0,0 +1,79 @@
+import csv
+import json
+
+import pytest
+from building import Building
+from elevator import Elevator
+from events import NULL_SINK
+from replay import read_trace, replay, compare_results, TraceCall
+
+
+def write_csv_trace(path, rows):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(('time', 'passenger', 'origin', 'destination', 'board_time', 'alight_time'))
+        writer.writerows(rows)
+
+
+def test_read_csv_trace(tmp_path):
+    path = tmp_path / 'trace.csv'
+    write_csv_trace(path, [(0, 'a', 1, 5, 2, 10), (3.5, 'b', 4, 2, '', '')])
+
+    calls = list(read_trace(str(path)))
+
+    assert calls[0] == TraceCall(0.0, 1, 5, 'a', 2.0, 10.0)
+    assert calls[1].passenger == 'b' and calls[1].time == 3.5
+
+
+def test_read_jsonl_trace(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    path.write_text('{"time": 1, "origin": 3, "destination": 1}\n\n{"time": 2, "origin": 1, "destination": 7}\n')
+
+    calls = list(read_trace(str(path)))
+
+    assert [(call.time, call.origin, call.destination) for call in calls] == [(1, 3, 1), (2, 1, 7)]
+    assert calls[1].passenger == 3  # line number when the trace has no passenger IDs
+
+
+def test_read_trace_unsorted(tmp_path):
+    path = tmp_path / 'trace.csv'
+    write_csv_trace(path, [(5, 'a', 1, 5, '', ''), (3, 'b', 4, 2, '', '')])
+
+    with pytest.raises(ValueError):
+        list(read_trace(str(path)))
+
+
+def test_read_trace_missing_column(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    path.write_text('{"time": 1, "origin": 3}\n')
+
+    with pytest.raises(ValueError):
+        list(read_trace(str(path)))
+
+
+def test_replay_writes_comparable_results(tmp_path):
+    trace_path = tmp_path / 'trace.csv'
+    result_path = tmp_path / 'result.csv'
+    write_csv_trace(trace_path, [(0, 'a', 1, 5, 0, 6), (100, 'b', 5, 1, 101, 108), (300, 'c', 2, 3, '', '')])
+
+    summary = replay(str(trace_path), Building(6, 2, 4, 1, event_sink=NULL_SINK), str(result_path))
+
+    with open(result_path, newline='') as file:
+        rows = {row['passenger']: row for row in csv.DictReader(file)}
+    assert set(rows) == {'a', 'b', 'c'}
+    assert float(rows['a']['call_time']) == 0
+    assert float(rows['b']['recorded_journey_time']) == 8
+    assert summary['passengers'] == 3
+    assert summary['compared'] == 2
+    assert summary == compare_results(str(result_path))
+
+
+def test_replay_single_elevator_jsonl(tmp_path):
+    trace_path = tmp_path / 'trace.jsonl'
+    trace_path.write_text('\n'.join(json.dumps({'time': time, 'origin': 1, 'destination': 3})
+                                    for time in range(0, 50, 10)))
+
+    summary = replay(str(trace_path), Elevator(5, 4, 1, event_sink=NULL_SINK), str(tmp_path / 'result.csv'))
+
+    assert summary['passengers'] == 5
+    assert summary['compared'] == 0
@@ -0,0 +1,126 @@
+from floors import FloorSet
+from states import ElevatorDirection
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from elevator import Elevator
+
+
+class Scheduler:
+    """
+    Strategy deciding where a car goes next and where it stops on the way
+    """
+
+    def has_calls(self, elevator: "Elevator") -> bool:
+        """
+        Checking whether the car has anything to serve
+
+        :param elevator: Elevator instance
+        :return: bool
+        """
+        raise NotImplementedError
+
+    def get_next_floor(self, elevator: "Elevator") -> Optional[int]:
+        """
+        Choose the floor an idle car goes to
+
+        :param elevator: Elevator instance
+        :return: floor to reach, None if there is nowhere to go
+        """
+        raise NotImplementedError
+
+    def should_stop(self, elevator: "Elevator") -> bool:
+        """
+        Checking whether a moving car opens its doors on the current floor before moving on
+
+        :param elevator: Elevator instance
+        :return: bool
+        """
+        raise NotImplementedError
+
+
+class FifoScheduler(Scheduler):
+    """
+    Baseline: floors are visited in the order of the call queue; on the way the car stops only
+    where passengers wait or leave
+    """
+
+    def has_calls(self, elevator: "Elevator") -> bool:
+        return bool(elevator.call_queue)
+
+    def get_next_floor(self, elevator: "Elevator") -> Optional[int]:
+        for attempt in range(len(elevator.call_queue)):
+            floor_to_reach = elevator.call_queue.popleft()
+
+            # If floor where elevator is currently going is still awaited by passengers
+            # outside the elevator, add it to the queue
+            if floor_to_reach in elevator.pending_desired_floors:
+                elevator.call_queue.append(floor_to_reach)
+
+            # Passengers inside the elevator need to go to that floor, or waiting passengers are there;
+            # otherwise move to the next floor in the queue
+            if floor_to_reach in elevator.car_calls or elevator.is_floor_awaited(floor_to_reach):
+                return floor_to_reach
+        return None
+
+    def should_stop(self, elevator: "Elevator") -> bool:
+        elevator.floors_door_will_open.extend(elevator.get_floors_to_open())
+        return elevator.current_floor in elevator.floors_door_will_open
+
+
+class LookScheduler(Scheduler):
+    """
+    Collective-selective control: the car sweeps in one direction while there are car calls or
+    hall calls ahead, stopping for car calls and for hall calls in its direction of travel, and
+    turns around at the last request. A car ignores the hall calls of passengers who would not
+    fit, so it does not open its doors for nobody
+    """
+
+    def get_requests(self, elevator: "Elevator") -> int:
+        """
+        Bitset of the floors the car has to visit
+
+        :param elevator: Elevator instance
+        :return: int
+        """
+        return elevator.car_calls.bits | elevator.get_boardable_hall_calls()
+
+    def has_calls(self, elevator: "Elevator") -> bool:
+        return self.get_requests(elevator) != 0
+
+    def get_next_floor(self, elevator: "Elevator") -> Optional[int]:
+        requests = self.get_requests(elevator)
+        # Floors served on the way stay in the call queue, which only FifoScheduler follows
+        for floor in FloorSet.bits_to_floors(elevator.call_queue.floors.bits & ~requests):
+            elevator.call_queue.remove_floor(floor)
+        if not requests:
+            return None
+
+        current_floor = elevator.current_floor
+        if requests >> current_floor & 1:
+            return current_floor
+
+        requests_above = requests >> (current_floor + 1)
+        requests_below = requests & ((1 << current_floor) - 1)
+        # Keep the direction while there are requests ahead, the furthest of them is the target
+        if requests_above and (elevator.direction is ElevatorDirection.UP or not requests_below):
+            return requests.bit_length() - 1
+        return (requests_below & -requests_below).bit_length() - 1
+
+    def should_stop(self, elevator: "Elevator") -> bool:
+        requests = self.get_requests(elevator)
+        floor = elevator.current_floor
+        if elevator.direction is ElevatorDirection.UP:
+            # Calls which arrived beyond the target extend the sweep
+            elevator.floor_to_reach = max(elevator.floor_to_reach, requests.bit_length() - 1)
+            direction = ElevatorDirection.UP
+        else:
+            if requests:
+                elevator.floor_to_reach = min(elevator.floor_to_reach, (requests & -requests).bit_length() - 1)
+            direction = ElevatorDirection.DOWN
+
+        stop = floor in elevator.car_calls or bool(elevator.get_boardable_hall_calls(direction) >> floor & 1)
+        if stop:
+            elevator.call_queue.remove_floor(floor)
+        return stop
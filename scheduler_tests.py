@@ -0,0 +1,55 @@
+from elevator import Elevator
+from events import MemorySink, EventType
+from passenger import Passenger
+from scheduler import FifoScheduler, LookScheduler
+from simulation import Simulation
+
+
+def run_trips(trips, max_passengers=4, scheduler=None):
+    sink = MemorySink()
+    elevator = Elevator(10, max_passengers, 1, event_sink=sink, scheduler=scheduler)
+    simulation = Simulation()
+    simulation.add_elevator(elevator)
+    for current_floor, desired_floor in trips:
+        simulation.add_passenger(Passenger(current_floor, desired_floor, elevator), 0)
+    simulation.run()
+    stops = [event.floor for event in sink.events if event.type is EventType.DOOR_OPEN]
+    return elevator, stops
+
+
+def test_look_is_default():
+    assert isinstance(Elevator(10, 4).scheduler, LookScheduler)
+
+
+def test_look_serves_calls_in_sweep_order():
+    elevator, stops = run_trips([(8, 2), (3, 6), (5, 1)])
+
+    # Up: picks the passenger going up on 3, passes the one going down on 5; down: picks them on the way
+    assert stops == [3, 6, 8, 5, 2, 1]
+    assert len(elevator.passengers) == 0
+    assert len(elevator.pending_passengers) == 0
+    assert not elevator.call_queue
+
+
+
+def test_look_car_call_stop_does_not_board_other_direction():
+    elevator, stops = run_trips([(1, 5), (1, 8), (5, 2)])
+    riders = [Passenger.view(elevator.passenger_store, passenger_id, elevator) for passenger_id in range(3)]
+
+    # The car stops on 5 for its rider; the passenger going down boards on the way back from 8
+    assert stops == [1, 5, 8, 5, 2]
+    assert riders[2].board_time > riders[1].alight_time
+
+def test_look_full_car_passes_hall_calls():
+    elevator, stops = run_trips([(2, 9), (5, 9)], max_passengers=1)
+
+    assert stops == [2, 9, 5, 9]
+    assert len(elevator.pending_passengers) == 0
+
+
+def test_fifo_scheduler_delivers_everybody():
+    elevator, stops = run_trips([(8, 2), (3, 6), (5, 1)], scheduler=FifoScheduler())
+
+    assert len(elevator.passengers) == 0
+    assert len(elevator.pending_passengers) == 0
+    assert stops[0] == 3
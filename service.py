@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future
+
+from async_simulation import AsyncSimulation
+from building import Building
+from events import NULL_SINK
+from metrics import StreamingHistogram
+from passenger import Passenger
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from elevator import Elevator
+    from metrics import Metrics
+
+# Result of a hall or car call: the car and the latency are None while a dispatcher collecting calls holds it
+Assignment = namedtuple('Assignment', ['passenger', 'car', 'latency'])
+
+SLA_P99 = 0.005  # seconds from the submission of a hall call to its assignment
+
+
+class ControlService:
+    """
+    Long-running controller of a building. Calls come from any thread or coroutine as commands on
+    a queue; only the control loop pops them and touches the cars, so the cars need no locks.
+    Submitting is an append to a deque plus a wake-up of the loop, and every command returns a
+    future resolved by the loop. The wall-clock time from the submission of a hall call to its
+    assignment to a car is recorded in a histogram; for a call held by the dispatcher this
+    includes the wait until the dispatcher gives it to a car
+    """
+
+    def __init__(self, building: Building, speed: float = 1.0, metrics: "Metrics" = None):
+        self.building = building
+        self.simulation = AsyncSimulation(speed, metrics)
+        self.simulation.add_building(building)
+        self.commands = deque()  # (submission time, handler, args, future), appended by any thread
+        self.latency = StreamingHistogram(resolution=1e-6)  # seconds from submission to assignment
+        self.held = {}  # passenger ID -> submission time of a hall call the dispatcher holds
+        building.dispatcher.on_assign = self._assigned
+        self._loop = None
+        self._wakeup = None
+        self._thread = None
+        self._lock = threading.Lock()  # orders the submissions against the closing of the queue
+        self._closed = True  # no more commands are accepted
+
+    def submit(self, handler, *args) -> Future:
+        """
+        Queue a command for the control loop
+
+        :param handler: Method of the service run by the loop
+        :param args: Arguments of the handler
+        :return: Future of the handler's result
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("service is not running")
+            self.commands.append((time.perf_counter(), handler, args, future))
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return future
+
+    def hall_call(self, current_floor: int, desired_floor: int) -> Future:
+        """
+        Passenger calling from the hall; the dispatcher of the building chooses the car
+
+        :param current_floor: Floor of the call
+        :param desired_floor: The floor needs to go to
+        :return: Future of an Assignment
+        """
+        return self.submit(self._hall_call, current_floor, desired_floor)
+
+    def car_call(self, car: int, desired_floor: int) -> Future:
+        """
+        Button pressed inside a car: a passenger who is already in the car at its current floor
+
+        :param car: Number of the car
+        :param desired_floor: The floor needs to go to
+        :return: Future of an Assignment
+        """
+        return self.submit(self._car_call, car, desired_floor)
+
+    def cancel(self, passenger_id: int) -> Future:
+        """
+        Withdraw the call of a passenger who has not entered a car yet
+
+        :param passenger_id: ID from the Assignment of the call
+        :return: Future of a bool, False if the passenger is not waiting
+        """
+        return self.submit(self._cancel, passenger_id)
+
+    def get_state(self) -> Future:
+        """
+        Consistent view of all cars, taken between two commands
+
+        :return: Future of a list of dicts, one per car
+        """
+        return self.submit(self._get_state)
+
+    def get_latency(self) -> dict:
+        """
+        Summary of the latencies of the hall calls assigned so far, in seconds
+
+        :return: dict
+        """
+        return self.latency.get_summary()
+
+    def _hall_call(self, submitted: float, current_floor: int, desired_floor: int) -> Assignment:
+        passenger = Passenger(current_floor, desired_floor, self.building)
+        passenger.call_elevator()
+        if passenger.car is None:
+            # Held by the dispatcher: the latency is recorded once the call is given to a car
+            self.held[passenger.id] = submitted
+            return Assignment(passenger.id, None, None)
+        latency = time.perf_counter() - submitted
+        self.latency.record(latency)
+        return Assignment(passenger.id, passenger.car.number, latency)
+
+    def _assigned(self, passenger: Passenger, car: "Elevator") -> None:
+        submitted = self.held.pop(passenger.id, None)
+        if submitted is not None:
+            self.latency.record(time.perf_counter() - submitted)
+
+    def _car_call(self, submitted: float, car: int, desired_floor: int) -> Assignment:
+        elevator = self.building.cars[car]
+        if desired_floor == elevator.current_floor:
+            raise ValueError("desired_floor must differ from the floor of the car")
+        if not elevator.has_room():
+            raise ValueError("the car is full")
+        passenger = Passenger(elevator.current_floor, desired_floor, elevator)
+        elevator.add_rider(passenger)
+        return Assignment(passenger.id, car, time.perf_counter() - submitted)
+
+    def _cancel(self, submitted: float, passenger_id: int) -> bool:
+        self.held.pop(passenger_id, None)
+        return self.building.cancel_call(passenger_id)
+
+    def _get_state(self, submitted: float) -> list:
+        return [{
+            'car': car.number,
+            'floor': car.current_floor,
+            'direction': car.direction.name,
+            'status': car.status.name,
+            'door': car.door.status.name,
+            'passengers': len(car.passengers),
+            'waiting': len(car.pending_passengers),
+        } for car in self.building.cars]
+
+    def process_commands(self) -> None:
+        """
+        Run every queued command in submission order
+
+        :return: None
+        """
+        while self.commands:
+            submitted, handler, args, future = self.commands.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(handler(submitted, *args))
+            except Exception as error:
+                future.set_exception(error)
+        self.simulation.wake_elevators()
+
+    async def control_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            self.process_commands()
+
+    async def serve(self) -> None:
+        """
+        Run the cars and the commands on the running event loop until stop()
+
+        :return: None
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        with self._lock:
+            self._closed = False
+        control = asyncio.create_task(self.control_loop())
+        try:
+            await self.simulation.run()
+        finally:
+            control.cancel()
+            with self._lock:
+                self._closed = True  # later submissions raise, so the last drain gets every command
+            self.process_commands()  # commands submitted while the cars were finishing
+            self._loop = None
+
+    def stop(self) -> Future:
+        """
+        Let every car finish once its passengers are served; serve() then returns
+
+        :return: Future resolved when the stop was taken into account
+        """
+        return self.submit(lambda submitted: self.simulation.stop())
+
+    def start(self) -> None:
+        """
+        Serve on an event loop of a background thread
+
+        :return: None
+        """
+        started = threading.Event()
+
+        async def serve() -> None:
+            task = asyncio.create_task(self.serve())
+            await asyncio.sleep(0)  # let serve() set up the loop before the callers submit
+            started.set()
+            await task
+
+        self._thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def close(self) -> None:
+        """
+        Stop the background thread once every car has served its passengers
+
+        :return: None
+        """
+        self.stop().result()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "ControlService":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measure the hall call assignment latency of the control service')
+    parser.add_argument('--max-floor', type=int, default=30)
+    parser.add_argument('--cars', type=int, default=16)
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=200.0, help='hall calls per wall-clock second')
+    parser.add_argument('--speed', type=float, default=100.0, help='simulated seconds per wall-clock second')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    building = Building(args.max_floor, args.cars, 12, event_sink=NULL_SINK)
+    with ControlService(building, args.speed) as service:
+        for index in range(args.calls):
+            current_floor, desired_floor = rng.sample(range(1, args.max_floor + 1), 2)
+            service.hall_call(current_floor, desired_floor)
+            time.sleep(1 / args.rate)
+        service.get_state().result()  # every call before it has been assigned
+        latency = service.get_latency()
+    print(f"hall calls {latency['count']} latency p50 {latency['p50'] * 1000:.3f} ms "
+          f"p99 {latency['p99'] * 1000:.3f} ms max {latency['max'] * 1000:.3f} ms", flush=True)
+    if latency['p99'] > SLA_P99:
+        raise SystemExit(f"p99 latency is above the SLA of {SLA_P99 * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import asyncio
+from math import isnan
+
+import pytest
+from building import Building
+from dispatcher import DestinationDispatcher
+from events import NULL_SINK, MemorySink, EventType
+from metrics import Metrics
+from passenger import Passenger
+from service import ControlService
+
+SPEED = 1000  # simulated seconds per wall-clock second
+
+
+def test_service_not_running():
+    service = ControlService(Building(10, 2, 4, event_sink=NULL_SINK))
+    with pytest.raises(RuntimeError):
+        service.hall_call(1, 5)
+
+
+def test_service_serves_hall_calls_from_thread():
+    building = Building(10, 4, 4, 1, event_sink=NULL_SINK)
+    metrics = Metrics()
+    with ControlService(building, SPEED, metrics) as service:
+        assignments = [service.hall_call(1 + item % 10, 10 - item % 9).result() for item in range(20)]
+
+    assert all(assignment.car in range(4) for assignment in assignments)
+    assert len({assignment.passenger for assignment in assignments}) == 20
+    assert service.get_latency()['count'] == 20
+    assert metrics.journey_time.count == 20
+
+
+def test_service_car_call_and_state():
+    building = Building(10, 2, 4, 1, event_sink=NULL_SINK)
+    with ControlService(building, SPEED) as service:
+        assignment = service.car_call(1, 7).result()
+        with pytest.raises(ValueError):
+            service.car_call(0, building.cars[0].current_floor).result()
+        state = service.get_state().result()
+
+    assert assignment.car == 1
+    assert [car['car'] for car in state] == [0, 1]
+    assert building.cars[1].current_floor == 7
+
+
+def test_service_car_call_is_not_a_hall_call():
+    sink = MemorySink()
+    building = Building(10, 1, 4, 1, event_sink=sink)
+    metrics = Metrics()
+    with ControlService(building, SPEED, metrics) as service:
+        service.car_call(0, 6).result()
+
+    assert [event.type for event in sink.events if event.passenger == 0] == [EventType.BOARD, EventType.ALIGHT]
+    assert metrics.called == 0
+    assert metrics.ride_stops.count == 1
+    assert 1 not in building.cars[0].call_queue
+
+
+def test_service_cancel():
+    building = Building(10, 1, 4, 1, event_sink=NULL_SINK)
+    service = ControlService(building, SPEED)
+
+    async def run():
+        serve = asyncio.create_task(service.serve())
+        await asyncio.sleep(0)
+        assignment = await asyncio.wrap_future(service.hall_call(9, 2))
+        cancelled = await asyncio.wrap_future(service.cancel(assignment.passenger))
+        again = await asyncio.wrap_future(service.cancel(assignment.passenger))
+        service.stop()
+        await serve
+        return cancelled, again
+
+    assert asyncio.run(run()) == (True, False)
+    assert len(building.cars[0].pending_passengers) == 0
+    assert isnan(building.passenger_store.board_times[0])
+
+
+def test_elevator_cancel_call_event():
+    sink = MemorySink()
+    building = Building(10, 1, 4, 1, event_sink=sink)
+    metrics = Metrics()
+    metrics.attach(building.cars[0])
+    passenger = Passenger(3, 6, building)
+    passenger.call_elevator()
+
+    assert building.cancel_call(passenger.id)
+    assert not building.cars[0].is_floor_awaited(3)
+    assert [event.type for event in sink.events] == [EventType.HALL_CALL, EventType.CANCEL]
+    assert metrics.called == 0
+
+
+def test_service_destination_dispatcher_holds_calls():
+    building = Building(10, 2, 4, 1, dispatcher=DestinationDispatcher(window=5.0), event_sink=NULL_SINK)
+    metrics = Metrics()
+    with ControlService(building, SPEED, metrics) as service:
+        assignments = [service.hall_call(1, 5 + item).result() for item in range(4)]
+
+    assert all(assignment.car is None for assignment in assignments)
+    assert metrics.journey_time.count == 4
+
+
+def test_service_cancel_held_call():
+    building = Building(10, 2, 4, 1, dispatcher=DestinationDispatcher(window=1.0), event_sink=NULL_SINK)
+    with ControlService(building, SPEED) as service:
+        assignment = service.hall_call(3, 8).result()
+        cancelled = service.cancel(assignment.passenger).result()
+
+    assert assignment.car is None and cancelled
+    assert not building.dispatcher.batch
+    assert isnan(building.passenger_store.board_times[assignment.passenger])
+
+
+def test_service_latency_of_held_calls():
+    window = 2.0
+    building = Building(10, 2, 4, 1, dispatcher=DestinationDispatcher(window=window), event_sink=NULL_SINK)
+    with ControlService(building, SPEED) as service:
+        assignments = [service.hall_call(1, 5 + item).result() for item in range(3)]
+        assert service.get_latency()['count'] == 0
+
+    latency = service.get_latency()
+    assert all(assignment.latency is None for assignment in assignments)
+    assert latency['count'] == 3 and not service.held
+    assert latency['max'] >= window / SPEED * 0.9
+
+
+class LateSubmitService(ControlService):
+    """
+    Submits a command right after the last drain of the queue, once the cars have finished
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.late = []
+
+    def process_commands(self) -> None:
+        super().process_commands()
+        if self.simulation._loop is None and not self.late:
+            try:
+                self.late.append(self.get_state())
+            except RuntimeError as error:
+                self.late.append(error)
+
+
+def test_service_submit_during_shutdown():
+    service = LateSubmitService(Building(10, 2, 4, 1, event_sink=NULL_SINK), SPEED)
+    with service:
+        service.hall_call(1, 5).result()
+
+    assert len(service.late) == 1 and isinstance(service.late[0], RuntimeError)
+    with pytest.raises(RuntimeError):
+        service.hall_call(1, 5)
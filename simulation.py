@@ -0,0 +1,216 @@
+from heapq import heappush, heappop
+from time import monotonic, sleep
+
+from states import ElevatorStatus
+
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from building import Building
+    from elevator import Elevator
+    from metrics import Metrics
+    from passenger import Passenger
+    from profiling import Profiler
+
+
+class VirtualClock:
+    """
+    Simulated time. Sleeping on this clock only moves the time forward, it never blocks
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Advance simulated time
+
+        :param seconds: Duration of the action in simulated seconds
+        :return: None
+        """
+        self.now += seconds
+
+
+class RealTimePacer:
+    """
+    Slows the simulation down so that simulated time follows the wall clock
+    """
+
+    def __init__(self, speed: float = 1.0):
+        if speed <= 0:
+            raise ValueError("speed must be higher than 0")
+        self.speed = speed  # How many simulated seconds pass in one wall-clock second
+        self.origin = None  # (wall-clock time, simulated time) of the first event
+
+    def __getstate__(self) -> dict:
+        # The wall clock of another process means nothing: a restored pacer starts over from its next event
+        return {**self.__dict__, 'origin': None}
+
+    def wait_until(self, simulated_time: float) -> None:
+        """
+        Block until the wall clock catches up with the simulated time
+
+        :param simulated_time: Time of the next event
+        :return: None
+        """
+        if self.origin is None:
+            self.origin = (monotonic(), simulated_time)
+        wall_origin, simulated_origin = self.origin
+        delay = wall_origin + (simulated_time - simulated_origin) / self.speed - monotonic()
+        if delay > 0:
+            sleep(delay)
+
+
+class Simulation:
+    """
+    Discrete-event engine: events are kept in a priority queue ordered by simulated time and
+    executed one after another without waiting between them
+    """
+
+    def __init__(self, clock: Optional[VirtualClock] = None, pacer: Optional[RealTimePacer] = None,
+                 metrics: Optional["Metrics"] = None, profiler: Optional["Profiler"] = None):
+        self.clock = clock if clock is not None else VirtualClock()
+        self.pacer = pacer  # Optional adapter that keeps the simulation in real time
+        self.metrics = metrics  # Optional KPI collector, exported when run() ends
+        self.profiler = profiler  # Optional per-phase timing of the cars and of the engine
+        if profiler is not None:
+            profiler.attach_simulation(self)
+        self.elevators = []
+        self.parked = []  # idle elevators without calls, waiting to be woken up
+        self._events = []  # heap of (time, sequence number, callback, args)
+        self._sequence = 0  # keeps events scheduled for the same time in FIFO order
+
+    @property
+    def now(self) -> float:
+        return self.clock.now
+
+    def schedule_at(self, time: float, callback: Callable, *args) -> None:
+        """
+        Schedule callback(*args) at the given simulated time
+
+        :param time: Simulated time of the event
+        :param callback: Function to call
+        :return: None
+        """
+        self._sequence += 1
+        heappush(self._events, (time, self._sequence, callback, args))
+
+    def schedule(self, delay: float, callback: Callable, *args) -> None:
+        """
+        Schedule callback(*args) after delay simulated seconds
+
+        :param delay: Delay from the current simulated time
+        :param callback: Function to call
+        :return: None
+        """
+        if delay < 0:
+            raise ValueError("delay must be higher than 0")
+        self.schedule_at(self.clock.now + delay, callback, *args)
+
+    def add_elevator(self, elevator: "Elevator") -> None:
+        """
+        Put the elevator on the simulated clock and start stepping it
+
+        :param elevator: Elevator instance
+        :return: None
+        """
+        elevator.clock = self.clock
+        elevator.door.clock = self.clock
+        if self.metrics is not None:
+            self.metrics.attach(elevator)
+        if self.profiler is not None:
+            self.profiler.attach(elevator)
+        self.elevators.append(elevator)
+        self.schedule(0, self.step_elevator, elevator)
+
+    def add_building(self, building: "Building") -> None:
+        """
+        Put all cars of the building into the simulation
+
+        :param building: Building instance
+        :return: None
+        """
+        for car in building.cars:
+            self.add_elevator(car)
+        building.dispatcher.attach(self, building.cars)
+
+    def add_passenger(self, passenger: "Passenger", arrival_time: Optional[float] = None) -> None:
+        """
+        Schedule the passenger's call at arrival_time (now if omitted)
+
+        :param passenger: Passenger instance
+        :param arrival_time: Simulated time when the passenger calls the elevator
+        :return: None
+        """
+        if arrival_time is None:
+            arrival_time = self.clock.now
+        self.schedule_at(arrival_time, self.arrive, passenger)
+
+    def arrive(self, passenger: "Passenger") -> None:
+        """
+        Passenger arrival event
+
+        :param passenger: Passenger instance
+        :return: None
+        """
+        passenger.call_elevator()
+        self.wake_elevators()
+
+    def wake_elevators(self) -> None:
+        """
+        Resume parked elevators which received calls
+
+        :return: None
+        """
+        for elevator in list(self.parked):
+            if not elevator.is_finished() and not elevator.is_parked():
+                self.parked.remove(elevator)
+                self.schedule(0, self.step_elevator, elevator)
+
+    def step_elevator(self, elevator: "Elevator") -> None:
+        """
+        Elevator event: perform one action and schedule the next one when that action ends
+
+        :param elevator: Elevator instance
+        :return: None
+        """
+        # A stopped elevator is parked as well: passengers arriving later still have to be served
+        if elevator.is_finished() or elevator.is_parked():
+            if elevator.status is ElevatorStatus.IDLE and elevator.park():
+                self.schedule(0, self.step_elevator, elevator)
+                return
+            self.parked.append(elevator)
+            return
+        started = self.clock.now
+        duration = elevator.step()
+        self.schedule_at(started + duration, self.step_elevator, elevator)
+
+    def run(self, until: Optional[float] = None) -> None:
+        """
+        Execute events in time order until none are left or until the given simulated time
+
+        :param until: Simulated time to stop at
+        :return: None
+        """
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            self.run_events(until)
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+        if until is not None:
+            self.clock.now = until
+        if self.metrics is not None:
+            self.metrics.export(self.clock.now)
+
+    def run_events(self, until: Optional[float]) -> None:
+        while self._events:
+            time = self._events[0][0]
+            if until is not None and time > until:
+                break
+            time, _, callback, args = heappop(self._events)
+            if self.pacer is not None:
+                self.pacer.wait_until(time)
+            self.clock.now = time
+            callback(*args)
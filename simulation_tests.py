@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from elevator import Elevator
+from passenger import Passenger
+from simulation import Simulation, VirtualClock, RealTimePacer
+
+
+def test_virtual_clock_sleep_does_not_block():
+    clock = VirtualClock()
+    started = time.monotonic()
+    clock.sleep(3600)
+
+    assert clock.now == 3600
+    assert time.monotonic() - started < 1
+
+
+def test_simulation_events_in_time_order():
+    simulation = Simulation()
+    calls = []
+    simulation.schedule(5, calls.append, "late")
+    simulation.schedule(1, calls.append, "early")
+    simulation.schedule(1, calls.append, "early second")
+    simulation.run()
+
+    assert calls == ["early", "early second", "late"]
+
+
+def test_simulation_negative_delay():
+    with pytest.raises(ValueError):
+        Simulation().schedule(-1, print)
+
+
+def test_simulation_run_until():
+    simulation = Simulation()
+    calls = []
+    simulation.schedule(1, calls.append, 1)
+    simulation.schedule(10, calls.append, 10)
+    simulation.run(until=5)
+
+    assert calls == [1]
+    assert simulation.now == 5
+
+
+def test_simulation_delivers_passengers_without_sleeping():
+    elevator = Elevator(10, 4, 60)
+    passenger = Passenger(3, 6, elevator)
+    simulation = Simulation()
+    simulation.add_elevator(elevator)
+    simulation.add_passenger(passenger, arrival_time=100)
+
+    started = time.monotonic()
+    simulation.run()
+
+    assert time.monotonic() - started < 1
+    assert len(elevator.passengers) == 0
+    assert len(elevator.pending_passengers) == 0
+    assert elevator.current_floor == 6
+    assert simulation.now > 100
+
+
+def test_simulation_parked_elevator_is_woken_up():
+    elevator = Elevator(10, 4, 1)
+    simulation = Simulation()
+    simulation.add_elevator(elevator)
+    simulation.run()
+
+    assert elevator in simulation.parked
+
+    simulation.add_passenger(Passenger(2, 4, elevator))
+    simulation.run()
+
+    assert elevator.current_floor == 4
+    assert len(elevator.passengers) == 0
+
+
+def test_elevator_stops_in_simulation():
+    elevator = Elevator(10, 4, 1)
+    simulation = Simulation()
+    elevator.stop_elevator()
+    simulation.add_elevator(elevator)
+    simulation.run()
+
+    assert elevator.is_finished()
+    assert elevator in simulation.parked
+
+
+def test_real_time_pacer_waits():
+    pacer = RealTimePacer(speed=10)
+    started = time.monotonic()
+    pacer.wait_until(0)
+    pacer.wait_until(1)
+
+    assert time.monotonic() - started >= 0.1
+
+
+def test_real_time_pacer_speed_zero():
+    with pytest.raises(ValueError):
+        RealTimePacer(0)
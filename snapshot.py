@@ -0,0 +1,78 @@
+import pickle
+import zlib
+
+from simulation import Simulation
+
+from typing import Any, Optional
+
+MAGIC = b'ELSIM'
+VERSION = 1
+
+
+def dumps(simulation: Simulation, rng: Any = None, compress: bool = True) -> bytes:
+    """
+    Serialize the whole state of a simulation: clock, pending events, elevators with their
+    passengers and indexes, sinks and metrics, and the state of the random generator
+
+    :param simulation: Simulation instance, between two events
+    :param rng: Optional random generator (random.Random or numpy Generator) driving the scenario
+    :param compress: Compress the snapshot with zlib
+    :return: bytes
+    """
+    payload = pickle.dumps((simulation, rng), protocol=pickle.HIGHEST_PROTOCOL)
+    if compress:
+        payload = zlib.compress(payload, 1)  # fastest level: the columns of the store compress well anyway
+    return MAGIC + bytes((VERSION, compress)) + payload
+
+
+def loads(data: bytes) -> tuple:
+    """
+    Restore a simulation from a snapshot; every call returns an independent copy, so one
+    snapshot can fork several what-if scenarios
+
+    :param data: Bytes returned by dumps()
+    :return: (simulation, random generator)
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("data is not a simulation snapshot")
+    version, compressed = data[len(MAGIC)], data[len(MAGIC) + 1]
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    payload = data[len(MAGIC) + 2:]
+    if compressed:
+        payload = zlib.decompress(payload)
+    return pickle.loads(payload)
+
+
+def save(path: str, simulation: Simulation, rng: Any = None, compress: bool = True) -> None:
+    """
+    Write a snapshot of the simulation to a file
+
+    :param path: File path
+    :param simulation: Simulation instance
+    :param rng: Optional random generator
+    :param compress: Compress the snapshot with zlib
+    :return: None
+    """
+    with open(path, 'wb') as file:
+        file.write(dumps(simulation, rng, compress))
+
+
+def load(path: str) -> tuple:
+    """
+    Read a snapshot written by save()
+
+    :param path: File path
+    :return: (simulation, random generator)
+    """
+    with open(path, 'rb') as file:
+        return loads(file.read())
+
+
+def fork(simulation: Simulation, rng: Optional[Any] = None) -> tuple:
+    """
+    Independent copy of the simulation and the random generator
+
+    :return: (simulation, random generator)
+    """
+    return loads(dumps(simulation, rng, compress=False))
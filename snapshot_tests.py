@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+import pytest
+import snapshot
+from building import Building
+from events import NULL_SINK, JsonlSink
+from metrics import Metrics
+from passenger import Passenger
+from simulation import Simulation
+from traffic import generate_trips, iter_trips, TripFeeder
+
+
+def make_simulation(seed=7):
+    rng = np.random.default_rng(seed)
+    building = Building(12, 3, 6, 1, event_sink=NULL_SINK)
+    simulation = Simulation(metrics=Metrics())
+    simulation.add_building(building)
+    trips = generate_trips({'up_peak': 0.2, 'interfloor': 0.05}, 600, 12, rng=rng)
+    feeder = TripFeeder(simulation, building, iter_trips(*trips, chunk_size=16))
+    return simulation, building, feeder, rng
+
+
+def store_columns(store):
+    return [column.tobytes() for column in (store.current_floors, store.desired_floors, store.call_times,
+                                            store.board_times, store.alight_times)]
+
+
+def test_restored_simulation_continues_exactly():
+    simulation, building, feeder, rng = make_simulation()
+    simulation.run(until=300)
+    data = snapshot.dumps(simulation, rng)
+
+    simulation.run()
+    restored, restored_rng = snapshot.loads(data)
+    restored.run()
+
+    restored_store = restored.elevators[0].passenger_store
+    assert restored.now == simulation.now
+    assert len(restored_store) == len(building.passenger_store) > 0
+    assert store_columns(restored_store) == store_columns(building.passenger_store)
+    assert restored.metrics.get_summary(restored.now) == simulation.metrics.get_summary(simulation.now)
+    assert restored_rng.random() == rng.random()
+
+
+def test_fork_is_independent():
+    simulation, building, feeder, rng = make_simulation()
+    simulation.run(until=200)
+    forked, forked_rng = snapshot.fork(simulation, rng)
+
+    forked.run()
+
+    assert simulation.now == 200
+    assert forked.now > 200
+    assert forked.elevators[0] is not simulation.elevators[0]
+
+
+def test_snapshot_keeps_random_state(tmp_path):
+    rng = random.Random(3)
+    rng.random()
+    path = tmp_path / 'state.snapshot'
+    snapshot.save(path, Simulation(), rng)
+
+    restored, restored_rng = snapshot.load(path)
+
+    assert restored_rng.random() == rng.random()
+    assert restored.now == 0
+
+
+def test_snapshot_rejects_other_data():
+    with pytest.raises(ValueError):
+        snapshot.loads(b'not a snapshot')
+
+
+def test_restored_jsonl_sink_appends(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    building = Building(6, 1, 4, 1, event_sink=JsonlSink(path))
+    simulation = Simulation()
+    simulation.add_building(building)
+    simulation.add_passenger(Passenger(2, 5, building), 0)
+    simulation.add_passenger(Passenger(4, 1, building), 100)
+    building.stop_elevator()
+    simulation.run(until=50)
+
+    restored, rng = snapshot.loads(snapshot.dumps(simulation))
+    restored.run()
+    restored.elevators[0].event_sink.close()
+
+    types = [line.split('"type": "')[1].split('"')[0] for line in path.read_text().splitlines()]
+    assert types.count('HALL_CALL') == 2
+    assert types.count('ALIGHT') == 2
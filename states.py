@@ -0,0 +1,16 @@
+from enum import Enum
+
+
+class DoorStatus(Enum):
+    CLOSED = 1
+    OPENED = 2
+
+
+class ElevatorStatus(Enum):
+    IDLE = 1
+    MOVING = 2
+
+
+class ElevatorDirection(Enum):
+    UP = 1
+    DOWN = 2
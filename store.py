@@ -0,0 +1,64 @@
+from array import array
+from math import isnan
+
+from capacity import ADULT, NO_GROUP, PassengerSize
+
+NOT_YET = float('nan')  # time of an event which has not happened yet
+
+
+class PassengerStore:
+    """
+    Struct-of-arrays storage of all passengers of a simulation. Passengers get dense integer IDs,
+    which are indexes into the typed columns below
+    """
+
+    def __init__(self):
+        self.current_floors = array('l')
+        self.desired_floors = array('l')
+        self.call_times = array('d')
+        self.board_times = array('d')
+        self.alight_times = array('d')
+        self.weights = array('d')
+        self.areas = array('d')
+        self.groups = array('l')  # passengers of one group board together, NO_GROUP for the others
+
+    def __len__(self) -> int:
+        return len(self.current_floors)
+
+    def add(self, current_floor: int, desired_floor: int, size: PassengerSize = ADULT, group: int = NO_GROUP) -> int:
+        """
+        Store a new passenger
+
+        :param current_floor: Current floor
+        :param desired_floor: The floor needs to go to
+        :param size: Weight and floor area of the passenger in the car
+        :param group: Group of passengers boarding together
+        :return: ID of the passenger
+        """
+        self.current_floors.append(current_floor)
+        self.desired_floors.append(desired_floor)
+        self.call_times.append(NOT_YET)
+        self.board_times.append(NOT_YET)
+        self.alight_times.append(NOT_YET)
+        self.weights.append(size.weight)
+        self.areas.append(size.area)
+        self.groups.append(group)
+        return len(self.current_floors) - 1
+
+    def get_wait_times(self) -> list:
+        """
+        Time from the call until entering the elevator of every passenger who has entered
+
+        :return: list of simulated seconds
+        """
+        return [board_time - call_time for call_time, board_time in zip(self.call_times, self.board_times)
+                if not isnan(board_time)]
+
+    def get_journey_times(self) -> list:
+        """
+        Time from the call until reaching the desired floor of every passenger who has arrived
+
+        :return: list of simulated seconds
+        """
+        return [alight_time - call_time for call_time, alight_time in zip(self.call_times, self.alight_times)
+                if not isnan(alight_time)]
@@ -0,0 +1,70 @@
+import pytest
+from building import Building
+from elevator import Elevator
+from passenger import Passenger
+from store import PassengerStore
+
+
+def test_store_dense_ids():
+    store = PassengerStore()
+
+    assert store.add(1, 5) == 0
+    assert store.add(3, 2) == 1
+    assert len(store) == 2
+    assert store.desired_floors[1] == 2
+
+
+def test_store_times_of_served_passengers_only():
+    store = PassengerStore()
+    served = store.add(1, 5)
+    store.add(3, 2)
+    store.call_times[served] = 10.0
+    store.board_times[served] = 14.0
+    store.alight_times[served] = 30.0
+
+    assert store.get_wait_times() == [4.0]
+    assert store.get_journey_times() == [20.0]
+
+
+def test_passenger_is_view_over_store():
+    elevator = Elevator(10, 4, 0.1)
+    passenger = Passenger(3, 6, elevator)
+
+    assert passenger.store is elevator.passenger_store
+    assert elevator.passenger_store.current_floors[passenger.id] == 3
+    assert passenger.uuid == passenger.id
+    assert passenger.call_time is None
+
+
+def test_passenger_has_no_instance_dict():
+    passenger = Passenger(3, 6, Elevator(10, 4, 0.1))
+
+    with pytest.raises(AttributeError):
+        passenger.temp = 1
+
+
+def test_passenger_view_of_stored_passenger():
+    elevator = Elevator(10, 4, 0.1)
+    passenger = Passenger(3, 6, elevator)
+    passenger.call_time = 5.0
+    view = Passenger.view(elevator.passenger_store, passenger.id, elevator)
+
+    assert view.desired_floor == 6
+    assert view.call_time == 5.0
+    assert view.car is elevator
+
+
+def test_building_cars_share_store():
+    building = Building(10, 3, 4, 0.1)
+    passengers = [Passenger(1, floor, building) for floor in range(2, 6)]
+
+    assert [passenger.id for passenger in passengers] == [0, 1, 2, 3]
+    assert all(car.passenger_store is building.passenger_store for car in building.cars)
+
+
+def test_passenger_elevator_wrong_class():
+    class Lift:
+        max_floor = 10
+
+    with pytest.raises(ValueError):
+        Passenger(1, 6, Lift())
@@ -0,0 +1,194 @@
+import numpy as np
+
+from passenger import Passenger
+from simulation import Simulation
+
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from building import Building
+    from elevator import Elevator
+
+PATTERNS = ('up_peak', 'down_peak', 'lunch', 'interfloor')
+
+# Daily office profile: (pattern, share of the population making the trip, peak hour, spread in hours)
+DAILY_PROFILE = (
+    ('up_peak', 0.9, 8.75, 0.5),
+    ('lunch', 0.8, 12.5, 0.6),
+    ('down_peak', 0.9, 17.25, 0.5),
+    ('interfloor', 0.6, 13.0, 3.0),
+)
+
+
+def od_matrix(pattern: str, max_floor: int, lobby: int = 1) -> np.ndarray:
+    """
+    Origin-destination matrix of a traffic pattern
+
+    :param pattern: One of PATTERNS
+    :param max_floor: Number of floors
+    :param lobby: Main entrance floor
+    :return: max_floor x max_floor probabilities, row = origin floor - 1, column = desired floor - 1
+    """
+    if max_floor < 2:
+        raise ValueError("max_floor must be higher than 2")
+    if lobby < 1 or lobby > max_floor:
+        raise ValueError("lobby must be higher than 1 and less than 'max_floor'")
+
+    lobby_index = lobby - 1
+    upper_floors = np.ones(max_floor)
+    upper_floors[lobby_index] = 0
+    if pattern == 'up_peak':
+        matrix = np.zeros((max_floor, max_floor))
+        matrix[lobby_index] = upper_floors
+    elif pattern == 'down_peak':
+        matrix = np.zeros((max_floor, max_floor))
+        matrix[:, lobby_index] = upper_floors
+    elif pattern == 'interfloor':
+        # Trips between the upper floors; a building of two floors has nothing but the lobby
+        floors = upper_floors if max_floor > 2 else np.ones(max_floor)
+        matrix = np.outer(floors, floors)
+        np.fill_diagonal(matrix, 0)
+    elif pattern == 'lunch':
+        return 0.45 * od_matrix('up_peak', max_floor, lobby) + 0.45 * od_matrix('down_peak', max_floor, lobby) + \
+            0.1 * od_matrix('interfloor', max_floor, lobby)
+    else:
+        raise ValueError(f"pattern must be one of {', '.join(PATTERNS)}")
+    return matrix / matrix.sum()
+
+
+def daily_rates(population: int, interval: float = 300.0, profile: tuple = DAILY_PROFILE) -> dict:
+    """
+    Arrival rates of every pattern over a 24-hour day, as a sum of Gaussian-shaped peaks
+
+    :param population: Number of people in the building
+    :param interval: Length of one piecewise-constant rate interval in seconds
+    :param profile: (pattern, share of the population, peak hour, spread in hours) of every peak
+    :return: pattern -> array of arrivals per second for every interval
+    """
+    hours = (np.arange(int(24 * 3600 / interval)) + 0.5) * interval / 3600
+    rates = {}
+    for pattern, share, peak_hour, spread in profile:
+        density = np.exp(-0.5 * ((hours - peak_hour) / spread) ** 2) / (spread * np.sqrt(2 * np.pi))
+        rates[pattern] = rates.get(pattern, 0) + population * share * density / 3600
+    return rates
+
+
+def generate_trips(rates: dict, interval: float, max_floor: int, lobby: int = 1,
+                   rng: np.random.Generator = None, start: float = 0.0) -> tuple:
+    """
+    Inhomogeneous Poisson arrivals with piecewise-constant rates. The number of arrivals of every
+    interval is drawn at once, the pattern of every trip is drawn from the interval's mix of rates,
+    and origin and destination from the pattern's origin-destination matrix
+
+    :param rates: pattern -> arrivals per second, a number or an array with one rate per interval
+    :param interval: Length of one rate interval in seconds
+    :param max_floor: Number of floors
+    :param lobby: Main entrance floor
+    :param rng: NumPy random generator
+    :param start: Simulated time of the beginning of the first interval
+    :return: (arrival times, origin floors, desired floors) sorted by arrival time
+    """
+    if interval <= 0:
+        raise ValueError("interval must be higher than 0")
+    rng = rng if rng is not None else np.random.default_rng()
+
+    patterns = list(rates)
+    pattern_rates = np.stack(np.broadcast_arrays(*(np.atleast_1d(np.asarray(rates[pattern], dtype=float))
+                                                   for pattern in patterns)), axis=1)  # intervals x patterns
+    if (pattern_rates < 0).any():
+        raise ValueError("rates must be higher than 0")
+
+    counts = rng.poisson(pattern_rates * interval)  # arrivals of every pattern in every interval
+    interval_indexes = np.repeat(np.tile(np.arange(len(pattern_rates)), len(patterns)), counts.T.ravel())
+    pattern_indexes = np.repeat(np.arange(len(patterns)), counts.sum(axis=0))
+
+    arrival_times = start + (interval_indexes + rng.random(len(interval_indexes))) * interval
+    order = np.argsort(arrival_times, kind='stable')
+    arrival_times = arrival_times[order]
+    pattern_indexes = pattern_indexes[order]
+
+    trips = np.empty(len(arrival_times), dtype=np.int64)
+    for index, pattern in enumerate(patterns):
+        selected = pattern_indexes == index
+        probabilities = od_matrix(pattern, max_floor, lobby).ravel()
+        trips[selected] = rng.choice(len(probabilities), size=int(selected.sum()), p=probabilities)
+    origins, destinations = np.divmod(trips, max_floor)
+    return arrival_times, origins + 1, destinations + 1
+
+
+def iter_trips(arrival_times: np.ndarray, origins: np.ndarray, destinations: np.ndarray,
+               chunk_size: int = 65536) -> "TripIterator":
+    """
+    Lazily convert trip arrays to (arrival time, origin floor, desired floor) tuples, chunk by chunk
+
+    :return: iterator of tuples
+    """
+    return TripIterator(arrival_times, origins, destinations, chunk_size)
+
+
+class TripIterator:
+    """
+    Iterator over trip arrays converting one chunk at a time. Unlike a generator it can be
+    pickled, so a simulation fed by it can be snapshotted
+    """
+
+    def __init__(self, arrival_times: np.ndarray, origins: np.ndarray, destinations: np.ndarray,
+                 chunk_size: int = 65536):
+        self.arrival_times = arrival_times
+        self.origins = origins
+        self.destinations = destinations
+        self.chunk_size = chunk_size
+        self.position = 0  # index of the first trip of the next chunk
+        self._chunk = iter(())
+
+    def __iter__(self) -> "TripIterator":
+        return self
+
+    def __next__(self) -> tuple:
+        trip = next(self._chunk, None)
+        if trip is None:
+            if self.position >= len(self.arrival_times):
+                raise StopIteration
+            start, end = self.position, self.position + self.chunk_size
+            self._chunk = iter(list(zip(self.arrival_times[start:end].tolist(), self.origins[start:end].tolist(),
+                                        self.destinations[start:end].tolist())))
+            self.position = end
+            trip = next(self._chunk)
+        return trip
+
+
+class TripFeeder:
+    """
+    Feeds trips into the simulation in arrival order. Only the next arrival is scheduled at any
+    time, so passengers are created when they arrive rather than all upfront
+    """
+
+    def __init__(self, simulation: Simulation, elevator: "Elevator | Building", trips: Iterable):
+        self.simulation = simulation
+        self.elevator = elevator  # Elevator or Building the passengers call
+        self.trips = iter(trips)
+        self.arrived = 0
+        self.schedule_next()
+
+    def schedule_next(self) -> None:
+        """
+        Schedule the arrival of the next trip
+
+        :return: None
+        """
+        trip = next(self.trips, None)
+        if trip is not None:
+            arrival_time, current_floor, desired_floor = trip
+            self.simulation.schedule_at(arrival_time, self.arrive, current_floor, desired_floor)
+
+    def arrive(self, current_floor: int, desired_floor: int) -> None:
+        """
+        Arrival event: create the passenger, call the elevator and schedule the next trip
+
+        :param current_floor: Origin floor
+        :param desired_floor: Destination floor
+        :return: None
+        """
+        self.simulation.arrive(Passenger(current_floor, desired_floor, self.elevator))
+        self.arrived += 1
+        self.schedule_next()
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from building import Building
+from simulation import Simulation
+from traffic import od_matrix, daily_rates, generate_trips, iter_trips, TripFeeder
+
+
+def test_od_matrix_up_peak():
+    matrix = od_matrix('up_peak', 5, lobby=1)
+
+    assert matrix.sum() == pytest.approx(1)
+    assert matrix[0, 1:].tolist() == pytest.approx([0.25] * 4)
+    assert matrix[1:].sum() == 0
+
+
+def test_od_matrix_down_peak():
+    matrix = od_matrix('down_peak', 5, lobby=2)
+
+    assert matrix[:, 1].sum() == pytest.approx(1)
+    assert matrix[1, 1] == 0
+
+
+def test_od_matrix_no_trips_to_the_same_floor():
+    for pattern in ('up_peak', 'down_peak', 'lunch', 'interfloor'):
+        assert np.trace(od_matrix(pattern, 10)) == 0
+
+
+def test_od_matrix_unknown_pattern():
+    with pytest.raises(ValueError):
+        od_matrix('weekend', 10)
+
+
+def test_od_matrix_lobby_out_of_building():
+    with pytest.raises(ValueError):
+        od_matrix('up_peak', 10, lobby=11)
+
+
+def test_daily_rates_peaks():
+    rates = daily_rates(1000, interval=3600)
+
+    assert len(rates['up_peak']) == 24
+    assert rates['up_peak'].argmax() == 8
+    assert rates['down_peak'].argmax() == 17
+    assert rates['up_peak'].sum() * 3600 == pytest.approx(900, rel=0.01)
+
+
+def test_generate_trips_homogeneous():
+    arrival_times, origins, destinations = generate_trips({'up_peak': 2.0}, 1000, 20,
+                                                          rng=np.random.default_rng(1))
+
+    assert 1800 < len(arrival_times) < 2200
+    assert (np.diff(arrival_times) >= 0).all()
+    assert (origins == 1).all()
+    assert ((destinations > 1) & (destinations <= 20)).all()
+
+
+def test_generate_trips_inhomogeneous():
+    rates = {'down_peak': np.array([0.0, 5.0]), 'interfloor': 0.0}
+    arrival_times, origins, destinations = generate_trips(rates, 100, 10, rng=np.random.default_rng(2), start=50)
+
+    assert (arrival_times >= 150).all() and (arrival_times < 250).all()
+    assert (destinations == 1).all()
+
+
+def test_generate_trips_is_reproducible():
+    first = generate_trips(daily_rates(500), 300, 30, rng=np.random.default_rng(3))
+    second = generate_trips(daily_rates(500), 300, 30, rng=np.random.default_rng(3))
+
+    for first_array, second_array in zip(first, second):
+        assert (first_array == second_array).all()
+
+
+def test_generate_trips_negative_rate():
+    with pytest.raises(ValueError):
+        generate_trips({'lunch': -1.0}, 100, 10)
+
+
+def test_iter_trips_chunks():
+    trips = list(iter_trips(np.array([1.0, 2.0, 3.0]), np.array([1, 2, 3]), np.array([4, 5, 6]), chunk_size=2))
+
+    assert trips == [(1.0, 1, 4), (2.0, 2, 5), (3.0, 3, 6)]
+
+
+def test_trip_feeder_schedules_one_arrival_at_a_time():
+    building = Building(10, 2, 8, 1.0)
+    simulation = Simulation()
+    simulation.add_building(building)
+    trips = generate_trips({'interfloor': 0.05}, 2000, 10, rng=np.random.default_rng(4))
+    feeder = TripFeeder(simulation, building, iter_trips(*trips))
+    building.stop_elevator()
+    simulation.run()
+
+    assert feeder.arrived == len(trips[0])
+    assert all(car.is_finished() for car in building.cars)